@@ -1,5 +1,5 @@
 import importlib
-from flask import Flask, redirect, render_template, request, session, url_for
+from flask import Flask, flash, jsonify, redirect, render_template, request, session, url_for
 from flask_login import current_user
 from config import Config
 from extensions import db, csrf, login_manager, mail
@@ -12,6 +12,10 @@ def create_app(config_class: type[Config] = Config):
     load_dotenv()
     app = Flask(__name__)
 
+    # Per-route upload size caps (see app.services.upload_store)
+    from app.services.upload_store import UploadLimitRequest
+    app.request_class = UploadLimitRequest
+
     # ================= BASIC CONFIG =================
     app.secret_key = os.environ.get("SECRET_KEY", "dev_secret_key")
     app.config.from_object(config_class)
@@ -22,6 +26,24 @@ def create_app(config_class: type[Config] = Config):
     mail.init_app(app)
     login_manager.init_app(app)
 
+    from app.services.notification_broker import notification_broker
+    notification_broker.init_app(app)
+
+    from app.services.request_metrics import request_metrics
+    request_metrics.init_app(app)
+
+    from app.services.metrics_service import metrics
+    metrics.init_app(app)
+
+    from app.services.nplusone_detector import nplusone_detector
+    nplusone_detector.init_app(app)
+
+    from app.services.request_profiler import request_profiler
+    request_profiler.init_app(app)
+
+    from app.services.slow_query_log import slow_query_log
+    slow_query_log.init_app(app)
+
     # ================= LOGIN MANAGER =================
     login_manager.login_view = "auth.login"
     login_manager.login_message = "Please log in to access this page."
@@ -32,6 +54,8 @@ def create_app(config_class: type[Config] = Config):
         return UserTable.query.get(int(user_id))
     # ================= LANGUAGE GLOBAL =================
     # ================= LANGUAGE GLOBAL =================
+    from app.services.lang_service import translation_cache
+
     @app.context_processor
     def inject_lang():
         # Load translations directly
@@ -39,10 +63,9 @@ def create_app(config_class: type[Config] = Config):
         base_path = os.path.join(app.root_path, '..', 'translations')
         
         try:
-            with open(os.path.join(base_path, 'en.json'), 'r', encoding='utf-8') as f:
-                translations['en'] = json.load(f)
-            with open(os.path.join(base_path, 'km.json'), 'r', encoding='utf-8') as f:
-                translations['km'] = json.load(f)
+            # Parsed once per worker, reloaded when a file changes
+            translations['en'] = translation_cache.get(base_path, 'en')
+            translations['km'] = translation_cache.get(base_path, 'km')
         except Exception as e:
             # Fallback to empty dicts
             translations = {'en': {}, 'km': {}}
@@ -51,6 +74,24 @@ def create_app(config_class: type[Config] = Config):
         lang = translations.get(lang_code, translations.get('en', {}))
         return dict(lang=lang)
 
+    # ================= IMAGE VARIANTS =================
+    from app.services.image_service import image_url
+    app.add_template_global(image_url)
+
+    # ================= STATIC FINGERPRINTS =================
+    from app.services.asset_manifest import asset_manifest
+    asset_manifest.init_app(app)
+
+    # ================= FRAGMENT CACHE =================
+    from app.services.fragment_cache import fragment_cache
+    fragment_cache.init_app(app)
+
+    # ================= UPLOAD TOO LARGE =================
+    @app.errorhandler(413)
+    def upload_too_large(error):
+        flash("The uploaded file is too large.", "danger")
+        return redirect(request.referrer or url_for('home'))
+
     # ================= LANGUAGE SWITCH =================
     @app.route('/set_language', methods=['POST'])
     def set_language():
@@ -62,6 +103,17 @@ def create_app(config_class: type[Config] = Config):
         # IMPORTANT: force reload
         return redirect(request.referrer or url_for('home'))
 
+    # ================= CSRF TOKEN =================
+    # Pages revalidated with 304 (decorators.conditional) do not embed a
+    # token; the layout fetches a current one from here
+    @app.route('/csrf-token', methods=['GET'])
+    def csrf_token():
+        from flask_wtf.csrf import generate_csrf
+
+        response = jsonify(csrf_token=generate_csrf())
+        response.cache_control.no_store = True
+        return response
+
     # ================= HOME REDIRECT =================
     @app.route("/")
     def home():
@@ -125,7 +177,22 @@ def create_app(config_class: type[Config] = Config):
     app.register_blueprint(growth_stage_bp)
     app.register_blueprint(rice_variety_bp)
 
-    # ================= CREATE TABLES =================
-    with app.app_context():
-        db.create_all()
+    # ================= WEATHER PREFETCH =================
+    from app.routes.user_route.user_route import CAMBODIA_CITIES
+    from app.services.weather_service import WeatherService
+    WeatherService.init_app(app, CAMBODIA_CITIES)
+
+    # ================= CLI COMMANDS =================
+    from app.cli import register_commands
+    register_commands(app)
+
+    # ================= SCHEMA =================
+    # Tables/indexes are created by "flask db upgrade"; startup only
+    # compares the stored schema version (one query per worker)
+    from app.services.schema_service import SchemaService
+    if app.config.get("SCHEMA_AUTO_UPGRADE"):
+        with app.app_context():
+            SchemaService.upgrade()
+    else:
+        SchemaService.check(app)
     return app
\ No newline at end of file
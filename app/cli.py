@@ -0,0 +1,132 @@
+import time
+
+import click
+from flask.cli import AppGroup
+
+
+# ================= NOTIFICATIONS ================= #
+
+notifications_cli = AppGroup(
+    "notifications",
+    help="Notification maintenance commands."
+)
+
+
+@notifications_cli.command("purge")
+@click.option("--read-days", default=90, show_default=True,
+              help="Delete read personal notifications older than this.")
+@click.option("--broadcast-days", default=180, show_default=True,
+              help="Delete broadcast notifications older than this.")
+@click.option("--batch-size", default=1000, show_default=True,
+              help="Rows deleted per transaction.")
+def purge_notifications(read_days, broadcast_days, batch_size):
+    """Retention job: purge soft-deleted and old read notifications."""
+    from app.services.notification_service import NotificationService
+
+    result = NotificationService.purge(
+        read_days=read_days,
+        broadcast_days=broadcast_days,
+        batch_size=batch_size
+    )
+
+    click.echo(
+        f"Purged {result['personal']} personal notifications, "
+        f"{result['broadcasts']} broadcasts "
+        f"({result['broadcast_states']} user states)."
+    )
+
+
+# ================= DISEASE RISK ================= #
+
+risk_cli = AppGroup(
+    "risk",
+    help="Weather-driven disease risk commands."
+)
+
+
+@risk_cli.command("compute")
+def compute_risk():
+    """Scheduled job: rebuild per-province disease risk scores."""
+    from app.services.disease_risk_service import DiseaseRiskService
+
+    count = DiseaseRiskService.compute_all()
+
+    click.echo(f"Computed {count} disease risk rows.")
+
+
+# ================= WEATHER ================= #
+
+weather_cli = AppGroup(
+    "weather",
+    help="Weather cache commands."
+)
+
+
+@weather_cli.command("prefetch")
+@click.option("--once", is_flag=True,
+              help="Refresh every province once and exit.")
+def prefetch_weather(once):
+    """Long-running job: refresh every province into WEATHER_SNAPSHOT_PATH."""
+    from flask import current_app
+
+    from app.routes.user_route.user_route import CAMBODIA_CITIES
+    from app.services.weather_service import WeatherService
+
+    if not WeatherService.SNAPSHOT_PATH:
+        raise click.UsageError("Set WEATHER_SNAPSHOT_PATH so workers can read the results.")
+
+    interval = current_app.config.get("WEATHER_PREFETCH_INTERVAL") \
+        or max(WeatherService.CACHE_TTL // 2, 30)
+
+    while True:
+        count = WeatherService.prefetch(CAMBODIA_CITIES)
+        click.echo(f"Refreshed weather for {count}/{len(CAMBODIA_CITIES)} cities.")
+
+        if once:
+            break
+        time.sleep(interval)
+
+
+# ================= SCHEMA ================= #
+
+db_cli = AppGroup(
+    "db",
+    help="Database schema migration commands."
+)
+
+
+@db_cli.command("upgrade")
+@click.option("--to", "target", type=int, default=None,
+              help="Stop at this version (default: latest).")
+def upgrade_schema(target):
+    """Apply pending schema migrations and record their versions."""
+    from app.services.schema_service import SchemaService
+
+    applied = SchemaService.upgrade(target)
+
+    for version, name in applied:
+        click.echo(f"Applied {version}: {name}")
+
+    click.echo(f"Schema at version {SchemaService.current_version()}.")
+
+
+@db_cli.command("version")
+def schema_version():
+    """Show the applied schema version and any pending migrations."""
+    from app.services.schema_service import SchemaService
+
+    click.echo(
+        f"Schema at version {SchemaService.current_version()} "
+        f"(code expects {SchemaService.head()})."
+    )
+
+    for version, name in SchemaService.pending():
+        click.echo(f"Pending {version}: {name}")
+
+
+def register_commands(app):
+    """Attach the project's ``flask`` CLI command groups to the app."""
+    app.cli.add_command(notifications_cli)
+    app.cli.add_command(risk_cli)
+    app.cli.add_command(weather_cli)
+    app.cli.add_command(db_cli)
@@ -0,0 +1,161 @@
+# app/decorators/conditional.py
+import hashlib
+import os
+import threading
+from datetime import datetime, timezone
+from functools import wraps
+
+from flask import current_app, g, make_response, request, session
+from flask_login import current_user
+from sqlalchemy import func, select
+
+from extensions import db
+
+_release = {"version": None}
+_release_lock = threading.Lock()
+
+
+def kb_state(model, *criteria):
+    """
+    ``(max(updated_at), count)`` of the ``model`` rows matching ``criteria``,
+    as scalar subqueries. The count catches deletes, which do not move the
+    max timestamp.
+    """
+    return (
+        select(func.max(model.updated_at)).where(*criteria).scalar_subquery(),
+        select(func.count(model.id)).where(*criteria).scalar_subquery()
+    )
+
+
+def _release_version() -> str:
+    """Fingerprint of the deployed templates and static assets."""
+    with _release_lock:
+        if _release["version"] is None:
+            from app.services.asset_manifest import asset_manifest
+
+            digest = hashlib.md5(asset_manifest.version.encode())
+            template_root = os.path.join(current_app.root_path, "templates")
+
+            for root, _, files in sorted(os.walk(template_root)):
+                for name in sorted(files):
+                    with open(os.path.join(root, name), "rb") as f:
+                        digest.update(name.encode())
+                        digest.update(f.read())
+
+            _release["version"] = digest.hexdigest()[:12]
+
+        return _release["version"]
+
+
+def _data_state(sources, kwargs):
+    """
+    Run every ``kb_state`` of the view, together with the fragment cache
+    generation, in one query.
+    """
+    from app.services.fragment_cache import fragment_cache
+
+    kb_columns = fragment_cache.state_columns()
+    columns = list(kb_columns)
+    for state in sources(**kwargs) if sources else []:
+        columns.extend(state)
+
+    values = list(db.session.execute(select(*columns)).one())
+
+    # The page body is rendered from fragments of this generation
+    fragment_cache.use_state(tuple(values[:len(kb_columns)]))
+
+    timestamps = [
+        v for v in values[len(kb_columns):] if isinstance(v, datetime)
+    ]
+    last_modified = max(timestamps) if timestamps else None
+
+    return values, last_modified
+
+
+def _etag(data_values, extra) -> str:
+    """Combine data state with everything else the rendered page depends on."""
+    parts = [
+        _release_version(),
+        request.full_path,
+        session.get("lang", "en"),
+        extra or ""
+    ]
+
+    if current_user.is_authenticated:
+        parts.extend([
+            current_user.id,
+            current_user.updated_at,
+            ",".join(sorted(role.name for role in current_user.roles)),
+            ",".join(sorted(current_user.get_permission_code()))
+        ])
+
+    parts.extend(data_values)
+
+    return hashlib.sha1(
+        "|".join(str(p) for p in parts).encode()
+    ).hexdigest()
+
+
+def _set_validators(response, etag, last_modified):
+    response.set_etag(etag, weak=True)
+
+    if last_modified is not None:
+        response.last_modified = last_modified.replace(tzinfo=timezone.utc)
+
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    response.vary.add("Cookie")
+
+
+def conditional_get(sources=None, extra=None):
+    """
+    Answer ``304 Not Modified`` without running the view when the client's
+    copy is current.
+
+    ``sources(**view_kwargs)`` returns the ``kb_state()`` selects the page
+    is built from; ``extra()`` returns any other value shown on the page.
+    The ETag also covers the knowledge-base generation the page fragments
+    are cached under (read in the same query, so every worker derives the
+    same validator from the database), the language, the user's roles and
+    permissions, the query string and the deployed templates.
+    ``Last-Modified`` is sent for information only: it cannot express those
+    other inputs, so revalidation is done on the ETag alone.
+
+    Nothing clock-based goes into the ETag. The page leaves its CSRF token
+    out (``g.csrf_deferred``) and the layout fetches a fresh one from
+    ``/csrf-token``, so a copy reused after a 304 never posts an expired
+    token.
+
+    Place it under the access decorators so they still run first.
+    """
+    def decorator(f):
+        @wraps(f)
+        def wrapped(*args, **kwargs):
+            g.csrf_deferred = True
+
+            # Pending flash messages must be rendered, not revalidated
+            if request.method != "GET" or session.get("_flashes"):
+                return f(*args, **kwargs)
+
+            try:
+                data_values, last_modified = _data_state(sources, kwargs)
+                extra_value = extra() if extra else None
+                etag = _etag(data_values, extra_value)
+
+            except Exception as e:
+                current_app.logger.warning(f"conditional_get skipped: {e}")
+                return f(*args, **kwargs)
+
+            if request.if_none_match.contains_weak(etag):
+                response = current_app.response_class(status=304)
+                _set_validators(response, etag, last_modified)
+                return response
+
+            response = make_response(f(*args, **kwargs))
+
+            if response.status_code == 200:
+                _set_validators(response, etag, last_modified)
+
+            return response
+        return wrapped
+    return decorator
@@ -5,15 +5,27 @@ from datetime import datetime
 class UserNotification(db.Model):
     __tablename__ = "user_notification"
 
+    # Backs the per-user feed and the retention purge
+    __table_args__ = (
+        db.Index(
+            "ix_user_notification_user_deleted_created",
+            "user_id",
+            "is_deleted",
+            "created_at"
+        ),
+    )
+
     id = db.Column(
         db.Integer,
         primary_key=True
     )
 
+    # NULL = broadcast notification shared by every user;
+    # per-user read/deleted state lives in UserNotificationState
     user_id = db.Column(
         db.Integer,
         db.ForeignKey("tbl_users.id"),
-        nullable=False
+        nullable=True
     )
 
     # Disease notification
@@ -50,4 +62,98 @@ class UserNotification(db.Model):
     created_at = db.Column(
         db.DateTime,
         default=datetime.utcnow
-    )
\ No newline at end of file
+    )
+
+
+class UserNotificationState(db.Model):
+    """
+    Sparse per-user state for broadcast notifications.
+
+    A row only exists once a user has read or deleted a broadcast.
+    """
+    __tablename__ = "user_notification_state"
+
+    __table_args__ = (
+        db.UniqueConstraint(
+            "notification_id",
+            "user_id",
+            name="uq_notification_state_user"
+        ),
+    )
+
+    id = db.Column(
+        db.Integer,
+        primary_key=True
+    )
+
+    notification_id = db.Column(
+        db.Integer,
+        db.ForeignKey(
+            "user_notification.id",
+            ondelete="CASCADE"
+        ),
+        nullable=False
+    )
+
+    user_id = db.Column(
+        db.Integer,
+        db.ForeignKey(
+            "tbl_users.id",
+            ondelete="CASCADE"
+        ),
+        nullable=False
+    )
+
+    is_read = db.Column(
+        db.Boolean,
+        default=False
+    )
+
+    is_deleted = db.Column(
+        db.Boolean,
+        default=False
+    )
+
+    updated_at = db.Column(
+        db.DateTime,
+        default=datetime.utcnow,
+        onupdate=datetime.utcnow
+    )
+
+
+class NotificationCounter(db.Model):
+    """
+    Cached unread-badge counters, one row per user.
+
+    The row with user_id = 0 (BROADCAST_COUNTER_ID) holds the total number
+    of broadcast notifications in ``unread_count``. For users,
+    ``unread_count`` is the number of unread personal notifications and
+    ``broadcast_seen`` the number of broadcasts they have read or deleted.
+    """
+    __tablename__ = "user_notification_counter"
+
+    BROADCAST_COUNTER_ID = 0
+
+    user_id = db.Column(
+        db.Integer,
+        primary_key=True,
+        autoincrement=False
+    )
+
+    unread_count = db.Column(
+        db.Integer,
+        nullable=False,
+        default=0
+    )
+
+    broadcast_seen = db.Column(
+        db.Integer,
+        nullable=False,
+        default=0
+    )
+
+    updated_at = db.Column(
+        db.DateTime,
+        default=datetime.utcnow,
+        onupdate=datetime.utcnow
+    )
@@ -8,4 +8,6 @@ from .field_crop import FieldCropTable
 from .growth_stage import GrowthStageTable
 from .crop_monitoring import CropMonitoringTable
 from .treatment_histories import TreatmentHistoryTable
+from .disease_risk import DiseaseRiskTable
+from .schema_version import SchemaVersionTable
 __all__ = ["UserTable", "RoleTable", "PermissionTable"]
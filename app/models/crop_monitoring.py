@@ -7,6 +7,16 @@ class CropMonitoringTable(db.Model):
 
     __tablename__ = "tbl_crop_monitorings"
 
+    # Backs the "latest monitoring per field crop" lookup
+    __table_args__ = (
+        db.Index(
+            "ix_crop_monitorings_crop_date_id",
+            "field_crop_id",
+            "monitoring_date",
+            "id"
+        ),
+    )
+
     # =========================================================
     # PRIMARY KEY
     # =========================================================
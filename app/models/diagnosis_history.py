@@ -5,6 +5,10 @@ from app.models.user import UserTable  # Assuming you have a UserTable
 
 class DiagnosisHistoryTable(db.Model):
     __tablename__ = 'tbl_diagnosis_history'
+    # Per-user history, newest first
+    __table_args__ = (
+        db.Index('ix_diagnosis_history_user_created', 'user_id', 'created_at'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     # Information about the user performing the diagnosis
     user_id = db.Column(db.Integer, db.ForeignKey('tbl_users.id'), nullable=True)  # FK to users
@@ -0,0 +1,115 @@
+from datetime import datetime
+
+from extensions import db
+
+
+class DiseaseRiskTable(db.Model):
+    """
+    Precomputed outbreak risk per province and disease.
+
+    Rebuilt by DiseaseRiskService.compute_all() from cached weather and
+    recent diagnosis counts; the dashboard only reads it.
+    """
+
+    __tablename__ = "tbl_disease_risks"
+
+    __table_args__ = (
+        db.UniqueConstraint(
+            "province",
+            "disease_id",
+            name="uq_disease_risk_province_disease"
+        ),
+        db.Index(
+            "ix_disease_risks_province_score",
+            "province",
+            "risk_score"
+        ),
+    )
+
+    # =========================================================
+    # PRIMARY KEY
+    # =========================================================
+
+    id = db.Column(
+        db.Integer,
+        primary_key=True
+    )
+
+    # =========================================================
+    # KEYS
+    # =========================================================
+
+    # Lower-cased province / city name
+    province = db.Column(
+        db.String(100),
+        nullable=False
+    )
+
+    disease_id = db.Column(
+        db.Integer,
+        db.ForeignKey(
+            "tbl_diseases.id",
+            ondelete="CASCADE"
+        ),
+        nullable=False
+    )
+
+    # =========================================================
+    # RISK
+    # =========================================================
+
+    risk_score = db.Column(
+        db.SmallInteger,
+        nullable=False,
+        default=0
+    )
+
+    risk_level = db.Column(
+        db.String(10),
+        nullable=False,
+        default="Low"
+    )
+
+    humidity = db.Column(
+        db.Float,
+        nullable=True
+    )
+
+    temperature = db.Column(
+        db.Float,
+        nullable=True
+    )
+
+    recent_cases = db.Column(
+        db.Integer,
+        nullable=False,
+        default=0
+    )
+
+    computed_at = db.Column(
+        db.DateTime,
+        default=datetime.utcnow,
+        nullable=False
+    )
+
+    # =========================================================
+    # RELATIONSHIPS
+    # =========================================================
+
+    disease = db.relationship(
+        "DiseaseTable",
+        lazy="joined"
+    )
+
+    # =========================================================
+    # REPRESENTATION
+    # =========================================================
+
+    def __repr__(self):
+
+        return (
+            f"<DiseaseRisk "
+            f"province={self.province} "
+            f"disease_id={self.disease_id} "
+            f"score={self.risk_score}>"
+        )
@@ -2,6 +2,16 @@ from datetime import datetime
 from extensions import db
 class FarmTable(db.Model):
     __tablename__ = "tbl_farms"
+
+    # Ownership scope filter (OwnershipScope)
+    __table_args__ = (
+        db.Index(
+            "ix_farms_user_id",
+            "user_id",
+            "id"
+        ),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(
         db.Integer,
@@ -6,6 +6,14 @@ class FieldTable(db.Model):
 
     __tablename__ = "tbl_fields"
 
+    # Field -> farm join of the ownership scope
+    __table_args__ = (
+        db.Index(
+            "ix_fields_farm_id",
+            "farm_id"
+        ),
+    )
+
     id = db.Column(
         db.Integer,
         primary_key=True
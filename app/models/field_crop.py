@@ -3,6 +3,15 @@ from extensions import db
 
 class FieldCropTable(db.Model):
     __tablename__ = "tbl_field_crops"
+
+    # Field crop -> field join of the ownership scope
+    __table_args__ = (
+        db.Index(
+            "ix_field_crops_field_id",
+            "field_id"
+        ),
+    )
+
     # =========================================================
     # PRIMARY KEY
     # =========================================================
@@ -6,6 +6,10 @@ from app.models.diseases import DiseaseTable
 
 class PreventionTable(db.Model):
     __tablename__ ="tbl_preventions"
+    # Active preventions of a disease by priority
+    __table_args__ = (
+        db.Index("ix_preventions_disease_active_priority", "disease_id", "is_active", "priority"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     disease_id = db.Column(db.Integer, db.ForeignKey(DiseaseTable.id), nullable=False)
@@ -20,7 +20,11 @@ class RuleConditionsTable(db.Model):
     symptom = db.relationship("SymptomsTable",backref=db.backref("rule_conditions",cascade="all, delete-orphan"))
 
     # ===================== CONSTRAINTS =====================
-    __table_args__ = (db.UniqueConstraint("rule_id","symptom_id",name="uq_rule_symptom"),)
+    __table_args__ = (
+        db.UniqueConstraint("rule_id","symptom_id",name="uq_rule_symptom"),
+        # Active conditions of a rule (inference engine)
+        db.Index("ix_rule_conditions_rule_active","rule_id","is_active"),
+    )
 
     def __repr__(self) -> str:
         return f"<RuleCondition id={self.id} rule={self.rule_id} symptom={self.symptom_id}>"
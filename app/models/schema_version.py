@@ -0,0 +1,29 @@
+from datetime import datetime
+
+from extensions import db
+
+
+class SchemaVersionTable(db.Model):
+    """One row per applied schema migration (see SchemaService)."""
+
+    __tablename__ = "tbl_schema_versions"
+
+    version = db.Column(
+        db.Integer,
+        primary_key=True,
+        autoincrement=False
+    )
+
+    name = db.Column(
+        db.String(150),
+        nullable=False
+    )
+
+    applied_at = db.Column(
+        db.DateTime,
+        default=datetime.utcnow,
+        nullable=False
+    )
+
+    def __repr__(self) -> str:
+        return f"<SchemaVersion {self.version} {self.name}>"
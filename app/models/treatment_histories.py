@@ -6,6 +6,14 @@ from extensions import db
 class TreatmentHistoryTable(db.Model):
     __tablename__ = "tbl_treatment_histories"
 
+    # Treatment history -> monitoring join of the ownership scope
+    __table_args__ = (
+        db.Index(
+            "ix_treatment_histories_monitoring_id",
+            "monitoring_id"
+        ),
+    )
+
     id = db.Column(
         db.Integer,
         primary_key=True
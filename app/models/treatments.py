@@ -5,6 +5,10 @@ from extensions import db
 from app.models.diseases import DiseaseTable
 class TreatmentTable(db.Model):
     __tablename__ ="tbl_treatments"
+    # Active treatments of a disease by priority
+    __table_args__ = (
+        db.Index("ix_treatments_disease_active_priority", "disease_id", "is_active", "priority"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     treatment_type = db.Column(db.String(200), nullable=False)
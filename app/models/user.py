@@ -60,8 +60,21 @@ class UserTable(UserMixin, db.Model):
         return any(role.name == role_name for role in self.roles)
     
     def get_permission_code(self) -> set[str]:
-        
-        return {perm.code for role in self.roles for perm in role.permissions}
+        # The user loader gives each request its own instance, so the set
+        # is built once per request however many checks the page makes
+        from app.services.metrics_service import metrics
+
+        codes = self.__dict__.get("_permission_codes")
+        if codes is not None:
+            metrics.inc("cache_hits_total", cache="rbac")
+            return codes
+
+        metrics.inc("cache_misses_total", cache="rbac")
+        codes = frozenset(
+            perm.code for role in self.roles for perm in role.permissions
+        )
+        self._permission_codes = codes
+        return codes
     
     def has_permission(self, permission_code: str) -> bool:
         return permission_code in self.get_permission_code()
@@ -1,4 +1,4 @@
-from flask import Blueprint, abort, current_app, render_template, redirect, request, url_for, flash, session
+from flask import Blueprint, Response, abort, current_app, jsonify, render_template, redirect, request, send_file, url_for, flash, session
 from flask_login import login_required, current_user
 from functools import wraps
 
@@ -8,6 +8,10 @@ from app.models.symptoms import SymptomsTable
 from app.models.diseases import DiseaseTable
 from app.services import diagnosis_service
 from app.services.diagnosis_service import DiagnosisService
+from app.services.symptom_catalogue_service import SymptomCatalogueService
+from app.services.metrics_service import metrics
+from app.services.request_profiler import request_profiler
+from app.services.slow_query_log import slow_query_log
 from app.models.user import UserTable
 from app.models.rules import RulesTable
 from app.services.user_service import UserService
@@ -17,6 +21,7 @@ from werkzeug.security import check_password_hash, generate_password_hash
 from app.forms.user_forms import UserEditForm, UserProfileForm
 from app.models.role import RoleTable
 from app.decorators.access import role_required, permission_required
+from decorators import require_admin
 
 admin_bp = Blueprint("admin", __name__, url_prefix="/admin", template_folder="../../templates")
 service = DiagnosisService()
@@ -219,28 +224,10 @@ def diagnosis_input():
     # return render_template("diagnosis_page/index.html", form=form, user=current_user)
     try:
         form = DiagnosisForm()
-        # Get all active symptoms
-        symptoms = SymptomsTable.query.filter_by(is_active=True).all()
-        # WTForms choices (for validation)
-        form.symptoms.choices = [(s.id, s.symptom_name) for s in symptoms]
-    
-        # Group symptoms by type
-        grouped_symptoms = {
-            "Grain(គ្រាប់)": [],
-            "Leaf(ស្លឹក)": [],
-            "Root(ឬស)": [],
-            "Stem(ដើម)": []
-        }
-    
-        for s in symptoms:
-            if s.symptom_group == "Grain(គ្រាប់)":
-                grouped_symptoms["Grain(គ្រាប់)"].append(s)
-            elif s.symptom_group == "Leaf(ស្លឹក)":
-                grouped_symptoms["Leaf(ស្លឹក)"].append(s)
-            elif s.symptom_group == "Root(ឬស)":
-                grouped_symptoms["Root(ឬស)"].append(s)
-            elif s.symptom_group == "Stem(ដើម)":
-                grouped_symptoms["Stem(ដើម)"].append(s)
+        # WTForms choices (for validation) and symptoms by group,
+        # cached until the knowledge base changes
+        form.symptoms.choices = SymptomCatalogueService.choices()
+        grouped_symptoms = SymptomCatalogueService.grouped()
     
         #Handle form submit
         if form.validate_on_submit():
@@ -386,3 +373,53 @@ def disease_prevention(disease_id):
         preventions=preventions,
         user=current_user
     )
+# ---------- METRICS ----------
+@admin_bp.route("/metrics")
+def metrics_endpoint():
+    """Prometheus text (default) or JSON (?format=json), summed over workers."""
+    # Admin session, or a scraper using Authorization: Bearer METRICS_TOKEN
+    if not metrics.authorized():
+        abort(403)
+
+    aggregated = metrics.aggregate()
+
+    if request.args.get("format") == "json":
+        return jsonify(metrics.to_json(aggregated))
+
+    return Response(
+        metrics.to_prometheus(aggregated),
+        mimetype="text/plain; version=0.0.4"
+    )
+# ---------- PROFILES ----------
+@admin_bp.route("/profiles")
+@login_required
+@require_admin()
+def profiles():
+    """Recent on-demand request profiles (X-Profile: 1 / ?_profile=1)."""
+    return render_template(
+        "admin_page/profiles.html",
+        profiles=request_profiler.recent(),
+        keep=request_profiler.keep,
+        user=current_user
+    )
+@admin_bp.route("/profiles/<profile_id>.prof")
+@login_required
+@require_admin()
+def download_profile(profile_id):
+    path = request_profiler.prof_path(profile_id)
+    if path is None:
+        abort(404)
+    return send_file(path, as_attachment=True, download_name=f"{profile_id}.prof")
+# ---------- SLOW QUERIES ----------
+@admin_bp.route("/slow-queries")
+@login_required
+@require_admin()
+def slow_queries():
+    """Logged slow statements grouped by shape, highest total time first."""
+    return render_template(
+        "admin_page/slow_queries.html",
+        queries=slow_query_log.summary(),
+        threshold_ms=slow_query_log.threshold_ms,
+        log_params=slow_query_log.log_params,
+        user=current_user
+    )
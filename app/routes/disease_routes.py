@@ -22,6 +22,7 @@ from app.forms.diseases_forms import (
 )
 from app.models.diseases import DiseaseTable
 from app.services.disease_service import DiseaseService
+from app.services.upload_store import UPLOAD_LIMITS, upload_limit
 from decorators import require_admin, active_user_required
 from app.decorators.access import role_required, permission_required
 
@@ -121,6 +122,7 @@ def detail(disease_id: int):
 
 # ------------------ CREATE ------------------
 @disease_bp.route("/create", methods=["GET", "POST"])
+@upload_limit(UPLOAD_LIMITS["static/images/diseases"])
 @login_required
 @require_admin()
 def create():
@@ -151,6 +153,7 @@ def create():
 
 # ------------------ EDIT ------------------
 @disease_bp.route("/<int:disease_id>/edit", methods=["GET", "POST"])
+@upload_limit(UPLOAD_LIMITS["static/images/diseases"])
 @login_required
 @require_admin()
 def edit(disease_id: int):
@@ -1,4 +1,3 @@
-from collections import defaultdict
 from venv import logger
 from flask import Blueprint, abort, current_app, render_template, redirect, request, url_for, flash, session
 from flask_login import login_required, current_user, logout_user
@@ -10,6 +9,7 @@ from app.services import diagnosis_service
 from app.services.rule_condition_service import RuleConditionService
 from app.services.rule_service import RuleService
 from app.services.symptom_service import SymptomService
+from app.services.symptom_catalogue_service import SymptomCatalogueService
 from extensions import db
 from werkzeug.security import check_password_hash, generate_password_hash
 from app.decorators.access import role_required, permission_required
@@ -30,16 +30,7 @@ expert_bp = Blueprint(
 service = DiagnosisService()
 
 def get_grouped_symptoms():
-    symptoms = db.session.execute(
-        db.select(SymptomsTable).order_by(SymptomsTable.symptom_group)
-    ).scalars().all()
-
-    grouped = defaultdict(list)
-
-    for s in symptoms:
-        grouped[s.symptom_group].append((s.id, s.symptom_name))
-
-    return grouped
+    return SymptomCatalogueService.grouped_pairs()
 
 # ---------------- DASHBOARD ----------------
 @expert_bp.route("/dashboard")
@@ -202,10 +193,8 @@ def about():
 @permission_required("RUN_DIAGNOSIS")
 def diagnosis_input():
     form = DiagnosisForm()
-    # Get all active symptoms
-    symptoms = SymptomsTable.query.filter_by(is_active=True).all()
-    # Make sure IDs are integers
-    form.symptoms.choices = [(s.id, s.symptom_name) for s in symptoms]
+    # Active symptoms, cached until the knowledge base changes
+    form.symptoms.choices = SymptomCatalogueService.choices()
 
     if form.validate_on_submit():
         # Convert submitted data to integers
@@ -6,6 +6,7 @@ from werkzeug.datastructures import FileStorage
 
 from app.forms.prevention_form import PreventionCreateForm, PreventionEditForm, PreventionConfirmDeleteForm, disease_choices
 from app.services.prevention_service import PreventionService
+from app.services.upload_store import UPLOAD_LIMITS, upload_limit
 from app.models.diseases import DiseaseTable
 from app.decorators.access import role_required, permission_required
 
@@ -23,6 +24,7 @@ def index():
     return render_template("prevention_page/index.html", preventions=preventions)
 
 @prevention_bp.route("/create", methods=["GET", "POST"])
+@upload_limit(UPLOAD_LIMITS["static/images/preventions"])
 @login_required
 @role_required("Admin", "Expert")
 @permission_required("CREATE_PREVENTION")
@@ -49,6 +51,7 @@ def create():
     return render_template("prevention_page/create.html", form=form)
 
 @prevention_bp.route("/<int:id>/edit", methods=["GET", "POST"])
+@upload_limit(UPLOAD_LIMITS["static/images/preventions"])
 @login_required
 @role_required("Admin", "Expert")
 @permission_required("EDIT_PREVENTION")
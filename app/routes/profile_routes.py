@@ -11,6 +11,7 @@ from flask import (
 from flask_login import login_required, current_user
 
 from app.services.profile_service import ProfileService
+from app.services.upload_store import upload_limit
 
 from app.decorators.access import role_required, permission_required
 
@@ -146,6 +147,7 @@ def update():
     "/upload-image",
     methods=["POST"]
 )
+@upload_limit(ProfileService.MAX_FILE_SIZE)
 @login_required
 @role_required("Admin", "Expert")
 @permission_required("UPDATE_PROFILE")
@@ -1,4 +1,3 @@
-from collections import defaultdict
 from app.models.rule_conditions import RuleConditionsTable
 from extensions import db
 
@@ -15,6 +14,7 @@ from app.forms.rule_condition_form import (
 )
 from app.models.symptoms import SymptomsTable
 from app.services.rule_condition_service import RuleConditionService
+from app.services.symptom_catalogue_service import SymptomCatalogueService
 from app.decorators.access import role_required, permission_required
 rule_condition_bp = Blueprint("rule_condition",__name__,url_prefix="/admin/rule-conditions")
 
@@ -186,16 +186,7 @@ def toggle(id: int):
     return redirect(url_for("rule_condition.index"))
 
 def get_grouped_symptoms():
-    symptoms = db.session.execute(
-        db.select(SymptomsTable).order_by(SymptomsTable.symptom_group)
-    ).scalars().all()
-
-    grouped = defaultdict(list)
-
-    for s in symptoms:
-        grouped[s.symptom_group].append((s.id, s.symptom_name))
-
-    return grouped
+    return SymptomCatalogueService.grouped_pairs()
 
 
 @rule_condition_bp.route("/preview", methods=["GET", "POST"])
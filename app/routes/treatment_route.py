@@ -6,6 +6,7 @@ from werkzeug.datastructures import FileStorage
 
 from app.forms.treatment_forms import TreatmentCreateForm, TreatmentEditForm, TreatmentConfirmDeleteForm, disease_choices
 from app.services.treatment_service import TreatmentService
+from app.services.upload_store import UPLOAD_LIMITS, upload_limit
 from app.models.diseases import DiseaseTable
 
 from app.decorators.access import role_required, permission_required
@@ -24,6 +25,7 @@ def index():
     return render_template("treatment_page/index.html", treatments=treatments)
 
 @treatment_bp.route("/create", methods=["GET", "POST"])
+@upload_limit(UPLOAD_LIMITS["static/images/treatments"])
 @login_required
 @role_required("Admin", "Expert")
 @permission_required("CREATE_TREATMENT")
@@ -50,6 +52,7 @@ def create():
     return render_template("treatment_page/create.html", form=form)
 
 @treatment_bp.route("/<int:id>/edit", methods=["GET", "POST"])
+@upload_limit(UPLOAD_LIMITS["static/images/treatments"])
 @login_required
 @role_required("Admin", "Expert")
 @permission_required("EDIT_TREATMENT")
@@ -25,8 +25,8 @@ from app.models.treatments import (
     TreatmentTable
 )
 
-from app.models.crop_monitoring import (
-    CropMonitoringTable
+from app.services.crop_monitoring_service import (
+    CropMonitoringService
 )
 
 from app.forms.treatment_history_form import (
@@ -94,7 +94,8 @@ def index():
             monitoring_id=monitoring_id,
             diagnosis_history_id=diagnosis_history_id,
             status=status if status else None,
-            search=search if search else None
+            search=search if search else None,
+            user_id=current_user.id
         )
 
 
@@ -259,12 +260,9 @@ def create():
         # Verify Monitoring
         # ----------------------------------------------------
 
-        monitoring = (
-            CropMonitoringTable.query
-            .filter_by(
-                id=monitoring_id
-            )
-            .first()
+        monitoring = CropMonitoringService.get_by_id(
+            monitoring_id,
+            current_user.id
         )
 
         if not monitoring:
@@ -465,7 +463,10 @@ def detail(id):
         # Get History
         # ----------------------------------------------------
 
-        history = TreatmentHistoryService.get_by_id(id)
+        history = TreatmentHistoryService.get_by_id(
+            id,
+            user_id=current_user.id
+        )
 
 
         if not history:
@@ -527,7 +528,10 @@ def edit(id):
         # GET HISTORY
         # =====================================================
 
-        history = TreatmentHistoryService.get_by_id(id)
+        history = TreatmentHistoryService.get_by_id(
+            id,
+            user_id=current_user.id
+        )
 
         if not history:
 
@@ -654,7 +658,10 @@ def delete(id):
 
     try:
 
-        history = TreatmentHistoryService.get_by_id(id)
+        history = TreatmentHistoryService.get_by_id(
+            id,
+            user_id=current_user.id
+        )
 
         if not history:
 
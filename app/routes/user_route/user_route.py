@@ -1,7 +1,9 @@
 from datetime import datetime, timedelta
 import json
+import queue
+import time
 from venv import logger
-from flask import Blueprint, abort, jsonify, render_template, redirect, request, session, url_for, flash
+from flask import Blueprint, Response, abort, current_app, jsonify, render_template, redirect, request, session, stream_with_context, url_for, flash
 from flask_login import login_required, current_user, logout_user
 from functools import wraps
 from werkzeug.security import check_password_hash, generate_password_hash
@@ -9,6 +11,7 @@ from sqlalchemy import text
 
 from app import services
 from app.decorators.access import role_required, permission_required
+from app.decorators.conditional import conditional_get, kb_state
 from app.forms.diagnosis_form import DiagnosisForm
 from app.forms.diseases_forms import DiseaseSearchForm
 from app.forms.user_forms import DeleteAccountForm, UserEditForm, UserProfileForm
@@ -20,10 +23,12 @@ from app.models.diseases import DiseaseTable
 from app.models.farm import FarmTable
 from app.models.field import FieldTable
 from app.models.field_crop import FieldCropTable
+from app.models.preventions import PreventionTable
 from app.models.role import RoleTable
 from app.models.rule_conditions import RuleConditionsTable
 from app.models.rules import RulesTable
 from app.models.symptoms import SymptomsTable
+from app.models.treatments import TreatmentTable
 from app.models.user import UserTable
 from app.services.disease_service import DiseaseService
 from app.services.user_service import UserService
@@ -41,6 +46,12 @@ from app.models.symptoms import SymptomsTable
 from app.services.diagnosis_service import DiagnosisService
 from app.services.farm_dashboard_service import FarmDashboardService
 from app.services.crop_monitoring_service import (CropMonitoringService)
+from app.services.ownership_scope import OwnershipScope
+from app.services.notification_service import NotificationService
+from app.services.notification_broker import notification_broker
+from app.services.disease_risk_service import DiseaseRiskService
+from app.services.fragment_cache import Deferred
+from app.services.symptom_catalogue_service import SymptomCatalogueService
 # from app.models.field_crop import FieldCropTable
 # from app.models.diagnosis_history import DiagnosisHistoryTable
 
@@ -93,12 +104,25 @@ def dashboard():
         # WEATHER
         # =====================================================
 
+        # With prefetch on, every province is refreshed in the
+        # background (see WeatherService.init_app) and the
+        # dashboard only reads from memory
+
+        prefetch = current_app.config.get("WEATHER_PREFETCH_ENABLED")
+
+        get_weather = (
+            WeatherService.get_cached_weather
+            if prefetch
+            else WeatherService.get_weather
+        )
+
         selected_city_id = request.args.get("city_id")
 
         if selected_city_id:
 
-            selected_city_weather = WeatherService.get_weather(
-                selected_city_id
+            selected_city_weather = (
+                get_weather(selected_city_id)
+                or WeatherService.unavailable(selected_city_id)
             )
 
         if form.validate_on_submit():
@@ -107,8 +131,9 @@ def dashboard():
 
             if selected_city_name:
 
-                selected_city_weather = WeatherService.get_weather(
-                    selected_city_name
+                selected_city_weather = (
+                    get_weather(selected_city_name)
+                    or WeatherService.unavailable(selected_city_name)
                 )
 
 
@@ -176,19 +201,10 @@ def dashboard():
         field_crops = (
             db.session.scalars(
 
-                db.select(FieldCropTable)
-
-                .where(
-
-                    FieldCropTable.field.has(
-
-                        FieldCropTable.field.property
-                        .mapper.class_.farm.has(
-
-                            user_id=current_user.id
-
-                        )
-                    )
+                OwnershipScope.apply(
+                    db.select(FieldCropTable),
+                    FieldCropTable,
+                    current_user.id
                 )
 
                 .order_by(
@@ -260,26 +276,10 @@ def dashboard():
         recent_monitorings = (
             db.session.scalars(
 
-                db.select(CropMonitoringTable)
-
-                .join(
-                    CropMonitoringTable.field_crop
-                )
-
-                .where(
-
-                    CropMonitoringTable.field_crop.has(
-
-                        FieldCropTable.field.has(
-
-                            FieldCropTable.field.property
-                            .mapper.class_.farm.has(
-
-                                user_id=current_user.id
-
-                            )
-                        )
-                    )
+                OwnershipScope.apply(
+                    db.select(CropMonitoringTable),
+                    CropMonitoringTable,
+                    current_user.id
                 )
 
                 .order_by(
@@ -316,6 +316,23 @@ def dashboard():
             )
             .all()
         )
+        # =====================================================
+        # OUTBREAK RISK
+        # Precomputed by `flask risk compute`; one indexed read
+        # =====================================================
+
+        risk_province = next(
+            (farm.province for farm in farms if farm.province),
+            selected_city_weather["city"]
+            if selected_city_weather
+            and not selected_city_weather.get("unavailable")
+            else None
+        )
+
+        disease_risks = DiseaseRiskService.get_for_province(
+            risk_province
+        )
+
         # =====================================================
         # RETURN DASHBOARD
         # =====================================================
@@ -328,6 +345,11 @@ def dashboard():
 
             farms=farms,
 
+            # Outbreak risk
+            risk_province=risk_province,
+
+            disease_risks=disease_risks,
+
             # Disease
             disease=default_disease,
 
@@ -438,6 +460,10 @@ def dashboard():
 
             farm_statistics=farm_statistics,
 
+            risk_province=None,
+
+            disease_risks=[],
+
             field_crops=[],
 
             total_field_crops=0,
@@ -989,29 +1015,10 @@ def diagnosis_input():
 
             session["farm_id"] = farm_id
 
-        # Get all active symptoms
-        symptoms = SymptomsTable.query.filter_by(is_active=True).all()
-
-        # WTForms choices (for validation)
-        form.symptoms.choices = [(s.id, s.symptom_name) for s in symptoms]
-
-        # Group symptoms by type
-        grouped_symptoms = {
-            "Grain(គ្រាប់)": [],
-            "Leaf(ស្លឹក)": [],
-            "Root(ឬស)": [],
-            "Stem(ដើម)": []
-        }
-
-        for s in symptoms:
-            if s.symptom_group == "Grain(គ្រាប់)":
-                grouped_symptoms["Grain(គ្រាប់)"].append(s)
-            elif s.symptom_group == "Leaf(ស្លឹក)":
-                grouped_symptoms["Leaf(ស្លឹក)"].append(s)
-            elif s.symptom_group == "Root(ឬស)":
-                grouped_symptoms["Root(ឬស)"].append(s)
-            elif s.symptom_group == "Stem(ដើម)":
-                grouped_symptoms["Stem(ដើម)"].append(s)
+        # WTForms choices (for validation) and symptoms by group,
+        # cached until the knowledge base changes
+        form.symptoms.choices = SymptomCatalogueService.choices()
+        grouped_symptoms = SymptomCatalogueService.grouped()
 
         #Handle form submit
         if form.validate_on_submit():
@@ -1778,6 +1785,11 @@ def diagnosis_explain(diagnosis_id):
 @login_required
 @role_required("User")
 @permission_required("RUN_DIAGNOSIS")
+@conditional_get(lambda disease_id: [
+    kb_state(DiseaseTable, DiseaseTable.id == disease_id),
+    kb_state(TreatmentTable, TreatmentTable.disease_id == disease_id),
+    kb_state(PreventionTable, PreventionTable.disease_id == disease_id)
+])
 def disease_treatment(disease_id):
 
     try:
@@ -1790,10 +1802,11 @@ def disease_treatment(disease_id):
         )
         # =====================================================
         # 2. GET RECOMMENDED TREATMENT
+        # Deferred: skipped when the page fragment is cached
         # =====================================================
 
-        recommended_treatment = (
-            DiagnosisService.recommend_treatment(
+        recommended_treatment = Deferred(
+            lambda: DiagnosisService.recommend_treatment(
                 disease_id
             )
         )
@@ -1803,8 +1816,8 @@ def disease_treatment(disease_id):
         # 3. GET ALL TREATMENTS
         # =====================================================
 
-        treatments = (
-            DiagnosisService.treatment_disease(
+        treatments = Deferred(
+            lambda: DiagnosisService.treatment_disease(
                 disease_id
             )
         )
@@ -1814,8 +1827,8 @@ def disease_treatment(disease_id):
         # 4. GET PREVENTIONS
         # =====================================================
 
-        preventions = (
-            DiagnosisService.prevention_disease(
+        preventions = Deferred(
+            lambda: DiagnosisService.prevention_disease(
                 disease_id
             )
         )
@@ -1862,9 +1875,13 @@ def disease_treatment(disease_id):
 @login_required
 @role_required("User")
 @permission_required("RUN_DIAGNOSIS")
+@conditional_get(lambda disease_id: [
+    kb_state(DiseaseTable, DiseaseTable.id == disease_id),
+    kb_state(PreventionTable, PreventionTable.disease_id == disease_id)
+])
 def disease_prevention(disease_id):
     disease = DiseaseTable.query.get_or_404(disease_id)
-    preventions = diagnosis_service.prevention_disease(disease_id)
+    preventions = Deferred(lambda: diagnosis_service.prevention_disease(disease_id))
     return render_template("user_page/prevention.html", disease=disease, preventions=preventions, user=current_user)
 
 # @user_bp.route("/diagnosisPrint/<int:disease_id>")
@@ -2184,6 +2201,7 @@ def diagnosis_print(disease_id):
 @user_bp.route("/diseases/show")
 @login_required
 @role_required("User")
+@conditional_get(lambda: [kb_state(DiseaseTable)])
 def disease_index():
     """List all diseases with search functionality"""
     try:
@@ -2194,13 +2212,14 @@ def disease_index():
         disease_type = request.args.get("disease_type", "").strip()
         severity_level = request.args.get("severity_level", "").strip()
         
-        diseases = DiseaseService.search_diseases(
+        # Deferred: skipped when the page fragment is cached
+        diseases = Deferred(lambda: DiseaseService.search_diseases(
             disease_name=disease_name if disease_name else None,
             disease_type=disease_type if disease_type else None,
             severity_level=severity_level if severity_level else None,
             page=page,
             per_page=10
-        )
+        ))
         
         return render_template(
             "user_page/disease_index.html",
@@ -2216,30 +2235,21 @@ def disease_index():
 @user_bp.route("/information")
 @login_required
 @role_required("User")
+@conditional_get()
 def new_information():
-    current_date = datetime.now().strftime("%d-%m-%Y %H:%M")
-    return render_template('user_page/new_information.html', current_date = current_date)
+    # Static page; the "Updated" date is filled in by the browser
+    return render_template('user_page/new_information.html')
 
 @user_bp.route("/information/<int:id>")
 @login_required
 @role_required("User")
+@conditional_get(lambda id: [kb_state(DiseaseTable, DiseaseTable.id == id)])
 def disease_detail(id):
     disease = DiseaseTable.query.get_or_404(id)
 
-    seven_days_ago = datetime.utcnow() - timedelta(days=7)
-
-    new_diseases = DiseaseTable.query.filter(
-        DiseaseTable.created_at >= seven_days_ago,
-        DiseaseTable.is_active == True
-    ).order_by(DiseaseTable.created_at.desc()).all()
-
-    new_diseases_count = len(new_diseases)
-
     return render_template(
         "user_page/disease_detail.html",
-        disease=disease,
-        new_diseases=new_diseases,
-        new_diseases_count=new_diseases_count
+        disease=disease
     )
 
 # @user_bp.route("/notifications")
@@ -2247,297 +2257,241 @@ def disease_detail(id):
 # @role_required("User")
 # def get_notifications():
 
-#     user_id = current_user.id
 
-#     results = db.session.query(DiseaseTable).all()
+# =========================================================
+# GET ALL NOTIFICATIONS
+# =========================================================
 
-#     data = []
+@user_bp.route(
+    "/notifications",
+    methods=["GET"]
+)
+@login_required
+@role_required("User")
+def get_notifications():
 
-#     for d in results:
-#         notif = UserNotification.query.filter_by(
-#             user_id=user_id,
-#             disease_id=d.id,
-#             is_deleted=True
-#         ).first()
+    user_id = current_user.id
 
-#         if not notif:
-#             data.append({
-#                 "id": d.id,
-#                 "name": d.disease_name,
-#                 "time": d.created_at.isoformat()
-#             })
+    try:
 
-#     return jsonify(data)
+        # =================================================
+        # PAGINATION
+        # ?limit=<n>&cursor=<last id of previous page>
+        # =================================================
 
-# @user_bp.route("/notifications/read/<int:id>", methods=["POST"])
-# @login_required
-# @role_required("User")
-# def read_notification(id):
-#     user_id = current_user.id
-
-#     notif = UserNotification.query.filter_by(
-#         user_id=user_id,
-#         disease_id=id
-#     ).first()
-
-#     if not notif:
-#         notif = UserNotification(
-#             user_id=user_id,
-#             disease_id=id,
-#             is_read=True
-#         )
-#         db.session.add(notif)
-#     else:
-#         notif.is_read = True
+        limit = request.args.get("limit", type=int)
 
-#     db.session.commit()
-#     return "", 204
+        cursor = request.args.get("cursor", type=int)
 
-# @user_bp.route("/notifications/delete-all", methods=["POST"])
-# @login_required
-# @role_required("User")
-# def delete_all_notifications():
-#     try:
-#         user_id = current_user.id
-#         UserNotification.query.filter_by(user_id=user_id).update({
-#             "is_deleted": True
-#         })
-#         db.session.commit()
-#         return "", 204
-#     except Exception as e:
-#         db.session.rollback()
-#         print("[ERROR delete_all_notifications]:", e)
-#         return {"error": "Failed to delete"}, 500
-    
-# @user_bp.route("/notifications/delete/<int:id>", methods=["POST"])
-# @login_required
-# @role_required("User")
-# def delete_notification(id):
+        data, next_cursor = NotificationService.get_feed(
+            user_id,
+            limit=limit,
+            cursor=cursor
+        )
 
-#     user_id = current_user.id
+        response = jsonify(data)
 
-#     notif = UserNotification.query.filter_by(
-#         user_id=user_id,
-#         disease_id=id
-#     ).first()
+        if next_cursor:
+            response.headers["X-Next-Cursor"] = str(next_cursor)
 
-#     if not notif:
-#         notif = UserNotification(
-#             user_id=user_id,
-#             disease_id=id,
-#             is_deleted=True
-#         )
-#         db.session.add(notif)
-#     else:
-#         notif.is_deleted = True
+        return response, 200
 
-#     db.session.commit()
-#     return "", 204
 
+    except Exception as e:
+
+        db.session.rollback()
+
+        print(
+            "[ERROR get_notifications]:",
+            e
+        )
+
+        return jsonify({
+
+            "error":
+                "Failed to load notifications."
+
+        }), 500
 
-# =========================================================
-# GET ALL NOTIFICATIONS
-# =========================================================
 
 # =========================================================
-# GET ALL NOTIFICATIONS
+# NOTIFICATION STREAM (SERVER-SENT EVENTS)
 # =========================================================
 
 @user_bp.route(
-    "/notifications",
+    "/notifications/stream",
     methods=["GET"]
 )
 @login_required
 @role_required("User")
-def get_notifications():
-
-    user_id = current_user.id
+def notification_stream():
 
-    try:
-
-        notifications = (
-            UserNotification.query
-            .filter(
-                UserNotification.user_id == user_id,
-                UserNotification.is_deleted == False
-            )
-            .order_by(
-                UserNotification.created_at.desc()
-            )
-            .all()
-        )
-
-        data = []
-
-        for notif in notifications:
-
-            # =================================================
-            # DISEASE NOTIFICATION
-            # =================================================
+    # 204 tells EventSource to stop reconnecting; the page keeps polling
+    if not current_app.config.get("NOTIFICATION_STREAM_ENABLED", False):
+        return "", 204
 
-            if notif.category == "disease":
+    user_id = current_user.id
 
-                disease = DiseaseTable.query.get(
-                    notif.disease_id
-                )
+    # Close the stream periodically so a worker is never held forever;
+    # EventSource reconnects automatically
+    timeout = current_app.config.get("NOTIFICATION_STREAM_TIMEOUT", 30)
 
-                if not disease:
-                    continue
+    heartbeat = 15
 
-                data.append({
+    # Release the DB connection before the long-lived response
+    db.session.remove()
 
-                    "id": notif.id,
+    def generate():
 
-                    "notification_id": notif.id,
+        q = notification_broker.subscribe(user_id)
 
-                    "category": "disease",
+        deadline = time.monotonic() + timeout
 
-                    "reference_id": disease.id,
+        try:
 
-                    "title": disease.disease_name,
+            yield "retry: 5000\n\n"
 
-                    "name": disease.disease_name,
+            while time.monotonic() < deadline:
 
-                    "message":
-                        "New disease information",
+                try:
 
-                    "type": "warning",
+                    event = q.get(timeout=heartbeat)
 
-                    "icon": "bi-virus",
+                except queue.Empty:
 
-                    "is_read": notif.is_read,
+                    yield ": keep-alive\n\n"
 
-                    "time":
-                        notif.created_at.isoformat()
-                        if notif.created_at
-                        else None
-                })
+                    continue
 
+                yield (
+                    "event: notification\n"
+                    f"data: {json.dumps(event)}\n\n"
+                )
 
-            # =================================================
-            # CROP MONITORING NOTIFICATION
-            # =================================================
+        finally:
 
-            elif notif.category == "crop_monitoring":
+            notification_broker.unsubscribe(user_id, q)
 
-                monitoring = (
-                    CropMonitoringTable.query.get(
-                        notif.monitoring_id
-                    )
-                )
+    response = Response(
+        stream_with_context(generate()),
+        mimetype="text/event-stream"
+    )
 
-                if not monitoring:
-                    continue
+    response.headers["Cache-Control"] = "no-cache"
 
+    # Disable proxy buffering (nginx)
+    response.headers["X-Accel-Buffering"] = "no"
 
-                # ---------------------------------------------
-                # DEFAULT
-                # ---------------------------------------------
+    return response
 
-                notification_type = "info"
 
-                icon = "bi-info-circle"
+# =========================================================
+# UNREAD NOTIFICATION COUNT
+# =========================================================
 
+@user_bp.route(
+    "/notifications/unread-count",
+    methods=["GET"]
+)
+@login_required
+@role_required("User")
+def unread_notification_count():
 
-                # ---------------------------------------------
-                # DISEASE
-                # ---------------------------------------------
+    try:
 
-                if monitoring.disease_status in [
-                    "Detected",
-                    "Severe"
-                ]:
+        unread = NotificationService.get_unread_count(
+            current_user.id
+        )
 
-                    notification_type = "critical"
+        return jsonify({
 
-                    icon = (
-                        "bi-exclamation-triangle-fill"
-                    )
+            "unread": unread
 
+        }), 200
 
-                # ---------------------------------------------
-                # PEST
-                # ---------------------------------------------
 
-                elif monitoring.pest_status in [
-                    "Medium",
-                    "High"
-                ]:
+    except Exception as e:
 
-                    notification_type = "warning"
+        db.session.rollback()
 
-                    icon = "bi-bug-fill"
+        print(
+            "[ERROR unread_notification_count]:",
+            e
+        )
 
+        return jsonify({
 
-                # ---------------------------------------------
-                # PLANT CONDITION
-                # ---------------------------------------------
+            "error":
+                "Failed to load unread count."
 
-                elif monitoring.plant_condition in [
-                    "Poor",
-                    "Critical"
-                ]:
+        }), 500
 
-                    notification_type = "warning"
 
-                    icon = "bi-heart-pulse-fill"
+# =========================================================
+# READ NOTIFICATION
+# =========================================================
 
+@user_bp.route(
+    "/notifications/read/<int:id>",
+    methods=["POST"]
+)
+@login_required
+@role_required("User")
+def read_notification(id):
 
-                # ---------------------------------------------
-                # TITLE
-                # ---------------------------------------------
+    user_id = current_user.id
 
-                title = "Crop Monitoring Alert"
+    try:
 
+        if not NotificationService.mark_read(user_id, id):
 
-                # ---------------------------------------------
-                # MESSAGE
-                # ---------------------------------------------
+            return jsonify({
 
-                message = (
-                    f"Plant condition: "
-                    f"{monitoring.plant_condition or 'N/A'}"
-                )
+                "error":
+                    "Notification not found."
 
+            }), 404
 
-                # ---------------------------------------------
-                # DATA
-                # ---------------------------------------------
 
-                data.append({
+        return "", 204
 
-                    "id": notif.id,
 
-                    "notification_id": notif.id,
+    except Exception as e:
 
-                    "category":
-                        "crop_monitoring",
+        db.session.rollback()
 
-                    "reference_id":
-                        monitoring.id,
+        print(
+            "[ERROR read_notification]:",
+            e
+        )
 
-                    "title": title,
+        return jsonify({
 
-                    "name": title,
+            "error":
+                "Failed to mark notification as read."
 
-                    "message": message,
+        }), 500
 
-                    "type":
-                        notification_type,
 
-                    "icon": icon,
+# =========================================================
+# READ ALL / READ RANGE
+# =========================================================
 
-                    "is_read":
-                        notif.is_read,
+@user_bp.route(
+    "/notifications/read-all",
+    methods=["POST"]
+)
+@login_required
+@role_required("User")
+def read_all_notifications():
 
-                    "time":
-                        notif.created_at.isoformat()
-                        if notif.created_at
-                        else None
-                })
+    try:
 
+        NotificationService.mark_all_read(
+            current_user.id
+        )
 
-        return jsonify(data), 200
+        return "", 204
 
 
     except Exception as e:
@@ -2545,75 +2499,77 @@ def get_notifications():
         db.session.rollback()
 
         print(
-            "[ERROR get_notifications]:",
+            "[ERROR read_all_notifications]:",
             e
         )
 
         return jsonify({
 
             "error":
-                "Failed to load notifications."
+                "Failed to mark notifications as read."
 
         }), 500
 
 
-# =========================================================
-# READ NOTIFICATION
-# =========================================================
-
 @user_bp.route(
-    "/notifications/read/<int:id>",
+    "/notifications/read-range",
     methods=["POST"]
 )
 @login_required
 @role_required("User")
-def read_notification(id):
+def read_notification_range():
 
-    user_id = current_user.id
+    # Inclusive id range, e.g. the first and last id of the loaded page
+    payload = request.get_json(silent=True) or request.form.to_dict()
 
     try:
 
-        notif = (
-            UserNotification.query
-            .filter_by(
-                id=id,
-                user_id=user_id,
-                is_deleted=False
-            )
-            .first()
-        )
+        start_id = payload.get("start_id")
 
+        end_id = payload.get("end_id")
 
-        if not notif:
+        if start_id in (None, "") and end_id in (None, ""):
 
             return jsonify({
 
                 "error":
-                    "Notification not found."
-
-            }), 404
+                    "start_id or end_id is required."
 
+            }), 400
 
-        notif.is_read = True
 
-        db.session.commit()
+        NotificationService.mark_range_read(
+            current_user.id,
+            start_id=int(start_id) if start_id not in (None, "") else None,
+            end_id=int(end_id) if end_id not in (None, "") else None
+        )
 
         return "", 204
 
 
+    except (TypeError, ValueError):
+
+        return jsonify({
+
+            "error":
+                "Invalid notification range."
+
+        }), 400
+
+
     except Exception as e:
 
         db.session.rollback()
 
         print(
-            "[ERROR read_notification]:",
+            "[ERROR read_notification_range]:",
             e
         )
 
         return jsonify({
 
             "error":
-                "Failed to mark notification as read."
+                "Failed to mark notifications as read."
 
         }), 500
 
@@ -2634,17 +2590,8 @@ def delete_notification(id):
 
     try:
 
-        notif = (
-            UserNotification.query
-            .filter_by(
-                id=id,
-                user_id=user_id
-            )
-            .first()
-        )
-
-
-        if not notif:
+        # Soft delete
+        if not NotificationService.delete(user_id, id):
 
             return jsonify({
 
@@ -2654,11 +2601,6 @@ def delete_notification(id):
             }), 404
 
 
-        # Soft delete
-        notif.is_deleted = True
-
-        db.session.commit()
-
         return "", 204
 
 
@@ -2695,20 +2637,7 @@ def delete_all_notifications():
 
     try:
 
-        (
-            UserNotification.query
-            .filter_by(
-                user_id=user_id,
-                is_deleted=False
-            )
-            .update({
-
-                "is_deleted": True
-
-            })
-        )
-
-        db.session.commit()
+        NotificationService.delete_all(user_id)
 
         return "", 204
 
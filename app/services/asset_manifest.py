@@ -0,0 +1,145 @@
+import hashlib
+import os
+import threading
+
+from flask import request, url_for
+
+
+# ================= CONFIG ================= #
+HASH_LENGTH = 12
+CHUNK_SIZE = 64 * 1024
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+class AssetManifest:
+    """
+    Build-free fingerprinting for files under ``app/static``.
+
+    At startup every static file is hashed into a manifest. A
+    ``url_defaults`` hook then adds ``?v=<hash>`` to every
+    ``url_for('static', filename=...)`` call, so existing templates get
+    fingerprinted URLs unchanged, and responses whose ``v`` matches the
+    current hash are sent with a far-future ``Cache-Control: immutable``.
+    Files added later (e.g. uploads) are hashed on first use.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._hashes = {}
+        self._version = None
+        self._static_folder = None
+        self._check_mtime = False
+
+    def init_app(self, app):
+        self._static_folder = app.static_folder
+        # In debug mode files change while the server runs
+        self._check_mtime = app.debug
+
+        self.build()
+
+        app.url_defaults(self._add_version)
+        app.after_request(self._add_cache_headers)
+        app.add_template_global(self.static_url)
+
+    # ---------- MANIFEST ---------- #
+
+    def build(self) -> int:
+        """Hash every file under the static folder; returns the file count."""
+        hashes = {}
+
+        for root, _, files in os.walk(self._static_folder):
+            for name in files:
+                path = os.path.join(root, name)
+                rel = os.path.relpath(path, self._static_folder).replace(os.sep, "/")
+                try:
+                    hashes[rel] = (os.path.getmtime(path), self._hash_file(path))
+                except OSError:
+                    continue
+
+        with self._lock:
+            self._hashes = hashes
+            self._version = None
+
+        return len(hashes)
+
+    @staticmethod
+    def _hash_file(path) -> str:
+        digest = hashlib.md5()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+                digest.update(chunk)
+        return digest.hexdigest()[:HASH_LENGTH]
+
+    def get(self, filename):
+        """Fingerprint of a static file, or None if it does not exist."""
+        if not filename or not self._static_folder:
+            return None
+
+        filename = filename.lstrip("/")
+
+        with self._lock:
+            entry = self._hashes.get(filename)
+
+        if entry and not self._check_mtime:
+            return entry[1]
+
+        path = os.path.join(self._static_folder, filename)
+        try:
+            mtime = os.path.getmtime(path)
+        except OSError:
+            return None
+
+        if entry and entry[0] == mtime:
+            return entry[1]
+
+        try:
+            fingerprint = self._hash_file(path)
+        except OSError:
+            return None
+
+        with self._lock:
+            self._hashes[filename] = (mtime, fingerprint)
+            self._version = None
+
+        return fingerprint
+
+    @property
+    def version(self) -> str:
+        """Digest of the whole manifest; changes whenever any asset does."""
+        with self._lock:
+            if self._version is None:
+                digest = hashlib.md5()
+                for filename, (_, fingerprint) in sorted(self._hashes.items()):
+                    digest.update(f"{filename}:{fingerprint};".encode())
+                self._version = digest.hexdigest()[:HASH_LENGTH]
+
+            return self._version
+
+    # ---------- FLASK HOOKS ---------- #
+
+    def _add_version(self, endpoint, values):
+        if endpoint != "static" or "v" in values:
+            return
+
+        fingerprint = self.get(values.get("filename"))
+        if fingerprint:
+            values["v"] = fingerprint
+
+    def _add_cache_headers(self, response):
+        if request.endpoint != "static" or response.status_code != 200:
+            return response
+
+        version = request.args.get("v")
+        filename = (request.view_args or {}).get("filename")
+
+        if version and version == self.get(filename):
+            response.headers["Cache-Control"] = IMMUTABLE_CACHE_CONTROL
+
+        return response
+
+    def static_url(self, filename) -> str:
+        """Template helper equivalent to ``url_for('static', filename=...)``."""
+        return url_for("static", filename=filename)
+
+
+asset_manifest = AssetManifest()
@@ -1,11 +1,14 @@
 import csv
 import json
 import os
+import time
 from datetime import datetime
 from flask import request, current_app, has_request_context
 from flask_login import current_user
 import pytz
 
+from app.services.metrics_service import metrics
+
 AUDIT_FILENAME = "audit_log.csv"
 AUDIT_FOLDERNAME = "audit_logs"
 CAMBODIA_TZ = pytz.timezone("Asia/Phnom_Penh")
@@ -95,6 +98,7 @@ def log_audit(action: str,
     before_json = json.dumps(before_data, ensure_ascii=False) if before_data else ""
     after_json = json.dumps(after_data, ensure_ascii=False) if after_data else ""
 
+    started = time.perf_counter()
     try:
         with open(file_path, mode="a", newline="", encoding="utf-8") as f:
             writer = csv.writer(f, quoting=csv.QUOTE_ALL)
@@ -111,5 +115,9 @@ def log_audit(action: str,
                 ip_address,
                 user_agent
             ])
+        metrics.inc("audit_writes_total", result="ok")
     except Exception as e:
+        metrics.inc("audit_writes_total", result="error")
         print(f"[AUDIT LOG ERROR] {str(e)}")
+
+    metrics.observe("audit_write_ms", (time.perf_counter() - started) * 1000)
@@ -1,11 +1,11 @@
 from flask_login import current_user
+from sqlalchemy.orm import aliased
 
-from app.models.UserNotification import UserNotification
-from app.models.field import FieldTable
 from extensions import db
 
 from app.models.crop_monitoring import CropMonitoringTable
-from app.models.field_crop import FieldCropTable
+from app.services.notification_service import NotificationService
+from app.services.ownership_scope import OwnershipScope
 
 
 class CropMonitoringService:
@@ -21,18 +21,12 @@ class CropMonitoringService:
 
             monitorings = db.session.scalars(
 
-                db.select(
-                    CropMonitoringTable
-                )
-                .join(
-                    CropMonitoringTable.field_crop
-                )
-                .where(
-                    FieldCropTable.field.has(
-                        FieldCropTable.field.property.mapper.class_.farm.has(
-                            user_id=user_id
-                        )
-                    )
+                OwnershipScope.apply(
+                    db.select(
+                        CropMonitoringTable
+                    ),
+                    CropMonitoringTable,
+                    user_id
                 )
                 .order_by(
                     CropMonitoringTable.monitoring_date.desc(),
@@ -67,20 +61,15 @@ class CropMonitoringService:
 
             monitoring = db.session.scalar(
 
-                db.select(
-                    CropMonitoringTable
-                )
-                .join(
-                    CropMonitoringTable.field_crop
+                OwnershipScope.apply(
+                    db.select(
+                        CropMonitoringTable
+                    ),
+                    CropMonitoringTable,
+                    user_id
                 )
                 .where(
-                    CropMonitoringTable.id == monitoring_id,
-
-                    FieldCropTable.field.has(
-                        FieldCropTable.field.property.mapper.class_.farm.has(
-                            user_id=user_id
-                        )
-                    )
+                    CropMonitoringTable.id == monitoring_id
                 )
 
             )
@@ -148,24 +137,15 @@ class CropMonitoringService:
             # CREATE NOTIFICATION
             # =====================================================
 
-            notification = UserNotification(
+            notification = NotificationService.create_for_user(
                 user_id=current_user.id,
 
-                # Crop monitoring notification
-                disease_id=None,
-
-                # ✅ Now monitoring.id exists
-                monitoring_id=monitoring.id,
-
                 category="crop_monitoring",
 
-                is_read=False,
-
-                is_deleted=False
+                # ✅ Now monitoring.id exists
+                monitoring_id=monitoring.id
             )
 
-            db.session.add(notification)
-
             # =====================================================
             # SAVE BOTH
             # =====================================================
@@ -178,6 +158,12 @@ class CropMonitoringService:
 
             db.session.refresh(monitoring)
 
+            # =====================================================
+            # PUSH TO CONNECTED CLIENTS (SSE)
+            # =====================================================
+
+            NotificationService.publish_created(notification)
+
             print(
                 "Notification created:",
                 notification.id,
@@ -275,6 +261,10 @@ class CropMonitoringService:
 
         try:
 
+            NotificationService.delete_for_source(
+                monitoring_id=monitoring.id
+            )
+
             db.session.delete(
                 monitoring
             )
@@ -292,38 +282,97 @@ class CropMonitoringService:
             )
 
             raise
+    # =========================================================
+    # LATEST MONITORING PER FIELD CROP
+    # =========================================================
+
     @staticmethod
     def get_latest_by_field_crop(user_id):
+
         try:
-            # Get all monitoring records
-            monitorings = CropMonitoringTable.query \
-                .join(
-                    FieldCropTable,
-                    CropMonitoringTable.field_crop_id == FieldCropTable.id
-                ) \
-                .join(
-                    FieldTable,
-                    FieldCropTable.field_id == FieldTable.id
-                ) \
-                .filter(
-                    FieldTable.farm.has(user_id=user_id)
-                ) \
-                .order_by(
-                    CropMonitoringTable.field_crop_id.asc(),
-                    CropMonitoringTable.monitoring_date.desc(),
-                    CropMonitoringTable.id.desc()
-                ).all()
 
-            latest = {}
+            dialect = db.session.get_bind().dialect.name
 
-            for monitoring in monitorings:
+            # =====================================================
+            # MYSQL 8: ROW_NUMBER() OVER (PARTITION BY field_crop_id)
+            # =====================================================
 
-                crop_id = monitoring.field_crop_id
+            if dialect == "mysql":
+
+                ranked = (
+                    OwnershipScope.apply(
+                        db.select(
+                            CropMonitoringTable.id.label("id"),
+
+                            db.func.row_number().over(
+                                partition_by=CropMonitoringTable.field_crop_id,
+                                order_by=(
+                                    CropMonitoringTable.monitoring_date.desc(),
+                                    CropMonitoringTable.id.desc()
+                                )
+                            ).label("row_num")
+                        ),
+                        CropMonitoringTable,
+                        user_id
+                    )
+                    .subquery()
+                )
 
-                if crop_id not in latest:
-                    latest[crop_id] = monitoring
+                stmt = (
+                    db.select(
+                        CropMonitoringTable
+                    )
+                    .join(
+                        ranked,
+                        CropMonitoringTable.id == ranked.c.id
+                    )
+                    .where(
+                        ranked.c.row_num == 1
+                    )
+                )
+
+            # =====================================================
+            # SQLITE / OTHERS: CORRELATED LATEST-ID SUBQUERY
+            # =====================================================
+
+            else:
 
-            return list(latest.values())
+                newer = aliased(CropMonitoringTable)
+
+                latest_id = (
+                    db.select(
+                        newer.id
+                    )
+                    .where(
+                        newer.field_crop_id == CropMonitoringTable.field_crop_id
+                    )
+                    .order_by(
+                        newer.monitoring_date.desc(),
+                        newer.id.desc()
+                    )
+                    .limit(1)
+                    .correlate(CropMonitoringTable)
+                    .scalar_subquery()
+                )
+
+                stmt = (
+                    OwnershipScope.apply(
+                        db.select(
+                            CropMonitoringTable
+                        ),
+                        CropMonitoringTable,
+                        user_id
+                    )
+                    .where(
+                        CropMonitoringTable.id == latest_id
+                    )
+                )
+
+            return db.session.scalars(
+                stmt.order_by(
+                    CropMonitoringTable.field_crop_id.asc()
+                )
+            ).all()
 
         except Exception as e:
 
@@ -333,4 +382,4 @@ class CropMonitoringService:
                 f"CropMonitoringService.get_latest_by_field_crop() error: {e}"
             )
 
-            raise
\ No newline at end of file
+            raise
@@ -1,3 +1,4 @@
+import time
 from typing import Dict, List, Set, Tuple
 from app.models.rules import RulesTable
 from app.models.diseases import DiseaseTable
@@ -6,6 +7,7 @@ from app.models.symptoms import SymptomsTable
 from app.models.treatments import TreatmentTable
 from app.models.preventions import PreventionTable
 from app.services.audit_service import log_audit
+from app.services.metrics_service import metrics
 
 class DiagnosisService:
     """
@@ -26,6 +28,7 @@ class DiagnosisService:
             rule_trace: applied rules per disease
             skipped_rules: rules not satisfied
         """
+        started = time.perf_counter()
         facts: Set[int] = set(selected_symptom_ids or [])
         conclusions: Dict[int, dict] = {}
         rule_trace: Dict[str, List[dict]] = {}
@@ -90,6 +93,8 @@ class DiagnosisService:
             sorted(conclusions.items(), key=lambda item: item[1]['certainty'], reverse=True)
         )
 
+        metrics.observe("diagnosis_inference_ms", (time.perf_counter() - started) * 1000)
+
         # ==========================
         # Audit Log
         # ==========================
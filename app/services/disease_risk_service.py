@@ -0,0 +1,266 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, insert
+
+from app.models.crop_monitoring import CropMonitoringTable
+from app.models.diagnosis_history import DiagnosisHistoryTable
+from app.models.disease_risk import DiseaseRiskTable
+from app.models.diseases import DiseaseTable
+from app.models.farm import FarmTable
+from app.services.ownership_scope import OwnershipScope
+from app.services.weather_service import WeatherService
+from extensions import db
+
+
+# ================= CONFIG ================= #
+RECENT_CASE_DAYS = 14
+CASES_FOR_FULL_SCORE = 5
+
+# Every farm province (farm_forms.CAMBODIA_PROVINCES) and how its weather is
+# looked up: an OpenWeatherMap city id, or the provincial capital's name
+# where no id is known (WeatherService accepts both)
+PROVINCE_WEATHER = {
+    "Banteay Meanchey": 1821391,
+    "Battambang": 1820855,
+    "Kampong Cham": 1821383,
+    "Kampong Chhnang": "Kampong Chhnang",
+    "Kampong Speu": 1821381,
+    "Kampong Thom": 1821378,
+    "Kampot": 1821407,
+    "Kandal": 1821358,
+    "Kep": 1821388,
+    "Koh Kong": "Koh Kong",
+    "Kratie": 1821400,
+    "Mondulkiri": 1821387,
+    "Oddar Meanchey": 1821389,
+    "Pailin": "Pailin",
+    "Phnom Penh": 1821305,
+    "Preah Sihanouk": 1820848,
+    "Preah Vihear": "Tbeng Meanchey",
+    "Pursat": 1821390,
+    "Prey Veng": 1821399,
+    "Ratanakiri": 1821386,
+    "Siem Reap": 1821479,
+    "Stung Treng": 1821385,
+    "Svay Rieng": 1821384,
+    "Takeo": 1821416,
+    "Tboung Khmum": "Suong",
+}
+
+# Weather city names that differ from the province they are in
+PROVINCE_ALIASES = {
+    "sihanoukville": "preah sihanouk",
+    "tbeng meanchey": "preah vihear",
+    "suong": "tboung khmum",
+}
+
+SEVERITY_WEIGHTS = {
+    "low": 0.6,
+    "medium": 0.8,
+    "high": 1.0,
+    "critical": 1.0
+}
+
+
+# ================= HELPERS ================= #
+
+def weather_factor(humidity, temperature) -> float:
+    """
+    0..1 favourability of the weather for fungal/bacterial rice diseases:
+    humid (above ~60%) and warm (22-32°C is optimal).
+    """
+    if humidity is None or temperature is None:
+        return 0.0
+
+    humidity_factor = min(max((humidity - 60) / 35, 0.0), 1.0)
+
+    if 22 <= temperature <= 32:
+        temp_factor = 1.0
+    elif temperature < 22:
+        temp_factor = max((temperature - 15) / 7, 0.0)
+    else:
+        temp_factor = max((38 - temperature) / 6, 0.0)
+
+    return humidity_factor * temp_factor
+
+
+def risk_score(humidity, temperature, recent_cases, severity_level) -> int:
+    """0..100 risk: 60% weather, 40% recent cases, scaled by severity."""
+    case_factor = min(recent_cases / CASES_FOR_FULL_SCORE, 1.0)
+    weight = SEVERITY_WEIGHTS.get((severity_level or "").strip().lower(), 0.8)
+
+    score = weight * (
+        0.6 * weather_factor(humidity, temperature) + 0.4 * case_factor
+    )
+    return int(round(score * 100))
+
+
+def province_key(name):
+    """Lower-cased province a farm province or weather city name belongs to."""
+    if not name:
+        return None
+    key = name.strip().lower()
+    return PROVINCE_ALIASES.get(key, key)
+
+
+def risk_level(score: int) -> str:
+    if score >= 70:
+        return "High"
+    if score >= 40:
+        return "Medium"
+    return "Low"
+
+
+# ================= SERVICE ================= #
+
+class DiseaseRiskService:
+
+    # ---------- COMPUTE (scheduled job) ---------- #
+
+    @staticmethod
+    def _recent_cases(since) -> dict:
+        """
+        Recent diagnoses per (province, disease_id), each counted once.
+
+        A diagnosis made from a crop monitoring belongs to the province of
+        that monitoring's farm. One made without a monitoring is only
+        counted when every farm of the user is in the same province;
+        otherwise it cannot be placed and is left out.
+        """
+        province = func.lower(FarmTable.province)
+
+        monitored = db.session.query(
+            province,
+            DiagnosisHistoryTable.disease_id,
+            func.count(DiagnosisHistoryTable.id)
+        ).join(
+            CropMonitoringTable,
+            CropMonitoringTable.id == DiagnosisHistoryTable.monitoring_id
+        )
+        for parent, onclause in OwnershipScope.path(CropMonitoringTable):
+            monitored = monitored.join(parent, onclause)
+
+        monitored = monitored.filter(
+            DiagnosisHistoryTable.created_at >= since,
+            FarmTable.province.isnot(None)
+        ).group_by(province, DiagnosisHistoryTable.disease_id)
+
+        # Users whose farms all lie in one province
+        home = (
+            db.session.query(
+                FarmTable.user_id.label("user_id"),
+                func.min(province).label("province")
+            )
+            .filter(FarmTable.province.isnot(None))
+            .group_by(FarmTable.user_id)
+            .having(func.count(func.distinct(province)) == 1)
+            .subquery()
+        )
+
+        unmonitored = (
+            db.session.query(
+                home.c.province,
+                DiagnosisHistoryTable.disease_id,
+                func.count(DiagnosisHistoryTable.id)
+            )
+            .join(home, home.c.user_id == DiagnosisHistoryTable.user_id)
+            .filter(
+                DiagnosisHistoryTable.created_at >= since,
+                DiagnosisHistoryTable.monitoring_id.is_(None)
+            )
+            .group_by(home.c.province, DiagnosisHistoryTable.disease_id)
+        )
+
+        cases = {}
+        for name, disease_id, count in monitored.all() + unmonitored.all():
+            key = (province_key(name), disease_id)
+            cases[key] = cases.get(key, 0) + count
+
+        return cases
+
+    @staticmethod
+    def compute_all(provinces=None) -> int:
+        """
+        Rebuild tbl_disease_risks for every province and active disease.
+
+        Args:
+            provinces: {province name: weather city id or name}
+                (default: PROVINCE_WEATHER, which covers every farm
+                province); weather comes from WeatherService's cache,
+                falling back to one upstream call per province.
+
+        Returns:
+            Number of risk rows written
+        """
+        provinces = PROVINCE_WEATHER if provinces is None else provinces
+        since = datetime.utcnow() - timedelta(days=RECENT_CASE_DAYS)
+        now = datetime.utcnow()
+
+        try:
+            diseases = DiseaseTable.query.filter_by(is_active=True).all()
+
+            # Two grouped queries, whatever the number of diagnoses
+            cases = DiseaseRiskService._recent_cases(since)
+
+            rows = []
+
+            for name, weather_id in provinces.items():
+                province = province_key(name)
+
+                weather = WeatherService.get_weather(weather_id) or {}
+                humidity = weather.get("humidity")
+                temperature = weather.get("temperature")
+
+                for disease in diseases:
+                    recent = cases.get((province, disease.id), 0)
+                    score = risk_score(
+                        humidity, temperature, recent, disease.severity_level
+                    )
+
+                    rows.append({
+                        "province": province,
+                        "disease_id": disease.id,
+                        "risk_score": score,
+                        "risk_level": risk_level(score),
+                        "humidity": humidity,
+                        "temperature": temperature,
+                        "recent_cases": recent,
+                        "computed_at": now
+                    })
+
+            # Swap the whole table in one transaction
+            DiseaseRiskTable.query.delete(synchronize_session=False)
+            if rows:
+                db.session.execute(insert(DiseaseRiskTable), rows)
+            db.session.commit()
+
+            return len(rows)
+
+        except Exception as e:
+            db.session.rollback()
+            print(f"DiseaseRiskService.compute_all() error: {e}")
+            raise
+
+    # ---------- READ ---------- #
+
+    @staticmethod
+    def get_for_province(province, limit=5):
+        """Top risks for a province, highest first (one indexed read)."""
+        if not province:
+            return []
+
+        try:
+            return (
+                DiseaseRiskTable.query
+                .filter(
+                    DiseaseRiskTable.province == province_key(province)
+                )
+                .order_by(DiseaseRiskTable.risk_score.desc())
+                .limit(limit)
+                .all()
+            )
+
+        except Exception as e:
+            db.session.rollback()
+            print(f"DiseaseRiskService.get_for_province() error: {e}")
+            return []
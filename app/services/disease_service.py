@@ -1,6 +1,4 @@
 from typing import Optional, List
-from app.models.UserNotification import UserNotification
-from app.models.user import UserTable
 from extensions import db
 from app.models.diseases import DiseaseTable
 from sqlalchemy.exc import SQLAlchemyError
@@ -9,6 +7,9 @@ from werkzeug.utils import secure_filename
 import os
 
 from app.services.audit_service import log_audit
+from app.services.upload_store import UploadStore
+from app.services.fragment_cache import fragment_cache
+from app.services.notification_service import NotificationService
 
 # ================= CONFIG ================= #
 ALLOWED_EXTENSIONS = {"png", "jpg", "jpeg", "gif"}
@@ -21,20 +22,12 @@ def allowed_file(filename: str) -> bool:
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
 def save_image(image_file) -> str:
-    """Save image to UPLOAD_FOLDER and return filename."""
-    filename = secure_filename(image_file.filename)
-    save_path = os.path.join(current_app.root_path, UPLOAD_FOLDER)
-    os.makedirs(save_path, exist_ok=True)
-    image_file.save(os.path.join(save_path, filename))
-    return filename
+    """Save image to UPLOAD_FOLDER under its content hash and return filename."""
+    return UploadStore.save(image_file, UPLOAD_FOLDER)
 
 def delete_image(filename: str):
-    """Delete image from UPLOAD_FOLDER."""
-    if not filename:
-        return
-    file_path = os.path.join(current_app.root_path, UPLOAD_FOLDER, filename)
-    if os.path.exists(file_path):
-        os.remove(file_path)
+    """Delete image from UPLOAD_FOLDER once no row references it."""
+    UploadStore.delete(filename, UPLOAD_FOLDER)
 
 # ================= SERVICE ================= #
 
@@ -120,43 +113,22 @@ class DiseaseService:
             print("Disease created:", disease.id)
 
             # ==========================================
-            # 3. Get all users
+            # 3. Broadcast notification
+            # One row shared by all users; per-user
+            # read/deleted state is stored on demand
             # ==========================================
-            users = UserTable.query.all()
-
-            print("Total users:", len(users))
-
-            # ==========================================
-            # 4. Create notification for ALL users
-            # ==========================================
-            for user in users:
-
-                notification = UserNotification(
-                    user_id=user.id,
-                    disease_id=disease.id,
-                    monitoring_id=None,
-                    category="disease",
-                    is_read=False,
-                    is_deleted=False
-                )
-
-                # IMPORTANT:
-                # Add notification INSIDE the loop
-                db.session.add(notification)
-
-                print(
-                    f"Notification created "
-                    f"for user {user.id}, "
-                    f"disease {disease.id}"
-                )
+            notification = NotificationService.create_broadcast(disease.id)
 
             # ==========================================
-            # 5. Commit disease + notifications
+            # 4. Commit disease + notification
             # ==========================================
             db.session.commit()
+            fragment_cache.bump()
+
+            NotificationService.publish_created(notification)
 
             # ==========================================
-            # 6. Audit log
+            # 5. Audit log
             # ==========================================
             log_audit(
                 "CREATE",
@@ -215,16 +187,14 @@ class DiseaseService:
             "is_active": disease.is_active
         }
 
-        # Handle image upload
-        old_image = disease.image  # store old image name for potential delete
+        # Handle image upload; the old file is only deleted after commit
+        old_image = disease.image
+        new_image = None
         if image_file and hasattr(image_file, 'filename') and image_file.filename:
-            if image_file:
-                if not allowed_file(image_file.filename):
-                    raise ValueError("Invalid image format. Allowed: png, jpg, jpeg, gif")
-                new_filename = save_image(image_file)
-                disease.image = new_filename
-                if old_image:
-                    delete_image(old_image)
+            if not allowed_file(image_file.filename):
+                raise ValueError("Invalid image format. Allowed: png, jpg, jpeg, gif")
+            new_image = save_image(image_file)
+            disease.image = new_image
 
         # Update fields
         disease.disease_name = data.get("disease_name", disease.disease_name)
@@ -239,17 +209,25 @@ class DiseaseService:
             DiseaseTable.disease_name == disease.disease_name
         ).first()
         if duplicate:
+            db.session.rollback()
+            if new_image:
+                delete_image(new_image)
             raise ValueError("Another disease with this name already exists.")
 
         try:
             db.session.commit()
+            fragment_cache.bump()
         except SQLAlchemyError as e:
             db.session.rollback()
-            if image_file:
-                delete_image(disease.image)
-                disease.image = old_image
+            # Delete newly uploaded image; the row keeps the old one
+            if new_image:
+                delete_image(new_image)
             raise ValueError(f"Database error: {str(e)}")
 
+        # Delete old image
+        if new_image and old_image:
+            delete_image(old_image)
+
         # Snapshot after
         after_data = {
             "disease_name": disease.disease_name,
@@ -285,9 +263,11 @@ class DiseaseService:
         image_filename = disease.image  # store before delete
 
         try:
-            # ✅ Delete from DB
+            # ✅ Delete from DB (its notifications first, so badges stay right)
+            NotificationService.delete_for_source(disease_id=disease.id)
             db.session.delete(disease)
             db.session.commit()
+            fragment_cache.bump()
 
         except SQLAlchemyError as e:
             db.session.rollback()
@@ -1,8 +1,7 @@
 from extensions import db
 
 from app.models.field_crop import FieldCropTable
-from app.models.field import FieldTable
-from app.models.farm import FarmTable
+from app.services.ownership_scope import OwnershipScope
 
 
 class FieldCropService:
@@ -18,18 +17,10 @@ class FieldCropService:
 
             crops = db.session.scalars(
 
-                db.select(FieldCropTable)
-
-                .join(
-                    FieldCropTable.field
-                )
-
-                .join(
-                    FieldTable.farm
-                )
-
-                .where(
-                    FarmTable.user_id == user_id
+                OwnershipScope.apply(
+                    db.select(FieldCropTable),
+                    FieldCropTable,
+                    user_id
                 )
 
                 .order_by(
@@ -64,19 +55,14 @@ class FieldCropService:
 
             crop = db.session.scalar(
 
-                db.select(FieldCropTable)
-
-                .join(
-                    FieldCropTable.field
-                )
-
-                .join(
-                    FieldTable.farm
+                OwnershipScope.apply(
+                    db.select(FieldCropTable),
+                    FieldCropTable,
+                    user_id
                 )
 
                 .where(
-                    FieldCropTable.id == crop_id,
-                    FarmTable.user_id == user_id
+                    FieldCropTable.id == crop_id
                 )
 
             )
@@ -1,5 +1,6 @@
 from extensions import db
 from app.models.field import FieldTable
+from app.services.ownership_scope import OwnershipScope
 
 
 class FieldService:
@@ -15,11 +16,10 @@ class FieldService:
 
             fields = db.session.scalars(
 
-                db.select(FieldTable)
-                .where(
-                    FieldTable.farm.has(
-                        user_id=user_id
-                    )
+                OwnershipScope.apply(
+                    db.select(FieldTable),
+                    FieldTable,
+                    user_id
                 )
                 .order_by(
                     FieldTable.id.desc()
@@ -51,12 +51,13 @@ class FieldService:
 
             field = db.session.scalar(
 
-                db.select(FieldTable)
+                OwnershipScope.apply(
+                    db.select(FieldTable),
+                    FieldTable,
+                    user_id
+                )
                 .where(
-                    FieldTable.id == field_id,
-                    FieldTable.farm.has(
-                        user_id=user_id
-                    )
+                    FieldTable.id == field_id
                 )
 
             )
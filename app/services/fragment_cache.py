@@ -0,0 +1,222 @@
+import threading
+from collections import OrderedDict
+
+from flask import g, has_request_context, session
+from markupsafe import Markup
+from sqlalchemy import select
+
+from extensions import db
+from app.decorators.conditional import kb_state
+from app.models.diseases import DiseaseTable
+from app.models.preventions import PreventionTable
+from app.models.symptoms import SymptomsTable
+from app.models.treatments import TreatmentTable
+from app.services.image_service import accepts_webp
+
+
+# ================= CONFIG ================= #
+DEFAULT_MAX_BYTES = 16 * 1024 * 1024
+DEFAULT_MAX_ENTRIES = 2000
+# Tables the cached knowledge-base pages are rendered from
+KB_MODELS = (DiseaseTable, TreatmentTable, PreventionTable, SymptomsTable)
+
+
+class Deferred:
+    """
+    Lazy template value: ``factory()`` runs on first use only.
+
+    Views pass their queries wrapped in ``Deferred`` so that a cached
+    fragment, which never touches them, costs no database round trip.
+    """
+
+    __slots__ = ("_factory", "_value", "_resolved")
+
+    def __init__(self, factory):
+        self._factory = factory
+        self._value = None
+        self._resolved = False
+
+    def _resolve(self):
+        if not self._resolved:
+            self._value = self._factory()
+            self._resolved = True
+        return self._value
+
+    def __getattr__(self, name):
+        return getattr(self._resolve(), name)
+
+    def __iter__(self):
+        return iter(self._resolve())
+
+    def __len__(self):
+        return len(self._resolve())
+
+    def __bool__(self):
+        return bool(self._resolve())
+
+    def __str__(self):
+        return str(self._resolve())
+
+
+class FragmentCache:
+    """
+    In-process LRU cache of rendered template fragments.
+
+    Knowledge-base pages (diseases, treatments, preventions, symptoms) look
+    the same for every farmer using the same language, so their content
+    block is rendered once and reused. Keys combine the template, the
+    language, the WebP support used by ``image_url()``, the caller's
+    parts (e.g. query string) and the KB generation.
+
+    The generation is read from the database (``kb_state()`` of every KB
+    table, one query per request), so a write made by any worker changes
+    it for all of them. ``bump()`` is called after every knowledge-base
+    write to drop this worker's fragments straight away.
+    Memory use is capped by FRAGMENT_CACHE_MAX_BYTES (UTF-8 size of the
+    stored HTML) and FRAGMENT_CACHE_MAX_ENTRIES.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._state = None
+        self.max_bytes = DEFAULT_MAX_BYTES
+        self.max_entries = DEFAULT_MAX_ENTRIES
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def init_app(self, app):
+        self.max_bytes = app.config.get("FRAGMENT_CACHE_MAX_BYTES", DEFAULT_MAX_BYTES)
+        self.max_entries = app.config.get("FRAGMENT_CACHE_MAX_ENTRIES", DEFAULT_MAX_ENTRIES)
+
+        app.add_template_global(self.cached_fragment)
+
+    # ---------- GENERATION ---------- #
+
+    @staticmethod
+    def state_columns() -> list:
+        """``kb_state()`` selects of every KB table, in a fixed order."""
+        columns = []
+        for model in KB_MODELS:
+            columns.extend(kb_state(model))
+        return columns
+
+    def use_state(self, state: tuple):
+        """
+        Adopt ``state``, the values of ``state_columns()``, as this request's
+        generation. Lets ``conditional_get`` read it in its own query.
+        """
+        with self._lock:
+            if state != self._state:
+                self._clear_locked()
+                self._state = state
+
+        if has_request_context():
+            g._kb_generation = state
+
+        return state
+
+    def generation(self):
+        """Current KB generation; drops the cache when the database moved on."""
+        if has_request_context() and "_kb_generation" in g:
+            return g._kb_generation
+
+        state = db.session.execute(select(*self.state_columns())).one()
+        return self.use_state(tuple(state))
+
+    def bump(self) -> None:
+        """Invalidate every fragment after a knowledge-base write."""
+        with self._lock:
+            self._state = None
+            self._clear_locked()
+
+        if has_request_context():
+            g.pop("_kb_generation", None)
+
+    # ---------- LRU ---------- #
+
+    def _clear_locked(self):
+        self._entries.clear()
+        self._bytes = 0
+
+    def clear(self) -> None:
+        with self._lock:
+            self._clear_locked()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def set(self, key, html: str) -> None:
+        size = len(html.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+
+            self._entries[key] = (html, size)
+            self._bytes += size
+
+            while self._entries and (
+                self._bytes > self.max_bytes
+                or len(self._entries) > self.max_entries
+            ):
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self.evictions += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0
+            }
+
+    # ---------- TEMPLATE HELPER ---------- #
+
+    def key(self, template: str, *parts):
+        return (
+            template,
+            session.get("lang", "en"),
+            accepts_webp(),
+            self.generation(),
+            *parts
+        )
+
+    def cached_fragment(self, template: str, *parts, caller=None):
+        """
+        Jinja call block that caches its body::
+
+            {% call cached_fragment('user_page/disease_index.html', request.query_string) %}
+                ...
+            {% endcall %}
+        """
+        key = self.key(template, *parts)
+
+        html = self.get(key)
+        if html is None:
+            html = str(caller())
+            self.set(key, html)
+
+        return Markup(html)
+
+
+fragment_cache = FragmentCache()
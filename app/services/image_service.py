@@ -0,0 +1,169 @@
+import os
+import threading
+
+from flask import current_app, request, url_for
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # Pillow not installed: originals are served as-is
+    Image = None
+    ImageOps = None
+
+
+# ================= CONFIG ================= #
+# Longest side in pixels for each responsive variant
+VARIANTS = {
+    "thumb": 160,
+    "card": 480,
+    "full": 1280
+}
+VARIANT_DIR = "_variants"
+WEBP_QUALITY = 80
+JPEG_QUALITY = 82
+
+
+class ImageService:
+    """
+    Resized WebP/JPEG variants (thumb, card, full) of uploaded images.
+
+    Variants are written next to the original in a ``_variants`` folder,
+    e.g. ``images/diseases/_variants/blast.png.card.webp``. They are generated
+    at upload time and, for older uploads, lazily the first time a
+    template asks for them through ``image_url()``.
+    """
+
+    _known = {}
+    _failed = set()
+    _lock = threading.Lock()
+
+    # ---------- PATHS ---------- #
+
+    @staticmethod
+    def variant_path(original_path: str, size: str, ext: str) -> str:
+        folder, name = os.path.split(original_path)
+        return os.path.join(folder, VARIANT_DIR, f"{name}.{size}.{ext}")
+
+    # ---------- GENERATE / DELETE ---------- #
+
+    @staticmethod
+    def generate_variants(original_path: str) -> bool:
+        """
+        Write every size in VARIANTS as WebP and JPEG.
+
+        Returns False (and leaves the original alone) when Pillow is not
+        installed or the file cannot be decoded.
+        """
+        if Image is None or not os.path.isfile(original_path):
+            return False
+
+        try:
+            with Image.open(original_path) as img:
+                img = ImageOps.exif_transpose(img)
+                if img.mode not in ("RGB", "RGBA"):
+                    img = img.convert("RGBA" if "transparency" in img.info else "RGB")
+
+                os.makedirs(
+                    os.path.join(os.path.dirname(original_path), VARIANT_DIR),
+                    exist_ok=True
+                )
+
+                for size, max_side in VARIANTS.items():
+                    variant = img.copy()
+                    variant.thumbnail((max_side, max_side))
+
+                    variant.save(
+                        ImageService.variant_path(original_path, size, "webp"),
+                        "WEBP",
+                        quality=WEBP_QUALITY,
+                        method=4
+                    )
+
+                    # JPEG has no alpha channel
+                    if variant.mode == "RGBA":
+                        background = Image.new("RGB", variant.size, (255, 255, 255))
+                        background.paste(variant, mask=variant.split()[-1])
+                        variant = background
+
+                    variant.save(
+                        ImageService.variant_path(original_path, size, "jpg"),
+                        "JPEG",
+                        quality=JPEG_QUALITY,
+                        optimize=True,
+                        progressive=True
+                    )
+
+            with ImageService._lock:
+                ImageService._known[original_path] = True
+                ImageService._failed.discard(original_path)
+            return True
+
+        except Exception as e:
+            print(f"ImageService.generate_variants() error: {e}")
+            with ImageService._lock:
+                ImageService._failed.add(original_path)
+            return False
+
+    @staticmethod
+    def delete_variants(original_path: str) -> None:
+        """Remove every variant of an original image."""
+        for size in VARIANTS:
+            for ext in ("webp", "jpg"):
+                path = ImageService.variant_path(original_path, size, ext)
+                if os.path.exists(path):
+                    os.remove(path)
+
+        with ImageService._lock:
+            ImageService._known.pop(original_path, None)
+            ImageService._failed.discard(original_path)
+
+    # ---------- TEMPLATE HELPER ---------- #
+
+    @staticmethod
+    def _ensure_variants(original_path: str) -> bool:
+        with ImageService._lock:
+            if original_path in ImageService._known:
+                return ImageService._known[original_path]
+            if original_path in ImageService._failed:
+                return False
+
+        probe = ImageService.variant_path(original_path, "full", "jpg")
+        if os.path.exists(probe):
+            with ImageService._lock:
+                ImageService._known[original_path] = True
+            return True
+
+        # Older upload: build the variants once, on first request
+        return ImageService.generate_variants(original_path)
+
+
+def accepts_webp() -> bool:
+    """True when the browser explicitly lists image/webp in its Accept header."""
+    # Explicit match only: "*/*" does not mean the browser decodes WebP
+    return "image/webp" in request.headers.get("Accept", "")
+
+
+def image_url(filename: str, size: str = "card") -> str:
+    """
+    Jinja helper: URL of the ``size`` variant of a static image, WebP when
+    the browser accepts it. Falls back to the original file.
+
+    Usage: ``{{ image_url('images/diseases/' ~ disease.image, 'thumb') }}``
+    """
+    original_url = url_for("static", filename=filename)
+
+    if size not in VARIANTS or not filename:
+        return original_url
+
+    original_path = os.path.join(current_app.static_folder, filename)
+
+    if not ImageService._ensure_variants(original_path):
+        return original_url
+
+    ext = "webp" if accepts_webp() else "jpg"
+
+    folder, name = os.path.split(filename)
+
+    return url_for(
+        "static",
+        filename="/".join(p for p in (folder, VARIANT_DIR, f"{name}.{size}.{ext}") if p)
+    )
@@ -1,4 +1,7 @@
 import json
+import os
+import threading
+
 from flask import session
 
 def load_language():
@@ -8,4 +11,46 @@ def load_language():
             return json.load(f)
     except:
         with open('translations/en.json', encoding='utf-8') as f:
-            return json.load(f)
\ No newline at end of file
+            return json.load(f)
+
+
+class TranslationCache:
+    """
+    Parsed ``translations/<lang>.json`` files, kept per worker.
+
+    The language context processor runs on every render; it used to read
+    and parse both files each time. A file is parsed again only when its
+    mtime changes, so edited translations still show up without a restart.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, directory: str, lang: str) -> dict:
+        path = os.path.join(directory, f"{lang}.json")
+        mtime = os.stat(path).st_mtime_ns
+
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None and entry[0] == mtime:
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+
+        with self._lock:
+            self._entries[path] = (mtime, data)
+
+        return data
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses}
+
+
+translation_cache = TranslationCache()
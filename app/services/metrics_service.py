@@ -0,0 +1,368 @@
+import hmac
+import json
+import os
+import tempfile
+import threading
+import time
+
+from flask import current_app, request
+from flask_login import current_user
+
+from app.services.request_metrics import TIME_BUCKETS_MS, Histogram, request_metrics
+
+
+# ================= CONFIG ================= #
+METRIC_PREFIX = "app_"
+DEFAULT_FLUSH_INTERVAL = 10
+DEFAULT_STALE_SECONDS = 300
+
+HELP = {
+    "http_request_duration_ms": "Request wall time per blueprint.",
+    "http_request_sql_ms": "SQL time per request per blueprint.",
+    "http_request_sql_statements": "SQL statements per request per blueprint.",
+    "http_request_render_ms": "Template render time per request per blueprint.",
+    "http_requests_total": "Requests per blueprint and status code.",
+    "diagnosis_inference_ms": "Time spent in DiagnosisService.infer.",
+    "audit_write_ms": "Time spent appending one audit log row.",
+    "audit_writes_total": "Audit log writes by result.",
+    "notifications_created_total": "Notifications created by kind.",
+    "notification_events_total": "Notification events published by kind.",
+    "notification_deliveries_total": "Events handed to SSE subscriber queues.",
+    "notification_dropped_total": "Events dropped because a subscriber queue was full.",
+    "notification_subscribers": "Connected SSE subscribers.",
+    "weather_cache_total": "Weather lookups by cache result.",
+    "cache_hits_total": "Cache hits by cache.",
+    "cache_misses_total": "Cache misses by cache.",
+    "cache_hit_ratio": "Cache hits / lookups by cache, across workers.",
+    "db_pool_connections": "Database pool connections by state.",
+    "workers": "Worker processes included in these metrics.",
+}
+
+
+def _key(name, labels):
+    return (name, tuple(sorted((k, str(v)) for k, v in labels.items())))
+
+
+class MetricsRegistry:
+    """
+    Process-wide counters and histograms exported at ``/admin/metrics``.
+
+    Each worker keeps its own values and, when METRICS_DIR is set, writes a
+    JSON snapshot there at most every METRICS_FLUSH_INTERVAL seconds (after
+    a request). The metrics endpoint sums the snapshots of all workers that
+    wrote within METRICS_STALE_SECONDS, so gunicorn workers are reported
+    together. Without METRICS_DIR only the serving worker is reported.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._histograms = {}
+        self._last_flush = 0.0
+        self.metrics_dir = None
+        self.flush_interval = DEFAULT_FLUSH_INTERVAL
+        self.stale_seconds = DEFAULT_STALE_SECONDS
+        self.token = None
+
+    def init_app(self, app):
+        self.metrics_dir = app.config.get("METRICS_DIR")
+        self.flush_interval = app.config.get("METRICS_FLUSH_INTERVAL", DEFAULT_FLUSH_INTERVAL)
+        self.stale_seconds = app.config.get("METRICS_STALE_SECONDS", DEFAULT_STALE_SECONDS)
+        self.token = app.config.get("METRICS_TOKEN")
+
+        if self.metrics_dir:
+            os.makedirs(self.metrics_dir, exist_ok=True)
+            app.after_request(self._after_request)
+
+    # ---------- RECORD ---------- #
+
+    def inc(self, name: str, value=1, **labels) -> None:
+        key = _key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name: str, value, buckets=TIME_BUCKETS_MS, **labels) -> None:
+        key = _key(name, labels)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram(buckets)
+            histogram.observe(value)
+
+    # ---------- SNAPSHOT ---------- #
+
+    def _request_series(self):
+        """Per-endpoint request histograms folded into blueprints."""
+        histograms = {}
+        counters = {}
+
+        for endpoint, stats in request_metrics.snapshot().items():
+            blueprint = endpoint.rsplit(".", 1)[0] if "." in endpoint else "app"
+
+            for field, name in (
+                ("wall_ms", "http_request_duration_ms"),
+                ("sql_ms", "http_request_sql_ms"),
+                ("sql_count", "http_request_sql_statements"),
+                ("render_ms", "http_request_render_ms"),
+            ):
+                _merge_histogram(histograms, _key(name, {"blueprint": blueprint}), stats[field])
+
+            for status, count in stats["status"].items():
+                key = _key("http_requests_total", {"blueprint": blueprint, "status": status})
+                counters[key] = counters.get(key, 0) + count
+
+        return histograms, counters
+
+    @staticmethod
+    def _collected():
+        """Values owned by other services, read at snapshot time."""
+        from extensions import db
+        from app.services.fragment_cache import fragment_cache
+        from app.services.lang_service import translation_cache
+        from app.services.notification_broker import notification_broker
+        from app.services.weather_service import WeatherService
+
+        counters = {}
+        gauges = {}
+
+        fragment = fragment_cache.stats()
+        counters[_key("cache_hits_total", {"cache": "fragment"})] = fragment["hits"]
+        counters[_key("cache_misses_total", {"cache": "fragment"})] = fragment["misses"]
+        gauges[_key("fragment_cache_bytes", {})] = fragment["bytes"]
+        gauges[_key("fragment_cache_entries", {})] = fragment["entries"]
+
+        translation = translation_cache.stats()
+        counters[_key("cache_hits_total", {"cache": "translation"})] = translation["hits"]
+        counters[_key("cache_misses_total", {"cache": "translation"})] = translation["misses"]
+
+        weather = WeatherService.get_stats()
+        gauges[_key("weather_circuit_open", {})] = 1 if weather["state"] != "closed" else 0
+        gauges[_key("weather_cached_cities", {})] = weather["cached_cities"]
+        counters[_key("weather_upstream_calls_total", {})] = weather["calls"]
+        counters[_key("weather_upstream_failures_total", {})] = weather["failures"]
+
+        gauges[_key("notification_subscribers", {})] = notification_broker.subscriber_count()
+
+        try:
+            pool = db.engine.pool
+            for state in ("size", "checkedout", "checkedin", "overflow"):
+                method = getattr(pool, state, None)
+                if callable(method):
+                    gauges[_key("db_pool_connections", {"state": state})] = method()
+        except Exception as e:
+            current_app.logger.warning(f"Metrics pool stats error: {e}")
+
+        return counters, gauges
+
+    def snapshot(self) -> dict:
+        """This worker's metrics as JSON-serialisable lists."""
+        histograms, counters = self._request_series()
+        collected_counters, gauges = self._collected()
+        counters.update(collected_counters)
+
+        with self._lock:
+            counters.update(self._counters)
+            for key, histogram in self._histograms.items():
+                histograms[key] = histogram.to_dict()
+
+        return {
+            "pid": os.getpid(),
+            "updated_at": time.time(),
+            "counters": [[n, dict(l), v] for (n, l), v in counters.items()],
+            "gauges": [[n, dict(l), v] for (n, l), v in gauges.items()],
+            "histograms": [[n, dict(l), h] for (n, l), h in histograms.items()],
+        }
+
+    # ---------- MULTI-WORKER ---------- #
+
+    def _worker_path(self, pid=None):
+        return os.path.join(self.metrics_dir, f"worker-{pid or os.getpid()}.json")
+
+    def flush(self) -> None:
+        """Write this worker's snapshot (atomically) to METRICS_DIR."""
+        if not self.metrics_dir:
+            return
+
+        self._last_flush = time.time()
+        data = json.dumps(self.snapshot())
+
+        fd, tmp_path = tempfile.mkstemp(dir=self.metrics_dir, suffix=".part")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(data)
+            os.replace(tmp_path, self._worker_path())
+        except OSError as e:
+            current_app.logger.warning(f"Metrics flush error: {e}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def _after_request(self, response):
+        if time.time() - self._last_flush >= self.flush_interval:
+            try:
+                self.flush()
+            except Exception as e:
+                current_app.logger.warning(f"Metrics flush error: {e}")
+        return response
+
+    def _worker_snapshots(self):
+        if not self.metrics_dir:
+            return [self.snapshot()]
+
+        self.flush()
+
+        snapshots = []
+        now = time.time()
+
+        for name in os.listdir(self.metrics_dir):
+            if not (name.startswith("worker-") and name.endswith(".json")):
+                continue
+
+            path = os.path.join(self.metrics_dir, name)
+            try:
+                if now - os.path.getmtime(path) > self.stale_seconds:
+                    # Worker exited or idle for too long
+                    os.remove(path)
+                    continue
+                with open(path, encoding="utf-8") as f:
+                    snapshots.append(json.load(f))
+            except (OSError, ValueError):
+                continue
+
+        return snapshots
+
+    def aggregate(self) -> dict:
+        """Sum of every live worker's metrics."""
+        counters, gauges, histograms = {}, {}, {}
+        snapshots = self._worker_snapshots()
+
+        for snap in snapshots:
+            for name, labels, value in snap["counters"]:
+                key = _key(name, labels)
+                counters[key] = counters.get(key, 0) + value
+            for name, labels, value in snap["gauges"]:
+                key = _key(name, labels)
+                gauges[key] = gauges.get(key, 0) + value
+            for name, labels, value in snap["histograms"]:
+                _merge_histogram(histograms, _key(name, labels), value)
+
+        # Hit ratios are only meaningful on the summed counters
+        for (name, labels), hits in list(counters.items()):
+            if name != "cache_hits_total":
+                continue
+            misses = counters.get(("cache_misses_total", labels), 0)
+            lookups = hits + misses
+            gauges[("cache_hit_ratio", labels)] = round(hits / lookups, 4) if lookups else 0.0
+
+        weather_hits = counters.get(_key("weather_cache_total", {"result": "hit"}), 0)
+        weather_lookups = sum(
+            v for (n, _), v in counters.items() if n == "weather_cache_total"
+        )
+        if weather_lookups:
+            gauges[_key("cache_hit_ratio", {"cache": "weather"})] = round(
+                weather_hits / weather_lookups, 4
+            )
+
+        return {
+            "workers": len(snapshots),
+            "counters": counters,
+            "gauges": gauges,
+            "histograms": histograms,
+        }
+
+    # ---------- EXPORT ---------- #
+
+    @staticmethod
+    def to_json(aggregated) -> dict:
+        def group(series):
+            out = {}
+            for (name, labels), value in sorted(series.items()):
+                out.setdefault(name, []).append({"labels": dict(labels), "value": value})
+            return out
+
+        return {
+            "workers": aggregated["workers"],
+            "counters": group(aggregated["counters"]),
+            "gauges": group(aggregated["gauges"]),
+            "histograms": group(aggregated["histograms"]),
+        }
+
+    @staticmethod
+    def to_prometheus(aggregated) -> str:
+        lines = []
+
+        def header(name, kind):
+            full = METRIC_PREFIX + name
+            if name in HELP:
+                lines.append(f"# HELP {full} {HELP[name]}")
+            lines.append(f"# TYPE {full} {kind}")
+
+        for series, kind in (
+            (aggregated["counters"], "counter"),
+            (aggregated["gauges"], "gauge"),
+        ):
+            current = None
+            for (name, labels), value in sorted(series.items()):
+                if name != current:
+                    header(name, kind)
+                    current = name
+                lines.append(f"{METRIC_PREFIX}{name}{_labels(labels)} {value}")
+
+        current = None
+        for (name, labels), hist in sorted(aggregated["histograms"].items()):
+            if name != current:
+                header(name, "histogram")
+                current = name
+
+            cumulative = 0
+            for bound, count in zip(hist["buckets"] + ["+Inf"], hist["counts"]):
+                cumulative += count
+                bucket_labels = labels + (("le", str(bound)),)
+                lines.append(f"{METRIC_PREFIX}{name}_bucket{_labels(bucket_labels)} {cumulative}")
+
+            lines.append(f"{METRIC_PREFIX}{name}_sum{_labels(labels)} {hist['sum']}")
+            lines.append(f"{METRIC_PREFIX}{name}_count{_labels(labels)} {hist['count']}")
+
+        header("workers", "gauge")
+        lines.append(f"{METRIC_PREFIX}workers {aggregated['workers']}")
+        return "\n".join(lines) + "\n"
+
+    # ---------- ACCESS ---------- #
+
+    def authorized(self) -> bool:
+        """Admins, or a scraper presenting ``Authorization: Bearer METRICS_TOKEN``."""
+        if self.token and hmac.compare_digest(
+            request.headers.get("Authorization", "").encode(),
+            f"Bearer {self.token}".encode()
+        ):
+            return True
+
+        return current_user.is_authenticated and current_user.has_role("Admin")
+
+
+def _merge_histogram(target, key, hist) -> None:
+    existing = target.get(key)
+    if existing is None:
+        target[key] = {
+            "buckets": list(hist["buckets"]),
+            "counts": list(hist["counts"]),
+            "sum": hist["sum"],
+            "count": hist["count"],
+        }
+        return
+
+    existing["counts"] = [a + b for a, b in zip(existing["counts"], hist["counts"])]
+    existing["sum"] = round(existing["sum"] + hist["sum"], 3)
+    existing["count"] += hist["count"]
+
+
+def _labels(labels) -> str:
+    if not labels:
+        return ""
+
+    def escape(value):
+        return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+    return "{" + ",".join(f'{k}="{escape(v)}"' for k, v in labels) + "}"
+
+
+metrics = MetricsRegistry()
@@ -0,0 +1,213 @@
+import fcntl
+import json
+import os
+import queue
+import threading
+import time
+from contextlib import contextmanager
+
+from app.services.metrics_service import metrics
+
+
+# ================= CONFIG ================= #
+SUBSCRIBER_QUEUE_SIZE = 100
+SPOOL_POLL_INTERVAL = 0.5
+SPOOL_MAX_BYTES = 1024 * 1024
+
+
+class NotificationBroker:
+    """
+    In-process pub/sub for notification events (used by the SSE stream).
+
+    Events are delivered to subscribers of the target user, or to every
+    subscriber when ``user_id`` is None (broadcasts).
+
+    With several worker processes, set ``NOTIFICATION_BROKER_SPOOL`` to a
+    file path shared by the workers: events are also appended to that file
+    as JSON lines and each worker tails it to deliver events published by
+    the others. Without it, events only reach clients of the same process.
+
+    The spool is never truncated in place. Past SPOOL_MAX_BYTES it is
+    renamed to ``<spool>.1`` under an exclusive ``flock`` (appends hold a
+    shared one), and tailing workers drain the renamed file through their
+    open handle before switching to the new one.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = {}
+        self._spool_path = None
+        self._tail_thread = None
+
+    def init_app(self, app):
+        self._spool_path = app.config.get("NOTIFICATION_BROKER_SPOOL")
+
+    # ---------- SUBSCRIBE ---------- #
+
+    def subscribe(self, user_id) -> queue.Queue:
+        """Register a queue receiving events for ``user_id``."""
+        q = queue.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+
+        with self._lock:
+            self._subscribers.setdefault(user_id, set()).add(q)
+
+        self._ensure_tail()
+        return q
+
+    def subscriber_count(self) -> int:
+        with self._lock:
+            return sum(len(queues) for queues in self._subscribers.values())
+
+    def unsubscribe(self, user_id, q) -> None:
+        with self._lock:
+            queues = self._subscribers.get(user_id)
+            if queues:
+                queues.discard(q)
+                if not queues:
+                    del self._subscribers[user_id]
+
+    # ---------- PUBLISH ---------- #
+
+    def publish(self, user_id, event: dict) -> None:
+        """Deliver ``event`` to ``user_id`` (None = every user)."""
+        self._dispatch(user_id, event)
+
+        if self._spool_path:
+            self._write_spool(user_id, event)
+
+    def _dispatch(self, user_id, event) -> None:
+        with self._lock:
+            if user_id is None:
+                targets = [q for qs in self._subscribers.values() for q in qs]
+            else:
+                targets = list(self._subscribers.get(user_id, ()))
+
+        delivered = 0
+        for q in targets:
+            try:
+                q.put_nowait(event)
+                delivered += 1
+            except queue.Full:
+                # Slow client: drop, it will resync on the next poll
+                metrics.inc("notification_dropped_total")
+
+        if delivered:
+            metrics.inc("notification_deliveries_total", delivered)
+
+    # ---------- MULTI-WORKER SPOOL ---------- #
+
+    @contextmanager
+    def _spool_lock(self, mode):
+        with open(self._spool_path + ".lock", "a") as lock_file:
+            fcntl.flock(lock_file, mode)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _rotate_spool(self) -> None:
+        with self._spool_lock(fcntl.LOCK_EX):
+            # Another worker may have rotated while we waited
+            if os.path.exists(self._spool_path) \
+                    and os.path.getsize(self._spool_path) > SPOOL_MAX_BYTES:
+                os.replace(self._spool_path, self._spool_path + ".1")
+
+    def _write_spool(self, user_id, event) -> None:
+        line = json.dumps({
+            "pid": os.getpid(),
+            "user_id": user_id,
+            "event": event
+        }) + "\n"
+
+        try:
+            if os.path.exists(self._spool_path) \
+                    and os.path.getsize(self._spool_path) > SPOOL_MAX_BYTES:
+                self._rotate_spool()
+
+            # Single O_APPEND write, so lines from workers do not interleave
+            with self._spool_lock(fcntl.LOCK_SH):
+                with open(self._spool_path, "a", encoding="utf-8") as f:
+                    f.write(line)
+
+        except OSError as e:
+            print(f"NotificationBroker spool write error: {e}")
+
+    def _ensure_tail(self) -> None:
+        if not self._spool_path or self._tail_thread:
+            return
+
+        with self._lock:
+            if self._tail_thread:
+                return
+            self._tail_thread = threading.Thread(
+                target=self._tail_spool,
+                name="notification-broker-tail",
+                daemon=True
+            )
+            self._tail_thread.start()
+
+    @staticmethod
+    def _rotated(path, f) -> bool:
+        try:
+            return os.stat(path).st_ino != os.fstat(f.fileno()).st_ino
+        except FileNotFoundError:
+            return True
+
+    def _tail_spool(self) -> None:
+        path = self._spool_path
+        pid = os.getpid()
+
+        f = None
+        # Only events published from now on, unless the spool is new
+        first_open = os.path.exists(path)
+        partial = b""
+
+        while True:
+            time.sleep(SPOOL_POLL_INTERVAL)
+
+            try:
+                if f is None:
+                    if not os.path.exists(path):
+                        continue
+
+                    f = open(path, "rb")
+                    if first_open:
+                        f.seek(0, os.SEEK_END)
+                        first_open = False
+
+                # Checked before reading: once renamed, the old file gets
+                # no more writes, so this read drains it
+                rotated = self._rotated(path, f)
+
+                data = partial + f.read()
+
+                # Leave a half-written last line for the next pass
+                lines = data.split(b"\n")
+                partial = lines.pop()
+
+                if rotated:
+                    f.close()
+                    f = None
+                    partial = b""
+
+            except OSError as e:
+                print(f"NotificationBroker spool read error: {e}")
+                continue
+
+            for line in lines:
+                if not line:
+                    continue
+
+                try:
+                    record = json.loads(line.decode("utf-8"))
+                except ValueError:
+                    continue
+
+                # Our own events were already dispatched in publish()
+                if record.get("pid") == pid:
+                    continue
+
+                self._dispatch(record.get("user_id"), record.get("event"))
+
+
+notification_broker = NotificationBroker()
@@ -0,0 +1,810 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import and_, case, insert, literal, or_
+from sqlalchemy.exc import IntegrityError
+
+from app.models.UserNotification import (
+    NotificationCounter,
+    UserNotification,
+    UserNotificationState
+)
+from app.models.crop_monitoring import CropMonitoringTable
+from app.models.diseases import DiseaseTable
+from app.models.user import UserTable
+from app.services.metrics_service import metrics
+from app.services.notification_broker import notification_broker
+from extensions import db
+
+
+# ================= CONFIG ================= #
+DEFAULT_FEED_LIMIT = 50
+MAX_FEED_LIMIT = 200
+DEFAULT_READ_RETENTION_DAYS = 90
+DEFAULT_BROADCAST_RETENTION_DAYS = 180
+DEFAULT_PURGE_BATCH_SIZE = 1000
+
+
+# ================= HELPERS ================= #
+
+def _disease_item(notif, disease, is_read) -> dict:
+    """Build the feed entry for a disease notification."""
+    return {
+        "id": notif.id,
+        "notification_id": notif.id,
+        "category": "disease",
+        "reference_id": disease.id,
+        "title": disease.disease_name,
+        "name": disease.disease_name,
+        "message": "New disease information",
+        "type": "warning",
+        "icon": "bi-virus",
+        "is_read": bool(is_read),
+        "time": notif.created_at.isoformat() if notif.created_at else None
+    }
+
+
+def _monitoring_item(notif, monitoring, is_read) -> dict:
+    """Build the feed entry for a crop monitoring notification."""
+
+    notification_type = "info"
+    icon = "bi-info-circle"
+
+    if monitoring.disease_status in ["Detected", "Severe"]:
+        notification_type = "critical"
+        icon = "bi-exclamation-triangle-fill"
+
+    elif monitoring.pest_status in ["Medium", "High"]:
+        notification_type = "warning"
+        icon = "bi-bug-fill"
+
+    elif monitoring.plant_condition in ["Poor", "Critical"]:
+        notification_type = "warning"
+        icon = "bi-heart-pulse-fill"
+
+    title = "Crop Monitoring Alert"
+
+    return {
+        "id": notif.id,
+        "notification_id": notif.id,
+        "category": "crop_monitoring",
+        "reference_id": monitoring.id,
+        "title": title,
+        "name": title,
+        "message": f"Plant condition: {monitoring.plant_condition or 'N/A'}",
+        "type": notification_type,
+        "icon": icon,
+        "is_read": bool(is_read),
+        "time": notif.created_at.isoformat() if notif.created_at else None
+    }
+
+
+def _joined_at(user_id):
+    """
+    Sign-up time of a user. Broadcasts created before it are never shown
+    to (or counted for) that user.
+    """
+    return db.session.scalar(
+        db.select(UserTable.created_at).where(UserTable.id == user_id)
+    )
+
+
+def _broadcasts_since(joined_at):
+    """Filter on broadcasts a user who joined at ``joined_at`` can see."""
+    if joined_at is None:
+        return UserNotification.user_id.is_(None)
+    return and_(
+        UserNotification.user_id.is_(None),
+        UserNotification.created_at >= joined_at
+    )
+
+
+def _has_source():
+    """
+    Filter on notifications whose disease / monitoring still exists.
+    The feed and the unread counter both use it, so the badge never
+    counts an entry the feed cannot show.
+    """
+    return or_(
+        and_(
+            UserNotification.category == "disease",
+            db.select(DiseaseTable.id)
+            .where(DiseaseTable.id == UserNotification.disease_id)
+            .exists()
+        ),
+        and_(
+            UserNotification.category == "crop_monitoring",
+            db.select(CropMonitoringTable.id)
+            .where(CropMonitoringTable.id == UserNotification.monitoring_id)
+            .exists()
+        )
+    )
+
+
+# ================= SERVICE ================= #
+
+class NotificationService:
+
+    # ---------- CREATE ---------- #
+
+    @staticmethod
+    def create_broadcast(disease_id: int) -> UserNotification:
+        """
+        Add a single broadcast notification for a new disease.
+
+        Broadcasts have no user_id and are merged into every user's feed;
+        the caller commits.
+        """
+        notification = UserNotification(
+            user_id=None,
+            disease_id=disease_id,
+            monitoring_id=None,
+            category="disease",
+            is_read=False,
+            is_deleted=False
+        )
+        db.session.add(notification)
+
+        NotificationService._bump_counter(
+            NotificationCounter.BROADCAST_COUNTER_ID, unread=1
+        )
+        metrics.inc("notifications_created_total", kind="broadcast")
+        return notification
+
+    @staticmethod
+    def create_for_user(user_id: int, category: str, disease_id=None,
+                        monitoring_id=None) -> UserNotification:
+        """Add a personal notification for one user; the caller commits."""
+        notification = UserNotification(
+            user_id=user_id,
+            disease_id=disease_id,
+            monitoring_id=monitoring_id,
+            category=category,
+            is_read=False,
+            is_deleted=False
+        )
+        db.session.add(notification)
+
+        NotificationService._bump_counter(user_id, unread=1)
+        metrics.inc("notifications_created_total", kind="personal")
+        return notification
+
+    # ---------- PUSH ---------- #
+
+    @staticmethod
+    def publish_created(notification: UserNotification) -> None:
+        """
+        Push a committed notification to SSE subscribers.
+
+        Broadcasts go to every connected user. Failures are only logged so
+        they never break the write that created the notification.
+        """
+        try:
+            item = None
+
+            if notification.category == "disease":
+                disease = db.session.get(DiseaseTable, notification.disease_id)
+                if disease:
+                    item = _disease_item(notification, disease, False)
+
+            elif notification.category == "crop_monitoring":
+                monitoring = db.session.get(
+                    CropMonitoringTable, notification.monitoring_id
+                )
+                if monitoring:
+                    item = _monitoring_item(notification, monitoring, False)
+
+            if item:
+                notification_broker.publish(notification.user_id, item)
+                metrics.inc(
+                    "notification_events_total",
+                    kind="broadcast" if notification.user_id is None else "personal"
+                )
+
+        except Exception as e:
+            print(f"NotificationService.publish_created() error: {e}")
+
+    # ---------- FEED ---------- #
+
+    @staticmethod
+    def _visible_query(user_id):
+        """
+        Query of ``(notification, is_read)`` rows visible to a user:
+        their own non-deleted notifications plus broadcasts created since
+        they signed up that they have not deleted.
+        """
+        state = UserNotificationState
+        joined_at = _joined_at(user_id)
+
+        return (
+            db.session.query(
+                UserNotification,
+                case(
+                    (UserNotification.user_id.is_(None),
+                     db.func.coalesce(state.is_read, False)),
+                    else_=UserNotification.is_read
+                )
+            )
+            .outerjoin(
+                state,
+                and_(
+                    state.notification_id == UserNotification.id,
+                    state.user_id == user_id
+                )
+            )
+            .filter(
+                _has_source(),
+                or_(
+                    and_(
+                        UserNotification.user_id == user_id,
+                        UserNotification.is_deleted == False
+                    ),
+                    and_(
+                        _broadcasts_since(joined_at),
+                        or_(
+                            state.is_deleted.is_(None),
+                            state.is_deleted == False
+                        )
+                    )
+                )
+            )
+        )
+
+    @staticmethod
+    def get_feed(user_id, limit=None, cursor=None):
+        """
+        Return one page of a user's notification feed, personal and
+        broadcast notifications merged.
+
+        Pages are keyset-paginated on the notification id (newest first):
+        pass the returned ``next_cursor`` back as ``cursor`` to get the
+        next, older page. Referenced diseases and monitorings are loaded
+        with one IN-query per category instead of one query per row.
+
+        Returns ``(items, next_cursor)``; ``next_cursor`` is None on the
+        last page.
+        """
+        limit = min(max(int(limit or DEFAULT_FEED_LIMIT), 1), MAX_FEED_LIMIT)
+
+        try:
+            query = NotificationService._visible_query(user_id)
+
+            if cursor:
+                query = query.filter(UserNotification.id < int(cursor))
+
+            # Fetch one extra row to know whether an older page exists
+            rows = (
+                query
+                .order_by(UserNotification.id.desc())
+                .limit(limit + 1)
+                .all()
+            )
+
+            next_cursor = None
+            if len(rows) > limit:
+                rows = rows[:limit]
+                next_cursor = rows[-1][0].id
+
+            # ==========================================
+            # Batch-load referenced rows
+            # ==========================================
+            disease_ids = {
+                n.disease_id for n, _ in rows
+                if n.category == "disease" and n.disease_id
+            }
+            monitoring_ids = {
+                n.monitoring_id for n, _ in rows
+                if n.category == "crop_monitoring" and n.monitoring_id
+            }
+
+            diseases = {}
+            if disease_ids:
+                diseases = {
+                    d.id: d for d in DiseaseTable.query.filter(
+                        DiseaseTable.id.in_(disease_ids)
+                    ).all()
+                }
+
+            monitorings = {}
+            if monitoring_ids:
+                monitorings = {
+                    m.id: m for m in CropMonitoringTable.query.filter(
+                        CropMonitoringTable.id.in_(monitoring_ids)
+                    ).all()
+                }
+
+            # ==========================================
+            # Serialize
+            # ==========================================
+            items = []
+
+            for notif, is_read in rows:
+
+                if notif.category == "disease":
+                    disease = diseases.get(notif.disease_id)
+                    if disease:
+                        items.append(_disease_item(notif, disease, is_read))
+
+                elif notif.category == "crop_monitoring":
+                    monitoring = monitorings.get(notif.monitoring_id)
+                    if monitoring:
+                        items.append(
+                            _monitoring_item(notif, monitoring, is_read)
+                        )
+
+            return items, next_cursor
+
+        except Exception as e:
+            db.session.rollback()
+            print(f"NotificationService.get_feed() error: {e}")
+            raise
+
+    # ---------- USER ACTIONS ---------- #
+
+    @staticmethod
+    def _get_visible(user_id, notification_id, include_deleted=False):
+        """Return a personal or broadcast notification the user can act on."""
+        notif = UserNotification.query.filter(
+            UserNotification.id == notification_id,
+            or_(
+                UserNotification.user_id == user_id,
+                UserNotification.user_id.is_(None)
+            )
+        ).first()
+
+        if notif and notif.user_id is not None \
+                and notif.is_deleted and not include_deleted:
+            return None
+
+        # Broadcasts from before sign-up are not part of the user's feed
+        if notif and notif.user_id is None:
+            joined_at = _joined_at(user_id)
+            if joined_at and notif.created_at and notif.created_at < joined_at:
+                return None
+
+        return notif
+
+    @staticmethod
+    def _get_or_create_state(user_id, notification_id) -> UserNotificationState:
+        state = UserNotificationState.query.filter_by(
+            notification_id=notification_id,
+            user_id=user_id
+        ).first()
+
+        if not state:
+            state = UserNotificationState(
+                notification_id=notification_id,
+                user_id=user_id,
+                is_read=False,
+                is_deleted=False
+            )
+            db.session.add(state)
+
+        return state
+
+    @staticmethod
+    def mark_read(user_id, notification_id) -> bool:
+        """Mark one notification read. Returns False if not found."""
+        try:
+            notif = NotificationService._get_visible(user_id, notification_id)
+            if not notif:
+                return False
+
+            if notif.user_id is None:
+                state = NotificationService._get_or_create_state(
+                    user_id, notif.id
+                )
+                if state.is_deleted:
+                    return False
+                if not state.is_read:
+                    NotificationService._bump_counter(user_id, seen=1)
+                state.is_read = True
+            else:
+                if not notif.is_read:
+                    NotificationService._bump_counter(user_id, unread=-1)
+                notif.is_read = True
+
+            db.session.commit()
+            return True
+
+        except Exception as e:
+            db.session.rollback()
+            print(f"NotificationService.mark_read() error: {e}")
+            raise
+
+    @staticmethod
+    def delete(user_id, notification_id) -> bool:
+        """Soft-delete one notification. Returns False if not found."""
+        try:
+            notif = NotificationService._get_visible(
+                user_id, notification_id, include_deleted=True
+            )
+            if not notif:
+                return False
+
+            if notif.user_id is None:
+                state = NotificationService._get_or_create_state(
+                    user_id, notif.id
+                )
+                if not (state.is_read or state.is_deleted):
+                    NotificationService._bump_counter(user_id, seen=1)
+                state.is_deleted = True
+            else:
+                if not (notif.is_read or notif.is_deleted):
+                    NotificationService._bump_counter(user_id, unread=-1)
+                notif.is_deleted = True
+
+            db.session.commit()
+            return True
+
+        except Exception as e:
+            db.session.rollback()
+            print(f"NotificationService.delete() error: {e}")
+            raise
+
+    # ---------- BULK ACTIONS ---------- #
+
+    @staticmethod
+    def _bulk_set(user_id, column: str, start_id=None, end_id=None) -> None:
+        """
+        Set ``is_read`` or ``is_deleted`` on every notification of a user,
+        optionally limited to an inclusive id range, with set-based
+        statements instead of per-row ORM updates. The caller commits.
+        """
+        state = UserNotificationState
+        joined_at = _joined_at(user_id)
+
+        def in_range(id_column):
+            conditions = []
+            if start_id is not None:
+                conditions.append(id_column >= start_id)
+            if end_id is not None:
+                conditions.append(id_column <= end_id)
+            return conditions
+
+        # Personal notifications
+        UserNotification.query.filter(
+            UserNotification.user_id == user_id,
+            UserNotification.is_deleted == False,
+            getattr(UserNotification, column) == False,
+            *in_range(UserNotification.id)
+        ).update({column: True}, synchronize_session=False)
+
+        # Broadcasts the user already has state for
+        state.query.filter(
+            state.user_id == user_id,
+            getattr(state, column) == False,
+            *in_range(state.notification_id)
+        ).update({column: True}, synchronize_session=False)
+
+        # Broadcasts without state yet: one INSERT ... SELECT
+        has_state = (
+            db.select(state.id)
+            .where(
+                state.notification_id == UserNotification.id,
+                state.user_id == user_id
+            )
+            .exists()
+        )
+
+        db.session.execute(
+            insert(state).from_select(
+                ["notification_id", "user_id", "is_read", "is_deleted"],
+                db.select(
+                    UserNotification.id,
+                    literal(user_id),
+                    literal(column == "is_read"),
+                    literal(column == "is_deleted")
+                ).where(
+                    _broadcasts_since(joined_at),
+                    ~has_state,
+                    *in_range(UserNotification.id)
+                )
+            )
+        )
+
+        NotificationService._reset_counter(user_id)
+
+    @staticmethod
+    def mark_all_read(user_id) -> None:
+        """Mark every personal and broadcast notification of a user read."""
+        try:
+            NotificationService._bulk_set(user_id, "is_read")
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            print(f"NotificationService.mark_all_read() error: {e}")
+            raise
+
+    @staticmethod
+    def mark_range_read(user_id, start_id=None, end_id=None) -> None:
+        """Mark a user's notifications with ids in [start_id, end_id] read."""
+        try:
+            NotificationService._bulk_set(
+                user_id, "is_read", start_id=start_id, end_id=end_id
+            )
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            print(f"NotificationService.mark_range_read() error: {e}")
+            raise
+
+    @staticmethod
+    def delete_all(user_id) -> None:
+        """Soft-delete every personal and broadcast notification of a user."""
+        try:
+            NotificationService._bulk_set(user_id, "is_deleted")
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            print(f"NotificationService.delete_all() error: {e}")
+            raise
+
+    @staticmethod
+    def delete_for_source(disease_id=None, monitoring_id=None) -> None:
+        """
+        Remove the notifications of a disease or monitoring that is about
+        to be deleted, with their per-user state, and drop the affected
+        counter rows (rebuilt on next read). The caller commits.
+        """
+        condition = (
+            UserNotification.disease_id == disease_id
+            if disease_id is not None
+            else UserNotification.monitoring_id == monitoring_id
+        )
+
+        rows = db.session.execute(
+            db.select(UserNotification.id, UserNotification.user_id)
+            .where(condition)
+        ).all()
+        if not rows:
+            return
+
+        ids = [row.id for row in rows]
+        user_ids = {row.user_id for row in rows}
+
+        UserNotificationState.query.filter(
+            UserNotificationState.notification_id.in_(ids)
+        ).delete(synchronize_session=False)
+
+        UserNotification.query.filter(
+            UserNotification.id.in_(ids)
+        ).delete(synchronize_session=False)
+
+        counters = NotificationCounter.query
+        if None not in user_ids:
+            # Personal only: other users' badges are unaffected
+            counters = counters.filter(
+                NotificationCounter.user_id.in_(user_ids)
+            )
+        counters.delete(synchronize_session=False)
+
+    # ---------- RETENTION ---------- #
+
+    @staticmethod
+    def _delete_in_chunks(model, condition, batch_size) -> int:
+        """Delete rows matching ``condition`` ``batch_size`` ids at a time."""
+        total = 0
+
+        while True:
+            ids = db.session.scalars(
+                db.select(model.id).where(condition).limit(batch_size)
+            ).all()
+
+            if not ids:
+                return total
+
+            model.query.filter(
+                model.id.in_(ids)
+            ).delete(synchronize_session=False)
+
+            db.session.commit()
+            total += len(ids)
+
+    @staticmethod
+    def purge(read_days=DEFAULT_READ_RETENTION_DAYS,
+              broadcast_days=DEFAULT_BROADCAST_RETENTION_DAYS,
+              batch_size=DEFAULT_PURGE_BATCH_SIZE) -> dict:
+        """
+        Retention job: hard-delete soft-deleted personal notifications,
+        personal notifications read more than ``read_days`` ago and
+        broadcasts older than ``broadcast_days``.
+
+        Rows are removed in short ``batch_size`` transactions so the job
+        never holds long locks on the notification tables.
+        """
+        now = datetime.utcnow()
+        read_cutoff = now - timedelta(days=read_days)
+        broadcast_cutoff = now - timedelta(days=broadcast_days)
+
+        try:
+            personal = NotificationService._delete_in_chunks(
+                UserNotification,
+                and_(
+                    UserNotification.user_id.isnot(None),
+                    or_(
+                        UserNotification.is_deleted == True,
+                        and_(
+                            UserNotification.is_read == True,
+                            UserNotification.created_at < read_cutoff
+                        )
+                    )
+                ),
+                batch_size
+            )
+
+            # Per-user state goes first so no row points at a purged broadcast
+            old_broadcasts = (
+                db.select(UserNotification.id)
+                .where(
+                    UserNotification.user_id.is_(None),
+                    UserNotification.created_at < broadcast_cutoff
+                )
+            )
+
+            states = NotificationService._delete_in_chunks(
+                UserNotificationState,
+                UserNotificationState.notification_id.in_(old_broadcasts),
+                batch_size
+            )
+
+            broadcasts = NotificationService._delete_in_chunks(
+                UserNotification,
+                and_(
+                    UserNotification.user_id.is_(None),
+                    UserNotification.created_at < broadcast_cutoff
+                ),
+                batch_size
+            )
+
+            # Broadcast totals changed: drop counters, rebuilt on next read
+            if broadcasts or states:
+                NotificationCounter.query.delete(synchronize_session=False)
+                db.session.commit()
+
+            return {
+                "personal": personal,
+                "broadcast_states": states,
+                "broadcasts": broadcasts
+            }
+
+        except Exception as e:
+            db.session.rollback()
+            print(f"NotificationService.purge() error: {e}")
+            raise
+
+    # ---------- UNREAD COUNTER ---------- #
+
+    @staticmethod
+    def _bump_counter(user_id, unread=0, seen=0) -> None:
+        """
+        Adjust a counter row in place with a single UPDATE.
+
+        A missing row is left alone: it is rebuilt from the notification
+        tables the next time the count is read.
+        """
+        values = {}
+        if unread:
+            values["unread_count"] = NotificationCounter.unread_count + unread
+        if seen:
+            values["broadcast_seen"] = NotificationCounter.broadcast_seen + seen
+        if not values:
+            return
+
+        NotificationCounter.query.filter_by(
+            user_id=user_id
+        ).update(values, synchronize_session=False)
+
+    @staticmethod
+    def _count_from_source(user_id):
+        """Recompute ``(unread_count, broadcast_seen)`` for a counter row."""
+        if user_id == NotificationCounter.BROADCAST_COUNTER_ID:
+            total = UserNotification.query.filter(
+                UserNotification.user_id.is_(None),
+                _has_source()
+            ).count()
+            return total, 0
+
+        unread = UserNotification.query.filter(
+            UserNotification.user_id == user_id,
+            UserNotification.is_read == False,
+            UserNotification.is_deleted == False,
+            _has_source()
+        ).count()
+
+        # Broadcasts from before sign-up count as seen, so a new user does
+        # not start with every old broadcast unread
+        joined_at = _joined_at(user_id)
+        before_signup = 0
+        if joined_at is not None:
+            before_signup = UserNotification.query.filter(
+                UserNotification.user_id.is_(None),
+                UserNotification.created_at < joined_at,
+                _has_source()
+            ).count()
+
+        seen = (
+            UserNotificationState.query
+            .join(
+                UserNotification,
+                UserNotification.id == UserNotificationState.notification_id
+            )
+            .filter(
+                UserNotificationState.user_id == user_id,
+                _broadcasts_since(joined_at),
+                _has_source(),
+                or_(
+                    UserNotificationState.is_read == True,
+                    UserNotificationState.is_deleted == True
+                )
+            )
+            .count()
+        )
+
+        return unread, before_signup + seen
+
+    @staticmethod
+    def _reset_counter(user_id) -> None:
+        """Overwrite a user's counter row from the source tables."""
+        unread, seen = NotificationService._count_from_source(user_id)
+
+        NotificationCounter.query.filter_by(
+            user_id=user_id
+        ).update({
+            "unread_count": unread,
+            "broadcast_seen": seen
+        }, synchronize_session=False)
+
+    @staticmethod
+    def _init_counter(user_id) -> NotificationCounter:
+        """Create a missing counter row from the source tables."""
+        unread, seen = NotificationService._count_from_source(user_id)
+
+        counter = NotificationCounter(
+            user_id=user_id,
+            unread_count=unread,
+            broadcast_seen=seen
+        )
+
+        try:
+            db.session.add(counter)
+            db.session.commit()
+        except IntegrityError:
+            # Another request created it first
+            db.session.rollback()
+            counter = db.session.get(NotificationCounter, user_id)
+
+        return counter
+
+    @staticmethod
+    def get_unread_count(user_id) -> int:
+        """
+        Unread badge count for a user.
+
+        Reads the user's counter row and the broadcast total with one
+        primary-key lookup; rows are created lazily on first use.
+        """
+        broadcast_id = NotificationCounter.BROADCAST_COUNTER_ID
+
+        try:
+            counters = {
+                c.user_id: c for c in NotificationCounter.query.filter(
+                    NotificationCounter.user_id.in_([broadcast_id, user_id])
+                ).all()
+            }
+
+            broadcasts = counters.get(broadcast_id)
+            if broadcasts is None:
+                broadcasts = NotificationService._init_counter(broadcast_id)
+
+            mine = counters.get(user_id)
+            if mine is None:
+                mine = NotificationService._init_counter(user_id)
+
+            unseen_broadcasts = broadcasts.unread_count - mine.broadcast_seen
+
+            return max(mine.unread_count, 0) + max(unseen_broadcasts, 0)
+
+        except Exception as e:
+            db.session.rollback()
+            print(f"NotificationService.get_unread_count() error: {e}")
+            raise
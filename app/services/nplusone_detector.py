@@ -0,0 +1,185 @@
+import os
+import re
+import threading
+import traceback
+from contextlib import contextmanager
+
+from flask import current_app, g, has_app_context, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+# ================= CONFIG ================= #
+DEFAULT_THRESHOLD = 5
+STACK_DEPTH = 8
+STATEMENT_PREVIEW = 300
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER = re.compile(r"%\(\w+\)s|%s|:\w+|\?")
+_IN_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+class NPlusOneError(AssertionError):
+    """Raised in strict mode when a request repeats a statement too often."""
+
+
+def fingerprint(statement: str) -> str:
+    """
+    Statement shape with literals and bound values removed, so the same
+    query issued for different ids yields the same fingerprint.
+    """
+    shape = _STRING_LITERAL.sub("?", statement)
+    shape = _PLACEHOLDER.sub("?", shape)
+    shape = _NUMBER_LITERAL.sub("?", shape)
+    shape = _IN_LIST.sub("(?)", shape)
+    return _WHITESPACE.sub(" ", shape).strip()
+
+
+class NPlusOneDetector:
+    """
+    Flags N+1 query patterns: the same statement shape executed
+    NPLUSONE_THRESHOLD or more times while handling one request.
+
+    Each finding is logged with the statement and the application frames
+    that issued it. With NPLUSONE_RAISE (meant for tests) the request
+    fails with NPlusOneError instead, so a new N+1 pattern breaks the
+    suite. ``detect()`` applies the same check to a block of code outside
+    a request, e.g. a service call in a test.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+        self._listening = False
+        self.enabled = False
+        self.threshold = DEFAULT_THRESHOLD
+        self.strict = False
+        self.app_root = None
+
+    def init_app(self, app):
+        self.enabled = app.config.get("NPLUSONE_ENABLED", False)
+        self.threshold = app.config.get("NPLUSONE_THRESHOLD", DEFAULT_THRESHOLD)
+        self.strict = app.config.get("NPLUSONE_RAISE", False)
+        self.app_root = os.path.dirname(app.root_path)
+
+        if not self.enabled:
+            return
+
+        app.before_request(self._start_request)
+        app.after_request(self._finish_request)
+        self._listen()
+
+    def _listen(self):
+        if not self._listening:
+            event.listen(Engine, "before_cursor_execute", self._before_execute)
+            self._listening = True
+
+    # ---------- TRACKING ---------- #
+
+    def _tracker(self):
+        tracker = getattr(self._local, "tracker", None)
+        if tracker is not None:
+            return tracker
+        if has_request_context():
+            return g.get("_nplusone")
+        return None
+
+    def _before_execute(self, conn, cursor, statement, parameters, context, executemany):
+        tracker = self._tracker()
+        if tracker is None:
+            return
+
+        key = fingerprint(statement)
+        entry = tracker.get(key)
+
+        if entry is None:
+            tracker[key] = {"count": 1, "statement": statement, "stack": None}
+            return
+
+        entry["count"] += 1
+
+        # The repeat is what matters, so remember where it came from
+        if entry["stack"] is None:
+            entry["stack"] = self._app_stack()
+
+    def _app_stack(self):
+        """Innermost application frames (no library or detector frames)."""
+        frames = [
+            frame for frame in traceback.extract_stack()[:-2]
+            if self.app_root
+            and frame.filename.startswith(self.app_root)
+            and "site-packages" not in frame.filename
+            and not frame.filename.endswith(os.path.basename(__file__))
+        ]
+        return [
+            f"{os.path.relpath(f.filename, self.app_root)}:{f.lineno} in {f.name}"
+            for f in frames[-STACK_DEPTH:]
+        ]
+
+    # ---------- REPORT ---------- #
+
+    def findings(self, tracker, threshold=None) -> list:
+        threshold = threshold or self.threshold
+        return sorted(
+            (
+                {
+                    "count": entry["count"],
+                    "statement": entry["statement"][:STATEMENT_PREVIEW],
+                    "stack": entry["stack"] or []
+                }
+                for entry in tracker.values()
+                if entry["count"] >= threshold
+            ),
+            key=lambda f: f["count"],
+            reverse=True
+        )
+
+    def _report(self, where, findings, strict):
+        message = "\n".join(
+            f"N+1 suspected in {where}: statement ran {f['count']} times\n"
+            f"  {f['statement']}\n"
+            + "\n".join(f"    at {line}" for line in f["stack"])
+            for f in findings
+        )
+
+        if strict:
+            raise NPlusOneError(message)
+
+        if has_app_context():
+            current_app.logger.warning(message)
+        else:
+            print(message)
+
+    def _start_request(self):
+        g._nplusone = {}
+
+    def _finish_request(self, response):
+        tracker = g.pop("_nplusone", None)
+        if tracker:
+            findings = self.findings(tracker)
+            if findings:
+                self._report(f"{request.method} {request.endpoint}", findings, self.strict)
+        return response
+
+    @contextmanager
+    def detect(self, threshold=None, strict=True):
+        """
+        Check a block of code, e.g. in a test::
+
+            with nplusone_detector.detect():
+                DiagnosisService.infer([1, 2, 3])
+        """
+        self._listen()
+        self._local.tracker = tracker = {}
+
+        try:
+            yield tracker
+            findings = self.findings(tracker, threshold)
+            if findings:
+                self._report("detect() block", findings, strict)
+        finally:
+            self._local.tracker = None
+
+
+nplusone_detector = NPlusOneDetector()
@@ -0,0 +1,54 @@
+from app.models.crop_monitoring import CropMonitoringTable
+from app.models.farm import FarmTable
+from app.models.field import FieldTable
+from app.models.field_crop import FieldCropTable
+from app.models.treatment_histories import TreatmentHistoryTable
+
+
+# ================= CONFIG ================= #
+# Each farmer-owned model and the parent it hangs off, up to tbl_farms
+PARENTS = {
+    FieldTable: (FarmTable, FieldTable.farm_id == FarmTable.id),
+    FieldCropTable: (FieldTable, FieldCropTable.field_id == FieldTable.id),
+    CropMonitoringTable: (FieldCropTable, CropMonitoringTable.field_crop_id == FieldCropTable.id),
+    TreatmentHistoryTable: (CropMonitoringTable, TreatmentHistoryTable.monitoring_id == CropMonitoringTable.id),
+}
+
+
+class OwnershipScope:
+    """
+    Restricts farmer data to the farms of one user.
+
+    ``apply()`` walks from the selected model up to ``tbl_farms`` with plain
+    inner joins on the foreign keys (each backed by an index) and filters on
+    ``FarmTable.user_id``. This replaces nested ``relationship.has()``
+    filters, which compile to correlated EXISTS subqueries evaluated per
+    row. Works on ``db.select()`` statements and legacy ``Model.query``.
+    """
+
+    @staticmethod
+    def path(model) -> list:
+        """``(parent, onclause)`` joins from ``model`` up to FarmTable."""
+        if model is not FarmTable and model not in PARENTS:
+            raise ValueError(f"{model.__name__} is not owned through a farm")
+
+        joins = []
+        while model in PARENTS:
+            parent, onclause = PARENTS[model]
+            joins.append((parent, onclause))
+            model = parent
+        return joins
+
+    @staticmethod
+    def apply(stmt, model, user_id, joined=()):
+        """
+        Scope ``stmt`` (selecting ``model``) to ``user_id``.
+
+        ``joined`` lists tables the statement already joins, so they are
+        not joined twice.
+        """
+        for parent, onclause in OwnershipScope.path(model):
+            if parent not in joined:
+                stmt = stmt.join(parent, onclause)
+
+        return stmt.where(FarmTable.user_id == user_id)
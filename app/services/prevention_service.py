@@ -8,6 +8,8 @@ from werkzeug.utils import secure_filename
 import os
 
 from app.services.audit_service import log_audit
+from app.services.upload_store import UploadStore
+from app.services.fragment_cache import fragment_cache
 
 # ================= CONFIG ================= #
 
@@ -22,21 +24,13 @@ def allowed_file(filename: str) -> bool:
 
 
 def save_image(image_file) -> str:
-    """Save image and return filename"""
-    filename = secure_filename(image_file.filename)
-    save_path = os.path.join(current_app.root_path, UPLOAD_FOLDER)
-    os.makedirs(save_path, exist_ok=True)
-    image_file.save(os.path.join(save_path, filename))
-    return filename
+    """Save image under its content hash and return filename"""
+    return UploadStore.save(image_file, UPLOAD_FOLDER)
 
 
 def delete_image(filename: str):
-    """Delete old image from folder"""
-    if not filename:
-        return
-    file_path = os.path.join(current_app.root_path, UPLOAD_FOLDER, filename)
-    if os.path.exists(file_path):
-        os.remove(file_path)
+    """Delete old image from folder once no row references it"""
+    UploadStore.delete(filename, UPLOAD_FOLDER)
 
 
 # ================= SERVICE ================= #
@@ -150,6 +144,7 @@ class PreventionService:
         try:
             db.session.add(prevention)
             db.session.commit()
+            fragment_cache.bump()
         except SQLAlchemyError as e:
             db.session.rollback()
             delete_image(filename)
@@ -281,6 +276,7 @@ class PreventionService:
         try:
 
             db.session.commit()
+            fragment_cache.bump()
 
         except SQLAlchemyError as e:
 
@@ -360,6 +356,7 @@ class PreventionService:
         try:
             db.session.delete(prevention)
             db.session.commit()
+            fragment_cache.bump()
             delete_image(image)
         except SQLAlchemyError as e:
             db.session.rollback()
@@ -1,11 +1,13 @@
 import os
-import uuid
 
 from flask import current_app
-from werkzeug.utils import secure_filename
 
 from extensions import db
 from app.models import UserTable
+from app.services.upload_store import UploadError, UploadStore
+
+
+PROFILE_UPLOAD_FOLDER = "static/uploads/profiles"
 
 
 class ProfileService:
@@ -127,25 +129,6 @@ class ProfileService:
 
         return upload_folder
 
-    # =========================================================
-    # Generate Unique Filename
-    # =========================================================
-    @staticmethod
-    def generate_filename(user_id, original_filename):
-
-        extension = original_filename.rsplit(
-            ".",
-            1
-        )[1].lower()
-
-        unique_id = uuid.uuid4().hex[:12]
-
-        filename = (
-            f"user_{user_id}_{unique_id}.{extension}"
-        )
-
-        return secure_filename(filename)
-
     # =========================================================
     # Delete Old Profile Image
     # =========================================================
@@ -155,26 +138,28 @@ class ProfileService:
         if not user:
             return
 
-        if not user.image:
+        ProfileService.delete_image_path(user.image)
+
+    @staticmethod
+    def delete_image_path(image_path):
+
+        if not image_path:
             return
 
-        old_path = os.path.join(
-            current_app.static_folder,
-            user.image
+        folder, filename = os.path.split(
+            os.path.join("static", image_path).replace("\\", "/")
         )
 
-        # Check whether file exists
-        if os.path.exists(old_path):
-
-            try:
+        try:
 
-                os.remove(old_path)
+            # Only removed once no other row references the same file
+            UploadStore.delete(filename, folder)
 
-            except OSError as e:
+        except OSError as e:
 
-                current_app.logger.warning(
-                    f"Unable to delete old profile image: {e}"
-                )
+            current_app.logger.warning(
+                f"Unable to delete old profile image: {e}"
+            )
 
     # =========================================================
     # Upload / Change Profile Image
@@ -216,23 +201,6 @@ class ProfileService:
                     "Allowed: JPG, JPEG, PNG and WEBP."
                 )
 
-            # -----------------------------------------
-            # Check file size
-            # -----------------------------------------
-
-            file.seek(0, os.SEEK_END)
-
-            file_size = file.tell()
-
-            file.seek(0)
-
-            if file_size > ProfileService.MAX_FILE_SIZE:
-
-                return (
-                    False,
-                    "Image size must be less than 2 MB."
-                )
-
             # -----------------------------------------
             # Find User
             # -----------------------------------------
@@ -247,40 +215,27 @@ class ProfileService:
                 )
 
             # -----------------------------------------
-            # Get Upload Folder
+            # Save New Image (content-addressed)
+            # Size and file type are checked while the
+            # upload is streamed to disk
             # -----------------------------------------
 
-            upload_folder = (
-                ProfileService.get_upload_folder()
-            )
+            old_image = user.image
 
-            # -----------------------------------------
-            # Generate New Filename
-            # -----------------------------------------
+            try:
 
-            filename = (
-                ProfileService.generate_filename(
-                    user.id,
-                    file.filename
+                filename = UploadStore.save(
+                    file,
+                    PROFILE_UPLOAD_FOLDER,
+                    max_size=ProfileService.MAX_FILE_SIZE
                 )
-            )
-
-            file_path = os.path.join(
-                upload_folder,
-                filename
-            )
-
-            # -----------------------------------------
-            # Delete Previous Image
-            # -----------------------------------------
-
-            ProfileService.delete_old_image(user)
 
-            # -----------------------------------------
-            # Save New Image
-            # -----------------------------------------
+            except UploadError as e:
 
-            file.save(file_path)
+                return (
+                    False,
+                    str(e)
+                )
 
             # -----------------------------------------
             # Save Relative Path to Database
@@ -294,6 +249,14 @@ class ProfileService:
 
             db.session.commit()
 
+            # -----------------------------------------
+            # Delete Previous Image
+            # -----------------------------------------
+
+            if old_image and old_image != user.image:
+
+                ProfileService.delete_image_path(old_image)
+
             return (
                 True,
                 "Profile image updated successfully."
@@ -329,11 +292,7 @@ class ProfileService:
                     "User not found."
                 )
 
-            # -----------------------------------------
-            # Delete Physical Image
-            # -----------------------------------------
-
-            ProfileService.delete_old_image(user)
+            old_image = user.image
 
             # -----------------------------------------
             # Remove Database Path
@@ -343,6 +302,12 @@ class ProfileService:
 
             db.session.commit()
 
+            # -----------------------------------------
+            # Delete Physical Image (if unreferenced)
+            # -----------------------------------------
+
+            ProfileService.delete_image_path(old_image)
+
             return (
                 True,
                 "Profile image removed successfully."
@@ -0,0 +1,234 @@
+import heapq
+import itertools
+import threading
+import time
+
+from flask import (
+    before_render_template,
+    current_app,
+    g,
+    has_request_context,
+    request,
+    template_rendered
+)
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+# ================= CONFIG ================= #
+DEFAULT_SLOW_MS = 500
+DEFAULT_TOP_STATEMENTS = 5
+STATEMENT_PREVIEW = 300
+
+# Upper bounds (ms) of the latency buckets; the last bucket is +Inf
+TIME_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+# Upper bounds of the SQL statements-per-request buckets
+COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+
+class Histogram:
+    """Cumulative-bucket histogram (Prometheus style) with sum and count."""
+
+    def __init__(self, buckets):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value) -> None:
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        else:
+            self.counts[-1] += 1
+
+        self.sum += value
+        self.count += 1
+
+    def to_dict(self) -> dict:
+        return {
+            "buckets": list(self.buckets),
+            "counts": list(self.counts),
+            "sum": round(self.sum, 3),
+            "count": self.count
+        }
+
+
+class RequestMetrics:
+    """
+    Opt-in per-request timing (REQUEST_METRICS_ENABLED).
+
+    For every request it records the wall time, the number and total time
+    of SQL statements (SQLAlchemy ``before/after_cursor_execute`` events)
+    and the template render time (Flask render signals). Values are
+    aggregated per endpoint into in-memory histograms, and requests slower
+    than REQUEST_METRICS_SLOW_MS are logged with their slowest statements.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._endpoints = {}
+        self._sequence = itertools.count()
+        self.enabled = False
+        self.slow_ms = DEFAULT_SLOW_MS
+        self.top_statements = DEFAULT_TOP_STATEMENTS
+        self._listening = False
+
+    def init_app(self, app):
+        self.enabled = app.config.get("REQUEST_METRICS_ENABLED", False)
+        if not self.enabled:
+            return
+
+        self.slow_ms = app.config.get("REQUEST_METRICS_SLOW_MS", DEFAULT_SLOW_MS)
+        self.top_statements = app.config.get(
+            "REQUEST_METRICS_TOP_STATEMENTS", DEFAULT_TOP_STATEMENTS
+        )
+
+        app.before_request(self._start)
+        app.after_request(self._finish)
+        app.teardown_request(self._teardown)
+
+        before_render_template.connect(self._before_render, app)
+        template_rendered.connect(self._after_render, app)
+
+        if not self._listening:
+            event.listen(Engine, "before_cursor_execute", self._before_execute)
+            event.listen(Engine, "after_cursor_execute", self._after_execute)
+            self._listening = True
+
+    # ---------- REQUEST ---------- #
+
+    @staticmethod
+    def _current():
+        if not has_request_context():
+            return None
+        return g.get("_request_metrics")
+
+    def _start(self):
+        g._request_metrics = {
+            "start": time.perf_counter(),
+            "sql_count": 0,
+            "sql_ms": 0.0,
+            "slowest": [],
+            "render_ms": 0.0,
+            "render_stack": [],
+            "recorded": False
+        }
+
+    def _finish(self, response):
+        self._record(response.status_code)
+        return response
+
+    def _teardown(self, exc):
+        # after_request does not run when a view raised
+        if exc is not None:
+            self._record(500)
+
+    # ---------- SQL ---------- #
+
+    def _before_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if context is not None and self._current() is not None:
+            context._request_metrics_start = time.perf_counter()
+
+    def _after_execute(self, conn, cursor, statement, parameters, context, executemany):
+        started = getattr(context, "_request_metrics_start", None)
+        metrics = self._current()
+        if started is None or metrics is None:
+            return
+
+        elapsed_ms = (time.perf_counter() - started) * 1000
+
+        metrics["sql_count"] += 1
+        metrics["sql_ms"] += elapsed_ms
+
+        entry = (elapsed_ms, next(self._sequence), statement[:STATEMENT_PREVIEW])
+        if len(metrics["slowest"]) < self.top_statements:
+            heapq.heappush(metrics["slowest"], entry)
+        else:
+            heapq.heappushpop(metrics["slowest"], entry)
+
+    # ---------- TEMPLATES ---------- #
+
+    def _before_render(self, sender, template, context, **extra):
+        metrics = self._current()
+        if metrics is not None:
+            metrics["render_stack"].append(time.perf_counter())
+
+    def _after_render(self, sender, template, context, **extra):
+        metrics = self._current()
+        if metrics is not None and metrics["render_stack"]:
+            started = metrics["render_stack"].pop()
+            # Only count the outermost render; nested ones are inside it
+            if not metrics["render_stack"]:
+                metrics["render_ms"] += (time.perf_counter() - started) * 1000
+
+    # ---------- AGGREGATE ---------- #
+
+    def _record(self, status_code):
+        metrics = self._current()
+        if metrics is None or metrics["recorded"]:
+            return
+
+        metrics["recorded"] = True
+        wall_ms = (time.perf_counter() - metrics["start"]) * 1000
+        endpoint = request.endpoint or "<unmatched>"
+
+        with self._lock:
+            stats = self._endpoints.get(endpoint)
+            if stats is None:
+                stats = self._endpoints[endpoint] = {
+                    "wall_ms": Histogram(TIME_BUCKETS_MS),
+                    "sql_ms": Histogram(TIME_BUCKETS_MS),
+                    "sql_count": Histogram(COUNT_BUCKETS),
+                    "render_ms": Histogram(TIME_BUCKETS_MS),
+                    "status": {}
+                }
+
+            stats["wall_ms"].observe(wall_ms)
+            stats["sql_ms"].observe(metrics["sql_ms"])
+            stats["sql_count"].observe(metrics["sql_count"])
+            stats["render_ms"].observe(metrics["render_ms"])
+
+            status = str(status_code)
+            stats["status"][status] = stats["status"].get(status, 0) + 1
+
+        if wall_ms >= self.slow_ms:
+            self._log_slow(endpoint, wall_ms, metrics)
+
+    @staticmethod
+    def _log_slow(endpoint, wall_ms, metrics):
+        slowest = sorted(metrics["slowest"], reverse=True)
+        lines = [
+            f"  {ms:.1f} ms  {statement}"
+            for ms, _, statement in slowest
+        ]
+
+        current_app.logger.warning(
+            f"Slow request {request.method} {request.path} ({endpoint}): "
+            f"{wall_ms:.1f} ms total, "
+            f"{metrics['sql_count']} SQL statements in {metrics['sql_ms']:.1f} ms, "
+            f"render {metrics['render_ms']:.1f} ms"
+            + ("\n" + "\n".join(lines) if lines else "")
+        )
+
+    def snapshot(self) -> dict:
+        """Histograms per endpoint, as plain dicts."""
+        with self._lock:
+            return {
+                endpoint: {
+                    "wall_ms": stats["wall_ms"].to_dict(),
+                    "sql_ms": stats["sql_ms"].to_dict(),
+                    "sql_count": stats["sql_count"].to_dict(),
+                    "render_ms": stats["render_ms"].to_dict(),
+                    "status": dict(stats["status"])
+                }
+                for endpoint, stats in self._endpoints.items()
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._endpoints.clear()
+
+
+request_metrics = RequestMetrics()
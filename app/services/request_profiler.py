@@ -0,0 +1,186 @@
+import cProfile
+import io
+import json
+import os
+import pstats
+import re
+import time
+from datetime import datetime
+
+from flask import current_app, g, request
+from flask_login import current_user
+
+
+# ================= CONFIG ================= #
+PROFILE_HEADER = "X-Profile"
+PROFILE_ARG = "_profile"
+DEFAULT_KEEP = 50
+TOP_FUNCTIONS = 25
+
+
+class RequestProfiler:
+    """
+    On-demand cProfile of a single request, for admins only.
+
+    An Admin adds ``X-Profile: 1`` or ``?_profile=1`` to any request; it
+    then runs under cProfile and the result is stored in PROFILE_DIR as a
+    ``.prof`` file (readable by pstats / snakeviz) plus a JSON summary of
+    the top functions. Only the newest PROFILE_KEEP profiles are kept. The
+    response carries ``X-Profile-Id`` pointing at the stored profile.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.profile_dir = None
+        self.keep = DEFAULT_KEEP
+
+    def init_app(self, app):
+        self.enabled = app.config.get("PROFILER_ENABLED", False)
+        self.profile_dir = app.config.get("PROFILE_DIR") or os.path.join(
+            app.instance_path, "profiles"
+        )
+        self.keep = app.config.get("PROFILE_KEEP", DEFAULT_KEEP)
+
+        if self.enabled:
+            app.before_request(self._start)
+            app.after_request(self._finish)
+            app.teardown_request(self._teardown)
+
+    # ---------- REQUEST ---------- #
+
+    @staticmethod
+    def _requested() -> bool:
+        flag = request.headers.get(PROFILE_HEADER) or request.args.get(PROFILE_ARG)
+        return flag in ("1", "true", "yes")
+
+    @staticmethod
+    def _is_admin() -> bool:
+        # Same rule as decorators.require_admin
+        return current_user.is_authenticated and current_user.has_role("Admin")
+
+    def _start(self):
+        if not self._requested() or not self._is_admin():
+            return
+
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError as e:
+            # Python 3.12+ allows one active profiler per process: another
+            # thread is already profiling, so serve this request unprofiled
+            current_app.logger.info(f"RequestProfiler skipped: {e}")
+            return
+
+        g._request_profile = (profiler, time.perf_counter())
+
+    def _finish(self, response):
+        state = g.pop("_request_profile", None)
+        if state is None:
+            return response
+
+        profiler, started = state
+        profiler.disable()
+        wall_ms = (time.perf_counter() - started) * 1000
+
+        try:
+            profile_id = self._save(profiler, wall_ms, response.status_code)
+            response.headers["X-Profile-Id"] = profile_id
+        except Exception as e:
+            current_app.logger.warning(f"RequestProfiler save error: {e}")
+
+        return response
+
+    def _teardown(self, exc):
+        # after_request is skipped when the view raised
+        state = g.pop("_request_profile", None)
+        if state is not None:
+            state[0].disable()
+
+    # ---------- STORAGE ---------- #
+
+    def _save(self, profiler, wall_ms, status_code) -> str:
+        os.makedirs(self.profile_dir, exist_ok=True)
+
+        endpoint = re.sub(r"[^A-Za-z0-9_.-]", "_", request.endpoint or "unmatched")
+        profile_id = f"{datetime.now():%Y%m%d-%H%M%S-%f}-{os.getpid()}-{endpoint}"
+        base = os.path.join(self.profile_dir, profile_id)
+
+        profiler.dump_stats(base + ".prof")
+
+        summary = {
+            "id": profile_id,
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "method": request.method,
+            "path": request.full_path.rstrip("?"),
+            "endpoint": request.endpoint,
+            "status": status_code,
+            "wall_ms": round(wall_ms, 1),
+            "user_id": current_user.get_id(),
+            "top_functions": self._top_functions(profiler),
+        }
+
+        with open(base + ".json", "w", encoding="utf-8") as f:
+            json.dump(summary, f)
+
+        self._rotate()
+        return profile_id
+
+    @staticmethod
+    def _top_functions(profiler, limit=TOP_FUNCTIONS) -> list:
+        stats = pstats.Stats(profiler, stream=io.StringIO())
+        rows = []
+
+        for (filename, lineno, name), (cc, nc, tt, ct, _) in stats.stats.items():
+            rows.append({
+                "function": f"{os.path.basename(filename)}:{lineno}({name})",
+                "calls": nc,
+                "self_ms": round(tt * 1000, 2),
+                "cumulative_ms": round(ct * 1000, 2),
+            })
+
+        rows.sort(key=lambda r: r["cumulative_ms"], reverse=True)
+        return rows[:limit]
+
+    def _rotate(self) -> None:
+        summaries = sorted(
+            name for name in os.listdir(self.profile_dir) if name.endswith(".json")
+        )
+
+        for name in summaries[:-self.keep] if self.keep else []:
+            base = os.path.join(self.profile_dir, name[:-len(".json")])
+            for ext in (".json", ".prof"):
+                if os.path.exists(base + ext):
+                    os.remove(base + ext)
+
+    # ---------- ADMIN PAGE ---------- #
+
+    def recent(self, limit=None) -> list:
+        """Stored profile summaries, newest first."""
+        if not self.profile_dir or not os.path.isdir(self.profile_dir):
+            return []
+
+        names = sorted(
+            (n for n in os.listdir(self.profile_dir) if n.endswith(".json")),
+            reverse=True
+        )
+
+        profiles = []
+        for name in names[:limit] if limit else names:
+            try:
+                with open(os.path.join(self.profile_dir, name), encoding="utf-8") as f:
+                    profiles.append(json.load(f))
+            except (OSError, ValueError):
+                continue
+
+        return profiles
+
+    def prof_path(self, profile_id: str):
+        """Path of a stored ``.prof`` file, or None for unknown/unsafe ids."""
+        if not re.fullmatch(r"[A-Za-z0-9_.-]+", profile_id or ""):
+            return None
+
+        path = os.path.join(self.profile_dir, profile_id + ".prof")
+        return path if os.path.isfile(path) else None
+
+
+request_profiler = RequestProfiler()
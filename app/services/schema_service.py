@@ -0,0 +1,227 @@
+from datetime import datetime
+
+import click
+from sqlalchemy import inspect, text
+from sqlalchemy.exc import OperationalError, ProgrammingError
+
+from extensions import db
+from app.models.crop_monitoring import CropMonitoringTable
+from app.models.diagnosis_history import DiagnosisHistoryTable
+from app.models.farm import FarmTable
+from app.models.field import FieldTable
+from app.models.field_crop import FieldCropTable
+from app.models.preventions import PreventionTable
+from app.models.rule_conditions import RuleConditionsTable
+from app.models.schema_version import SchemaVersionTable
+from app.models.treatment_histories import TreatmentHistoryTable
+from app.models.treatments import TreatmentTable
+from app.models.UserNotification import UserNotification
+
+
+# ================= CONFIG ================= #
+# MySQL named lock so concurrent upgrades run one after another
+LOCK_NAME = "schema_migrations"
+LOCK_TIMEOUT = 60
+
+MIGRATIONS = []
+
+
+def migration(version: int, name: str):
+    """Register ``fn(connection)`` as schema migration ``version``."""
+    def decorator(fn):
+        if any(v == version for v, _, _ in MIGRATIONS):
+            raise ValueError(f"Duplicate schema migration version {version}")
+        MIGRATIONS.append((version, name, fn))
+        MIGRATIONS.sort(key=lambda m: m[0])
+        return fn
+    return decorator
+
+
+def _create_index(connection, model, name):
+    """Create an index declared in ``model.__table_args__`` if it is missing."""
+    index = next(
+        (i for i in model.__table__.indexes if i.name == name),
+        None
+    )
+    if index is None:
+        raise ValueError(f"{model.__name__} declares no index {name}")
+
+    index.create(connection, checkfirst=True)
+
+
+# ================= MIGRATIONS ================= #
+# Append new migrations at the end with the next version number; never
+# edit one that has been applied. Indexes and columns are declared on the
+# models first, so fresh databases get them from version 1.
+
+@migration(1, "initial schema")
+def _initial_schema(connection):
+    # Creates missing tables only, as db.create_all() did at startup
+    db.metadata.create_all(connection)
+
+
+@migration(2, "hot path and ownership indexes")
+def _hot_path_indexes(connection):
+    for model, name in (
+        (RuleConditionsTable, "ix_rule_conditions_rule_active"),
+        # (field_crop_id, monitoring_date) is a prefix of this one
+        (CropMonitoringTable, "ix_crop_monitorings_crop_date_id"),
+        (DiagnosisHistoryTable, "ix_diagnosis_history_user_created"),
+        (UserNotification, "ix_user_notification_user_deleted_created"),
+        (TreatmentTable, "ix_treatments_disease_active_priority"),
+        (PreventionTable, "ix_preventions_disease_active_priority"),
+        (FarmTable, "ix_farms_user_id"),
+        (FieldTable, "ix_fields_farm_id"),
+        (FieldCropTable, "ix_field_crops_field_id"),
+        (TreatmentHistoryTable, "ix_treatment_histories_monitoring_id"),
+    ):
+        _create_index(connection, model, name)
+
+
+@migration(3, "broadcast notifications: nullable user_notification.user_id")
+def _nullable_notification_user(connection):
+    # Databases created before broadcasts have user_id NOT NULL; create_all
+    # (version 1) does not alter existing columns
+    column = next(
+        c for c in inspect(connection).get_columns("user_notification")
+        if c["name"] == "user_id"
+    )
+    if column["nullable"]:
+        return
+
+    if connection.dialect.name == "mysql":
+        connection.execute(text(
+            "ALTER TABLE user_notification MODIFY user_id INT NULL"
+        ))
+    elif connection.dialect.name == "postgresql":
+        connection.execute(text(
+            "ALTER TABLE user_notification ALTER COLUMN user_id DROP NOT NULL"
+        ))
+    else:
+        raise RuntimeError(
+            f"Make user_notification.user_id nullable by hand on "
+            f"{connection.dialect.name}, then re-run the upgrade"
+        )
+
+
+class SchemaService:
+    """
+    Versioned schema migrations.
+
+    Each migration in MIGRATIONS runs once, in version order, and is then
+    recorded in ``tbl_schema_versions``. Migrations are applied with
+    ``flask db upgrade`` (or at startup with SCHEMA_AUTO_UPGRADE); a normal
+    start only runs ``check()``. Replaces ``db.create_all()`` at startup
+    and the hand-written ALTERs in ``note/how_manager_database.md``.
+    """
+
+    @staticmethod
+    def head() -> int:
+        """Latest migration version known to this code."""
+        return MIGRATIONS[-1][0] if MIGRATIONS else 0
+
+    @staticmethod
+    def current_version() -> int:
+        """Highest applied version (0 if the database was never migrated)."""
+        try:
+            with db.engine.connect() as connection:
+                version = connection.execute(
+                    db.select(db.func.max(SchemaVersionTable.version))
+                ).scalar()
+        except (OperationalError, ProgrammingError):
+            # tbl_schema_versions does not exist yet
+            return 0
+
+        return version or 0
+
+    @staticmethod
+    def check(app) -> None:
+        """
+        Startup check: compare the applied version with head (one query).
+
+        SCHEMA_VERSION_CHECK is "warn" (log), "strict" (refuse to start)
+        or "off". Under the ``flask`` CLI strict only warns, so
+        ``flask db upgrade`` can still run against an old schema.
+        """
+        mode = app.config.get("SCHEMA_VERSION_CHECK", "warn")
+        if mode == "off":
+            return
+
+        with app.app_context():
+            current = SchemaService.current_version()
+
+        head = SchemaService.head()
+        if current >= head:
+            return
+
+        message = (
+            f"Database schema is at version {current}, code expects {head}; "
+            f"run 'flask --app run db upgrade'."
+        )
+
+        if mode == "strict" and click.get_current_context(silent=True) is None:
+            raise RuntimeError(message)
+
+        app.logger.warning(message)
+
+    @staticmethod
+    def pending() -> list:
+        current = SchemaService.current_version()
+        return [(v, name) for v, name, _ in MIGRATIONS if v > current]
+
+    @staticmethod
+    def upgrade(target=None) -> list:
+        """Apply pending migrations up to ``target`` (default: head)."""
+        target = SchemaService.head() if target is None else target
+        applied = []
+
+        with db.engine.connect() as lock_connection:
+            SchemaService._lock(lock_connection)
+
+            try:
+                SchemaVersionTable.__table__.create(db.engine, checkfirst=True)
+                current = SchemaService.current_version()
+
+                for version, name, fn in MIGRATIONS:
+                    if version <= current or version > target:
+                        continue
+
+                    with db.engine.begin() as connection:
+                        fn(connection)
+                        connection.execute(
+                            SchemaVersionTable.__table__.insert().values(
+                                version=version,
+                                name=name,
+                                applied_at=datetime.utcnow()
+                            )
+                        )
+
+                    applied.append((version, name))
+
+            finally:
+                SchemaService._unlock(lock_connection)
+
+        return applied
+
+    # ---------- LOCK ---------- #
+
+    @staticmethod
+    def _lock(connection):
+        if connection.dialect.name != "mysql":
+            return
+
+        acquired = connection.execute(
+            text("SELECT GET_LOCK(:name, :timeout)"),
+            {"name": LOCK_NAME, "timeout": LOCK_TIMEOUT}
+        ).scalar()
+
+        if acquired != 1:
+            raise RuntimeError("Timed out waiting for another schema upgrade")
+
+    @staticmethod
+    def _unlock(connection):
+        if connection.dialect.name == "mysql":
+            connection.execute(
+                text("SELECT RELEASE_LOCK(:name)"),
+                {"name": LOCK_NAME}
+            )
@@ -0,0 +1,250 @@
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+from logging.handlers import RotatingFileHandler
+
+from flask import has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.services.nplusone_detector import fingerprint
+
+
+# ================= CONFIG ================= #
+DEFAULT_THRESHOLD_MS = 200
+DEFAULT_MAX_BYTES = 5 * 1024 * 1024
+DEFAULT_BACKUPS = 5
+# Explain each statement shape at most once per interval (seconds)
+EXPLAIN_INTERVAL = 300
+STATEMENT_PREVIEW = 4000
+PARAMS_PREVIEW = 1000
+
+# Parameters are logged as their type and length only, unless
+# SLOW_QUERY_LOG_PARAMS is on (they can hold password hashes, tokens, emails)
+REDACTED = "?"
+
+EXPLAIN_PREFIX = {
+    "mysql": "EXPLAIN ",
+    "sqlite": "EXPLAIN QUERY PLAN ",
+    "postgresql": "EXPLAIN ",
+}
+
+
+class SlowQueryLog:
+    """
+    Records SQL statements slower than SLOW_QUERY_MS.
+
+    Each slow statement is appended as one JSON line to SLOW_QUERY_LOG
+    (rotated at SLOW_QUERY_LOG_MAX_BYTES) with the type and length of its
+    bound parameters (their values only with SLOW_QUERY_LOG_PARAMS),
+    elapsed time, the endpoint that issued it and, for SELECTs, the
+    database's EXPLAIN plan. The plan is taken on the same connection
+    through a raw DB-API cursor, so it does not re-enter these events.
+    ``summary()`` groups the log by statement shape for the admin page.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._explained = {}
+        self._listening = False
+        self.enabled = False
+        self.threshold_ms = DEFAULT_THRESHOLD_MS
+        self.path = None
+        self.max_bytes = DEFAULT_MAX_BYTES
+        self.backups = DEFAULT_BACKUPS
+        self.log_params = False
+        self.logger = logging.getLogger("slow_query")
+
+    def init_app(self, app):
+        self.enabled = app.config.get("SLOW_QUERY_ENABLED", False)
+        self.threshold_ms = app.config.get("SLOW_QUERY_MS", DEFAULT_THRESHOLD_MS)
+        self.path = app.config.get("SLOW_QUERY_LOG") or os.path.join(
+            app.instance_path, "slow_queries.log"
+        )
+        self.max_bytes = app.config.get("SLOW_QUERY_LOG_MAX_BYTES", DEFAULT_MAX_BYTES)
+        self.backups = app.config.get("SLOW_QUERY_LOG_BACKUPS", DEFAULT_BACKUPS)
+        self.log_params = app.config.get("SLOW_QUERY_LOG_PARAMS", False)
+
+        if not self.enabled:
+            return
+
+        if not self._listening:
+            event.listen(Engine, "before_cursor_execute", self._before_execute)
+            event.listen(Engine, "after_cursor_execute", self._after_execute)
+            self._listening = True
+
+    # ---------- SQL ---------- #
+
+    def _before_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if context is not None:
+            context._slow_query_start = time.perf_counter()
+
+    def _after_execute(self, conn, cursor, statement, parameters, context, executemany):
+        started = getattr(context, "_slow_query_start", None)
+        if started is None:
+            return
+
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        if elapsed_ms < self.threshold_ms:
+            return
+
+        try:
+            self._record(conn, cursor, statement, parameters, context, elapsed_ms)
+        except Exception as e:
+            # Never let the recorder break the query that triggered it
+            logging.getLogger("app").warning(f"SlowQueryLog error: {e}")
+
+    def _record(self, conn, cursor, statement, parameters, context, elapsed_ms):
+        shape = fingerprint(statement)
+
+        entry = {
+            "ts": datetime.now().isoformat(timespec="seconds"),
+            "elapsed_ms": round(elapsed_ms, 2),
+            "fingerprint": shape,
+            "statement": statement[:STATEMENT_PREVIEW],
+            "params": self._params(parameters),
+            "endpoint": request.endpoint if has_request_context() else None,
+            "explain": None,
+        }
+
+        # A server-side cursor still owns the connection's result stream
+        if (
+            not context.executemany
+            and not getattr(context, "_is_server_side", False)
+            and self._should_explain(shape, statement)
+        ):
+            entry["explain"] = self._explain(conn, cursor, statement, parameters)
+
+        self._write(json.dumps(entry, default=str))
+
+    def _write(self, line: str) -> None:
+        # The log file (and its directory) is created on the first record
+        if not self.logger.handlers:
+            with self._lock:
+                if not self.logger.handlers:
+                    os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                    handler = RotatingFileHandler(
+                        self.path,
+                        maxBytes=self.max_bytes,
+                        backupCount=self.backups,
+                        encoding="utf-8"
+                    )
+                    handler.setFormatter(logging.Formatter("%(message)s"))
+                    self.logger.addHandler(handler)
+                    self.logger.setLevel(logging.INFO)
+                    self.logger.propagate = False
+
+        self.logger.info(line)
+
+    def _params(self, parameters) -> str:
+        if self.log_params:
+            return json.dumps(parameters, default=str)[:PARAMS_PREVIEW]
+
+        def redact(value):
+            if value is None:
+                return None
+            if isinstance(value, (str, bytes)):
+                return f"{REDACTED}{type(value).__name__}({len(value)})"
+            return f"{REDACTED}{type(value).__name__}"
+
+        if isinstance(parameters, dict):
+            shown = {key: redact(value) for key, value in parameters.items()}
+        elif isinstance(parameters, (list, tuple)):
+            shown = [
+                [redact(v) for v in row] if isinstance(row, (list, tuple))
+                else redact(row)
+                for row in parameters
+            ]
+        else:
+            shown = redact(parameters)
+
+        return json.dumps(shown)[:PARAMS_PREVIEW]
+
+    def _should_explain(self, shape, statement) -> bool:
+        if not statement.lstrip().upper().startswith("SELECT"):
+            return False
+
+        now = time.monotonic()
+        with self._lock:
+            if now - self._explained.get(shape, -EXPLAIN_INTERVAL) < EXPLAIN_INTERVAL:
+                return False
+            self._explained[shape] = now
+        return True
+
+    @staticmethod
+    def _explain(conn, cursor, statement, parameters):
+        prefix = EXPLAIN_PREFIX.get(conn.dialect.name)
+        if prefix is None:
+            return None
+
+        explain_cursor = cursor.connection.cursor()
+        try:
+            explain_cursor.execute(prefix + statement, parameters)
+            columns = [col[0] for col in explain_cursor.description or []]
+            return [dict(zip(columns, row)) for row in explain_cursor.fetchall()]
+        finally:
+            explain_cursor.close()
+
+    # ---------- ADMIN PAGE ---------- #
+
+    def _files(self) -> list:
+        if not self.path:
+            return []
+        candidates = [self.path] + [f"{self.path}.{i}" for i in range(1, self.backups + 1)]
+        return [p for p in candidates if os.path.isfile(p)]
+
+    def summary(self) -> list:
+        """Slow statements grouped by shape, highest total time first."""
+        groups = {}
+
+        for path in self._files():
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue
+
+                    group = groups.get(entry["fingerprint"])
+                    if group is None:
+                        group = groups[entry["fingerprint"]] = {
+                            "fingerprint": entry["fingerprint"],
+                            "count": 0,
+                            "total_ms": 0.0,
+                            "max_ms": 0.0,
+                            "last_seen": None,
+                            "endpoints": set(),
+                            "sample": None,
+                            "explain": None,
+                            "explain_ts": "",
+                        }
+
+                    group["count"] += 1
+                    group["total_ms"] += entry["elapsed_ms"]
+                    if entry.get("endpoint"):
+                        group["endpoints"].add(entry["endpoint"])
+
+                    if entry["elapsed_ms"] >= group["max_ms"]:
+                        group["max_ms"] = entry["elapsed_ms"]
+                        group["sample"] = entry
+
+                    # Keep the most recent plan
+                    if entry["explain"] and entry["ts"] >= group["explain_ts"]:
+                        group["explain"] = entry["explain"]
+                        group["explain_ts"] = entry["ts"]
+
+                    if group["last_seen"] is None or entry["ts"] > group["last_seen"]:
+                        group["last_seen"] = entry["ts"]
+
+        for group in groups.values():
+            group["total_ms"] = round(group["total_ms"], 2)
+            group["avg_ms"] = round(group["total_ms"] / group["count"], 2)
+            group["endpoints"] = sorted(group["endpoints"])
+
+        return sorted(groups.values(), key=lambda g: g["total_ms"], reverse=True)
+
+
+slow_query_log = SlowQueryLog()
@@ -0,0 +1,121 @@
+import threading
+from collections import OrderedDict, namedtuple
+
+from extensions import db
+from app.decorators.conditional import kb_state
+from app.models.symptoms import SymptomsTable
+
+
+# ================= CONFIG ================= #
+# Display order of the diagnosis page groups; any other group follows
+GROUP_ORDER = [
+    "Grain(គ្រាប់)",
+    "Leaf(ស្លឹក)",
+    "Root(ឬស)",
+    "Stem(ដើម)",
+]
+
+# Plain value kept in the cache instead of session-bound ORM rows
+SymptomEntry = namedtuple(
+    "SymptomEntry",
+    ["id", "symptom_name", "symptom_group", "is_active"]
+)
+
+
+def _ordered_groups(entries):
+    """Bucket entries by group: GROUP_ORDER first, unknown groups sorted after."""
+    grouped = OrderedDict((group, []) for group in GROUP_ORDER)
+
+    extra = OrderedDict()
+    for entry in entries:
+        bucket = grouped if entry.symptom_group in grouped else extra
+        bucket.setdefault(entry.symptom_group, []).append(entry)
+
+    for group in sorted(extra, key=lambda g: (g is None, g or "")):
+        grouped[group] = extra[group]
+
+    return grouped
+
+
+class SymptomCatalogueService:
+    """
+    Symptom catalogue shared by the diagnosis and rule-condition pages.
+
+    All symptoms are loaded in one query and kept per worker until the
+    ``kb_state()`` of the symptom table (max ``updated_at`` and row count)
+    changes. That check is one aggregate query and sees writes made by any
+    worker, so diagnosis pages no longer load every symptom row to build
+    their checkbox lists.
+    """
+
+    _lock = threading.Lock()
+    _generation = None
+    _catalogue = None
+
+    @staticmethod
+    def _load() -> dict:
+        rows = db.session.execute(
+            db.select(
+                SymptomsTable.id,
+                SymptomsTable.symptom_name,
+                SymptomsTable.symptom_group,
+                SymptomsTable.is_active
+            ).order_by(SymptomsTable.id)
+        ).all()
+
+        entries = [SymptomEntry(*row) for row in rows]
+        active = [e for e in entries if e.is_active]
+
+        return {
+            "choices": [(e.id, e.symptom_name) for e in active],
+            "grouped": _ordered_groups(active),
+            "pairs": OrderedDict(
+                (group, [(e.id, e.symptom_name) for e in items])
+                for group, items in _ordered_groups(entries).items()
+                if items
+            ),
+        }
+
+    @staticmethod
+    def _get() -> dict:
+        generation = tuple(
+            db.session.execute(db.select(*kb_state(SymptomsTable))).one()
+        )
+
+        with SymptomCatalogueService._lock:
+            if (
+                SymptomCatalogueService._catalogue is not None
+                and SymptomCatalogueService._generation == generation
+            ):
+                return SymptomCatalogueService._catalogue
+
+        catalogue = SymptomCatalogueService._load()
+
+        with SymptomCatalogueService._lock:
+            SymptomCatalogueService._catalogue = catalogue
+            SymptomCatalogueService._generation = generation
+
+        return catalogue
+
+    # ---------- READ ---------- #
+
+    @staticmethod
+    def choices() -> list:
+        """WTForms ``(id, name)`` choices of every active symptom."""
+        return list(SymptomCatalogueService._get()["choices"])
+
+    @staticmethod
+    def grouped() -> OrderedDict:
+        """Active symptoms by group, for the diagnosis checkbox lists."""
+        return SymptomCatalogueService._get()["grouped"]
+
+    @staticmethod
+    def grouped_pairs() -> OrderedDict:
+        """``group -> [(id, name)]`` of all symptoms, for rule-condition forms."""
+        return SymptomCatalogueService._get()["pairs"]
+
+    @staticmethod
+    def clear() -> None:
+        with SymptomCatalogueService._lock:
+            SymptomCatalogueService._catalogue = None
+            SymptomCatalogueService._generation = None
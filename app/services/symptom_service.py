@@ -3,6 +3,7 @@ from extensions import db
 from app.models.symptoms import SymptomsTable
 from sqlalchemy.exc import SQLAlchemyError
 from app.services.audit_service import log_audit  # Audit CSV
+from app.services.fragment_cache import fragment_cache
 
 
 class SymptomService:
@@ -41,6 +42,7 @@ class SymptomService:
         try:
             db.session.add(symptom)
             db.session.commit()
+            fragment_cache.bump()
         except SQLAlchemyError as e:
             db.session.rollback()
             raise ValueError(f"Database error: {str(e)}")
@@ -90,6 +92,7 @@ class SymptomService:
 
         try:
             db.session.commit()
+            fragment_cache.bump()
         except SQLAlchemyError as e:
             db.session.rollback()
             raise ValueError(f"Database error: {str(e)}")
@@ -123,6 +126,7 @@ class SymptomService:
         try:
             db.session.delete(symptom)
             db.session.commit()
+            fragment_cache.bump()
         except SQLAlchemyError as e:
             db.session.rollback()
             raise ValueError(f"Database error: {str(e)}")
@@ -5,6 +5,7 @@ from extensions import db
 
 from app.models.treatments import TreatmentTable
 from app.models.treatment_histories import TreatmentHistoryTable
+from app.services.ownership_scope import OwnershipScope
 
 
 class TreatmentHistoryService:
@@ -57,18 +58,24 @@ class TreatmentHistoryService:
     # =====================================================
 
     @staticmethod
-    def get_by_id(history_id):
+    def get_by_id(history_id, user_id=None):
 
         try:
 
-            return (
-                TreatmentHistoryTable.query
-                .filter(
-                    TreatmentHistoryTable.id == history_id
-                )
-                .first()
+            query = TreatmentHistoryTable.query.filter(
+                TreatmentHistoryTable.id == history_id
             )
 
+            if user_id is not None:
+
+                query = OwnershipScope.apply(
+                    query,
+                    TreatmentHistoryTable,
+                    user_id
+                )
+
+            return query.first()
+
         except Exception as e:
 
             db.session.rollback()
@@ -85,16 +92,25 @@ class TreatmentHistoryService:
     # =====================================================
 
     @staticmethod
-    def get_by_monitoring(monitoring_id):
+    def get_by_monitoring(monitoring_id, user_id=None):
 
         try:
 
-            return (
-                TreatmentHistoryTable.query
-                .filter(
-                    TreatmentHistoryTable.monitoring_id
-                    == monitoring_id
+            query = TreatmentHistoryTable.query.filter(
+                TreatmentHistoryTable.monitoring_id
+                == monitoring_id
+            )
+
+            if user_id is not None:
+
+                query = OwnershipScope.apply(
+                    query,
+                    TreatmentHistoryTable,
+                    user_id
                 )
+
+            return (
+                query
                 .order_by(
                     TreatmentHistoryTable.treatment_date.desc()
                 )
@@ -117,16 +133,25 @@ class TreatmentHistoryService:
     # =====================================================
 
     @staticmethod
-    def get_by_diagnosis(diagnosis_history_id):
+    def get_by_diagnosis(diagnosis_history_id, user_id=None):
 
         try:
 
-            return (
-                TreatmentHistoryTable.query
-                .filter(
-                    TreatmentHistoryTable.diagnosis_history_id
-                    == diagnosis_history_id
+            query = TreatmentHistoryTable.query.filter(
+                TreatmentHistoryTable.diagnosis_history_id
+                == diagnosis_history_id
+            )
+
+            if user_id is not None:
+
+                query = OwnershipScope.apply(
+                    query,
+                    TreatmentHistoryTable,
+                    user_id
                 )
+
+            return (
+                query
                 .order_by(
                     TreatmentHistoryTable.treatment_date.desc()
                 )
@@ -231,7 +256,8 @@ class TreatmentHistoryService:
         monitoring_id=None,
         diagnosis_history_id=None,
         status=None,
-        search=None
+        search=None,
+        user_id=None
     ):
 
         try:
@@ -250,6 +276,19 @@ class TreatmentHistoryService:
             )
 
 
+            # =================================================
+            # OWNER FILTER
+            # =================================================
+
+            if user_id is not None:
+
+                query = OwnershipScope.apply(
+                    query,
+                    TreatmentHistoryTable,
+                    user_id
+                )
+
+
             # =================================================
             # MONITORING FILTER
             # =================================================
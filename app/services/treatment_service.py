@@ -9,6 +9,8 @@ from werkzeug.utils import secure_filename
 import os
 
 from app.services.audit_service import log_audit
+from app.services.upload_store import UploadStore
+from app.services.fragment_cache import fragment_cache
 
 # ================= CONFIG ================= #
 ALLOWED_EXTENSIONS = {"png", "jpg", "jpeg", "gif"}
@@ -21,21 +23,13 @@ def allowed_file(filename: str) -> bool:
 
 
 def save_image(image_file) -> str:
-    """Save image to static folder and return filename"""
-    filename = secure_filename(image_file.filename)
-    save_path = os.path.join(current_app.root_path, UPLOAD_FOLDER)
-    os.makedirs(save_path, exist_ok=True)
-    image_file.save(os.path.join(save_path, filename))
-    return filename
+    """Save image to static folder under its content hash and return filename"""
+    return UploadStore.save(image_file, UPLOAD_FOLDER)
 
 
 def delete_image(filename: str):
-    """Delete old image from static folder"""
-    if not filename:
-        return
-    file_path = os.path.join(current_app.root_path, UPLOAD_FOLDER, filename)
-    if os.path.exists(file_path):
-        os.remove(file_path)
+    """Delete old image from static folder once no row references it"""
+    UploadStore.delete(filename, UPLOAD_FOLDER)
 
 
 # ================= SERVICE ================= #
@@ -230,6 +224,7 @@ class TreatmentService:
         try:
             db.session.add(treatment)
             db.session.commit()
+            fragment_cache.bump()
         except SQLAlchemyError as e:
 
             db.session.rollback()
@@ -421,6 +416,7 @@ class TreatmentService:
         try:
 
             db.session.commit()
+            fragment_cache.bump()
 
         except SQLAlchemyError as e:
 
@@ -487,6 +483,7 @@ class TreatmentService:
         try:
             db.session.delete(treatment)
             db.session.commit()
+            fragment_cache.bump()
             delete_image(image)
         except SQLAlchemyError as e:
             db.session.rollback()
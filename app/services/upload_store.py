@@ -0,0 +1,228 @@
+import functools
+import hashlib
+import os
+import tempfile
+
+from flask import current_app
+from flask.wrappers import Request
+
+from app.models.diseases import DiseaseTable
+from app.models.preventions import PreventionTable
+from app.models.treatments import TreatmentTable
+from app.models.user import UserTable
+from app.services.image_service import ImageService
+
+
+# ================= CONFIG ================= #
+CHUNK_SIZE = 64 * 1024
+
+# Upload folder (relative to app.root_path) -> how rows reference a file in it
+REFERENCES = {
+    "static/images/diseases": [(DiseaseTable.image, "")],
+    "static/images/treatments": [(TreatmentTable.image, "")],
+    "static/images/preventions": [(PreventionTable.image, "")],
+    "static/uploads/profiles": [(UserTable.image, "uploads/profiles/")],
+}
+
+# Largest accepted image per upload folder, in bytes
+UPLOAD_LIMITS = {
+    "static/images/diseases": 5 * 1024 * 1024,
+    "static/images/treatments": 5 * 1024 * 1024,
+    "static/images/preventions": 5 * 1024 * 1024,
+    "static/uploads/profiles": 2 * 1024 * 1024,
+}
+
+# Room for the other form fields of a multipart upload request
+FORM_OVERHEAD = 256 * 1024
+
+# Leading bytes of each accepted image type
+SIGNATURES = {
+    "png": (b"\x89PNG\r\n\x1a\n",),
+    "jpeg": (b"\xff\xd8\xff",),
+    "gif": (b"GIF87a", b"GIF89a"),
+}
+
+EXTENSION_TYPES = {
+    "png": "png",
+    "jpg": "jpeg",
+    "jpeg": "jpeg",
+    "gif": "gif",
+    "webp": "webp",
+}
+
+
+class UploadError(ValueError):
+    """Upload rejected because of its content or size."""
+
+
+def sniff_image_type(head: bytes):
+    """Image type from the first bytes of a file, or None if unknown."""
+    if len(head) >= 12 and head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "webp"
+
+    for image_type, signatures in SIGNATURES.items():
+        if head.startswith(signatures):
+            return image_type
+
+    return None
+
+
+def upload_limit(max_bytes: int):
+    """
+    Route decorator: cap the whole request body at ``max_bytes`` plus
+    FORM_OVERHEAD instead of the global MAX_CONTENT_LENGTH, so Werkzeug
+    answers 413 before parsing (and buffering) an oversized upload.
+
+    Place it directly under ``@bp.route``.
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            return view(*args, **kwargs)
+
+        wrapper.upload_limit = max_bytes + FORM_OVERHEAD
+        return wrapper
+
+    return decorator
+
+
+class UploadLimitRequest(Request):
+    """Request class that honours per-view ``upload_limit`` caps."""
+
+    @property
+    def max_content_length(self):
+        if current_app and self.endpoint:
+            view = current_app.view_functions.get(self.endpoint)
+            limit = getattr(view, "upload_limit", None)
+            if limit is not None:
+                return limit
+
+        return super().max_content_length
+
+
+class UploadStore:
+    """
+    Content-addressed storage for uploaded images.
+
+    Files are named ``<sha256>.<ext>``, so uploading the same image twice
+    stores it once and a different image can never overwrite another one
+    that happens to share its original name. Because several rows may point
+    at the same file, ``delete()`` only removes it once no row in
+    ``REFERENCES`` uses it any more.
+    """
+
+    # ---------- SAVE ---------- #
+
+    @staticmethod
+    def save(file_storage, folder: str, max_size: int = None) -> str:
+        """
+        Store an uploaded file in ``folder`` and return its filename.
+
+        The upload is copied in chunks to a temporary file in the target
+        folder while it is hashed. The first chunk must carry the magic
+        bytes of the image type its extension claims, and copying stops
+        with UploadError as soon as ``max_size`` (default: UPLOAD_LIMITS
+        for the folder) is exceeded. The file is then renamed into place,
+        or dropped if identical content is already stored.
+        """
+        extension = ""
+        if file_storage.filename and "." in file_storage.filename:
+            extension = file_storage.filename.rsplit(".", 1)[1].lower()
+
+        expected_type = EXTENSION_TYPES.get(extension)
+        if expected_type is None:
+            raise UploadError("Invalid image format.")
+
+        if max_size is None:
+            max_size = UPLOAD_LIMITS.get(folder)
+
+        save_path = os.path.join(current_app.root_path, folder)
+        os.makedirs(save_path, exist_ok=True)
+
+        digest = hashlib.sha256()
+        fd, tmp_path = tempfile.mkstemp(dir=save_path, suffix=".part")
+
+        try:
+            stream = file_storage.stream
+            stream.seek(0)
+
+            size = 0
+
+            with os.fdopen(fd, "wb") as tmp:
+                for chunk in iter(lambda: stream.read(CHUNK_SIZE), b""):
+                    if size == 0 and sniff_image_type(chunk) != expected_type:
+                        raise UploadError(
+                            "File content does not match its image type."
+                        )
+
+                    size += len(chunk)
+                    if max_size is not None and size > max_size:
+                        raise UploadError(
+                            f"Image size must be less than "
+                            f"{max_size // (1024 * 1024)} MB."
+                        )
+
+                    digest.update(chunk)
+                    tmp.write(chunk)
+
+            if size == 0:
+                raise UploadError("Uploaded file is empty.")
+
+            filename = digest.hexdigest()
+            if extension:
+                filename = f"{filename}.{extension}"
+
+            final_path = os.path.join(save_path, filename)
+
+            if os.path.exists(final_path):
+                # Duplicate content: keep the stored copy
+                os.remove(tmp_path)
+            else:
+                os.replace(tmp_path, final_path)
+                ImageService.generate_variants(final_path)
+
+            return filename
+
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    # ---------- REFERENCES ---------- #
+
+    @staticmethod
+    def reference_count(filename: str, folder: str) -> int:
+        """Number of rows that reference ``filename`` in ``folder``."""
+        total = 0
+
+        for column, prefix in REFERENCES.get(folder, []):
+            total += column.class_.query.filter(
+                column == f"{prefix}{filename}"
+            ).count()
+
+        return total
+
+    # ---------- DELETE ---------- #
+
+    @staticmethod
+    def delete(filename: str, folder: str) -> bool:
+        """
+        Remove ``filename`` (and its variants) from ``folder`` unless a row
+        still references it. Call after the referencing row was changed or
+        deleted. Returns True if the file was removed.
+        """
+        if not filename:
+            return False
+
+        if UploadStore.reference_count(filename, folder) > 0:
+            return False
+
+        file_path = os.path.join(current_app.root_path, folder, filename)
+
+        removed = False
+        if os.path.exists(file_path):
+            os.remove(file_path)
+            removed = True
+
+        ImageService.delete_variants(file_path)
+        return removed
@@ -1,32 +1,512 @@
+import click
+import json
 import requests
 import os
-from typing import Optional, Dict, Any
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from typing import Optional, Dict, Any, Tuple
+
+from app.services.metrics_service import metrics
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker.
+
+    closed    -> calls go through; ``failure_threshold`` failures in a row
+                 open the circuit.
+    open      -> calls are short-circuited for ``reset_timeout`` seconds.
+    half_open -> a single probe call is let through; success closes the
+                 circuit, failure opens it again.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold=3, reset_timeout=60):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.consecutive_failures = 0
+            self.opened_at = None
+            self._probe_in_flight = False
+            self.calls = 0
+            self.failures = 0
+            self.short_circuits = 0
+            self.last_latency = None
+            self.max_latency = 0.0
+            self._total_latency = 0.0
+
+    def allow(self) -> bool:
+        """Return True if a call may be made now."""
+        with self._lock:
+            if self.state == self.OPEN:
+                if time.time() - self.opened_at < self.reset_timeout:
+                    self.short_circuits += 1
+                    return False
+                self.state = self.HALF_OPEN
+
+            if self.state == self.HALF_OPEN:
+                if self._probe_in_flight:
+                    self.short_circuits += 1
+                    return False
+                self._probe_in_flight = True
+
+            return True
+
+    def record_success(self, latency: float) -> None:
+        with self._lock:
+            self._record_latency(latency)
+            self.state = self.CLOSED
+            self.consecutive_failures = 0
+            self.opened_at = None
+            self._probe_in_flight = False
+
+    def record_failure(self, latency: float) -> None:
+        with self._lock:
+            self._record_latency(latency)
+            self.failures += 1
+            self.consecutive_failures += 1
+            self._probe_in_flight = False
+
+            if self.state == self.HALF_OPEN \
+                    or self.consecutive_failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self.opened_at = time.time()
+
+    def _record_latency(self, latency: float) -> None:
+        self.calls += 1
+        self.last_latency = latency
+        self.max_latency = max(self.max_latency, latency)
+        self._total_latency += latency
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "state": self.state,
+                "consecutive_failures": self.consecutive_failures,
+                "opened_at": self.opened_at,
+                "calls": self.calls,
+                "failures": self.failures,
+                "short_circuits": self.short_circuits,
+                "last_latency": self.last_latency,
+                "avg_latency": (
+                    self._total_latency / self.calls if self.calls else None
+                ),
+                "max_latency": self.max_latency
+            }
+
 
 class WeatherService:
-    """Service for fetching weather data from OpenWeatherMap API"""
+    """
+    Service for fetching weather data from OpenWeatherMap API
+
+    Responses are cached per city for CACHE_TTL seconds and all calls share
+    one pooled HTTP session. Once an entry is older than CACHE_TTL (but not
+    older than CACHE_TTL + STALE_TTL) the cached value is returned at once
+    and refreshed in a background thread (stale-while-revalidate).
+    """
 
-    BASE_URL = "http://api.openweathermap.org/data/2.5/weather"
+    BASE_URL = os.environ.get(
+        "OPENWEATHER_BASE_URL",
+        "http://api.openweathermap.org/data/2.5/weather"
+    )
     API_KEY = os.environ.get("OPENWEATHER_API_KEY")
 
+    CACHE_TTL = 600          # weather changes on the order of 10 minutes
+    STALE_TTL = 3600         # how long a stale entry may still be served
+    TIMEOUT = (3, 10)        # (connect, read) seconds
+
+    _session: Optional[requests.Session] = None
+    _cache: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+    _refreshing: set = set()
+    _lock = threading.Lock()
+
+    PREFETCH_WORKERS = 8
+    _prefetch_pid: Optional[int] = None
+
+    # Stop calling a failing upstream; serve cached snapshots meanwhile
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=60)
+
+    # Optional file holding the last good value of every city, so a fresh
+    # worker can serve weather while the upstream is unavailable
+    SNAPSHOT_PATH = os.environ.get("WEATHER_SNAPSHOT_PATH")
+    _snapshot_mtime: Optional[int] = None
+
+    # ---------- SETUP ---------- #
+
+    @classmethod
+    def init_app(cls, app, cities=()):
+        """
+        Apply the app config and, with WEATHER_PREFETCH_ENABLED, decide who
+        refreshes ``cities``:
+
+        - WEATHER_SNAPSHOT_PATH set: ``flask weather prefetch`` (a single
+          process) refreshes the snapshot; workers only read it.
+        - otherwise: this process starts its own prefetch thread now,
+          instead of on its first dashboard request.
+
+        Nothing is started for ``flask`` CLI commands.
+        """
+        if app.config.get("OPENWEATHER_API_KEY"):
+            cls.API_KEY = app.config["OPENWEATHER_API_KEY"]
+        if app.config.get("WEATHER_SNAPSHOT_PATH"):
+            cls.SNAPSHOT_PATH = app.config["WEATHER_SNAPSHOT_PATH"]
+            cls._snapshot_mtime = None
+
+        if (
+            app.config.get("WEATHER_PREFETCH_ENABLED")
+            and not cls.SNAPSHOT_PATH
+            and click.get_current_context(silent=True) is None
+        ):
+            cls.start_prefetch(
+                cities,
+                interval=app.config.get("WEATHER_PREFETCH_INTERVAL")
+            )
+
+    @classmethod
+    def configure(cls, base_url=None, api_key=None, cache_ttl=None,
+                  stale_ttl=None, session=None, snapshot_path=None):
+        """
+        Override endpoint, key, cache timings or the HTTP session, e.g. to
+        point tests at a local fake server. Clears the cache.
+        """
+        if base_url is not None:
+            cls.BASE_URL = base_url
+        if api_key is not None:
+            cls.API_KEY = api_key
+        if cache_ttl is not None:
+            cls.CACHE_TTL = cache_ttl
+        if stale_ttl is not None:
+            cls.STALE_TTL = stale_ttl
+        if session is not None:
+            cls._session = session
+        if snapshot_path is not None:
+            cls.SNAPSHOT_PATH = snapshot_path
+            cls._snapshot_mtime = None
+        cls.breaker.reset()
+        cls.clear_cache()
+
+    @classmethod
+    def clear_cache(cls):
+        with cls._lock:
+            cls._cache.clear()
+
+    @classmethod
+    def _get_session(cls) -> requests.Session:
+        """Shared session so TCP/TLS connections are reused between calls."""
+        if cls._session is None:
+            with cls._lock:
+                if cls._session is None:
+                    session = requests.Session()
+                    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16)
+                    session.mount("http://", adapter)
+                    session.mount("https://", adapter)
+                    cls._session = session
+        return cls._session
+
+    # ---------- PUBLIC API ---------- #
+
     @staticmethod
     def get_weather(city_name: str) -> Optional[Dict[str, Any]]:
         """
-        Fetch weather data for a city by name.
+        Fetch weather data for a city by name (or OpenWeatherMap city id).
 
         Args:
-            city_name: City name
+            city_name: City name, or numeric city id
 
         Returns:
             Weather data dict or None if error
         """
+        if not city_name:
+            return None
+
+        WeatherService._load_snapshot()
+
+        key = WeatherService._cache_key(city_name)
+        now = time.time()
+
+        with WeatherService._lock:
+            entry = WeatherService._cache.get(key)
+
+        if entry:
+            fetched_at, weather_info = entry
+            age = now - fetched_at
+
+            if age < WeatherService.CACHE_TTL:
+                metrics.inc("weather_cache_total", result="hit")
+                return weather_info
+
+            if age < WeatherService.CACHE_TTL + WeatherService.STALE_TTL:
+                metrics.inc("weather_cache_total", result="stale")
+                WeatherService._refresh_async(city_name)
+                return weather_info
+
+        metrics.inc("weather_cache_total", result="miss")
+        weather_info = WeatherService._fetch_and_store(city_name)
+
+        # Upstream failed or circuit open: serve the last known good value
+        if weather_info is None and entry:
+            return entry[1]
+
+        return weather_info
+
+    @staticmethod
+    def unavailable(city_name) -> Dict[str, Any]:
+        """
+        Placeholder shown instead of a weather card when no data is
+        available for ``city_name`` (not fetched yet, or upstream down).
+        """
+        return {
+            "unavailable": True,
+            "city": city_name,
+            "upstream_down": WeatherService.breaker.state != CircuitBreaker.CLOSED
+        }
+
+    @staticmethod
+    def get_cached_weather(city_name: str) -> Optional[Dict[str, Any]]:
+        """
+        Memory-only lookup for request handlers: never calls the API.
+
+        Returns the cached value if it is within CACHE_TTL + STALE_TTL,
+        otherwise None and schedules a background fetch (short-circuited
+        while the circuit is open). Callers render ``unavailable()`` for None.
+        """
+        if not city_name:
+            return None
+
+        WeatherService._load_snapshot()
+
+        with WeatherService._lock:
+            entry = WeatherService._cache.get(WeatherService._cache_key(city_name))
+
+        if entry:
+            fetched_at, weather_info = entry
+            age = time.time() - fetched_at
+            if age >= WeatherService.CACHE_TTL:
+                WeatherService._refresh_async(city_name)
+            if age < WeatherService.CACHE_TTL + WeatherService.STALE_TTL:
+                metrics.inc(
+                    "weather_cache_total",
+                    result="hit" if age < WeatherService.CACHE_TTL else "stale"
+                )
+                return weather_info
+
+        metrics.inc("weather_cache_total", result="miss")
+        WeatherService._refresh_async(city_name)
+        return None
+
+    # ---------- BACKGROUND PREFETCH ---------- #
+
+    @staticmethod
+    def prefetch(cities) -> int:
+        """
+        Fetch all cities concurrently into the cache.
+
+        Args:
+            cities: iterable of {"id": ..., "name": ...} dicts; each result
+                is cached under both the id and the name.
+
+        Returns:
+            Number of cities refreshed successfully
+        """
+        cities = list(cities)
+        if not cities:
+            return 0
+
+        def fetch(city):
+            return WeatherService._fetch_and_store(
+                city["id"], aliases=[city.get("name")]
+            )
+
+        workers = min(WeatherService.PREFETCH_WORKERS, len(cities))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(fetch, cities))
+
+        WeatherService.save_snapshot()
+
+        return sum(1 for r in results if r is not None)
+
+    @staticmethod
+    def start_prefetch(cities, interval: Optional[int] = None) -> bool:
+        """
+        Start a daemon thread that re-runs prefetch() every ``interval``
+        seconds (default: half of CACHE_TTL), once per process. Called
+        from ``init_app``; request handlers never start it.
+
+        Returns:
+            True if a new thread was started
+        """
+        pid = os.getpid()
+
+        with WeatherService._lock:
+            if WeatherService._prefetch_pid == pid:
+                return False
+            WeatherService._prefetch_pid = pid
+
+        interval = interval or max(WeatherService.CACHE_TTL // 2, 30)
+        cities = list(cities)
+
+        def run():
+            while True:
+                try:
+                    WeatherService.prefetch(cities)
+                except Exception as e:
+                    print(f"Weather prefetch error: {e}")
+                time.sleep(interval)
+
+        threading.Thread(
+            target=run,
+            name="weather-prefetch",
+            daemon=True
+        ).start()
+        return True
+
+    # ---------- SNAPSHOT / MONITORING ---------- #
+
+    @staticmethod
+    def save_snapshot() -> None:
+        """Write the cache to SNAPSHOT_PATH (no-op when unset)."""
+        path = WeatherService.SNAPSHOT_PATH
+        if not path:
+            return
+
+        with WeatherService._lock:
+            data = {
+                key: {"fetched_at": fetched_at, "weather": weather_info}
+                for key, (fetched_at, weather_info) in WeatherService._cache.items()
+            }
+
+        try:
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"Error saving weather snapshot: {e}")
+
+    @staticmethod
+    def _load_snapshot() -> None:
+        """
+        Merge SNAPSHOT_PATH into the cache whenever the file changes, so
+        workers pick up what ``flask weather prefetch`` wrote.
+        """
+        path = WeatherService.SNAPSHOT_PATH
+        if not path:
+            return
+
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            return
+
+        if mtime == WeatherService._snapshot_mtime:
+            return
+        WeatherService._snapshot_mtime = mtime
+
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Error loading weather snapshot: {e}")
+            return
+
+        with WeatherService._lock:
+            for key, item in data.items():
+                current = WeatherService._cache.get(key)
+                # Keep whichever value is newer
+                if current is None or current[0] < item["fetched_at"]:
+                    WeatherService._cache[key] = (
+                        item["fetched_at"], item["weather"]
+                    )
+
+    @staticmethod
+    def get_stats() -> Dict[str, Any]:
+        """Circuit breaker state, upstream latency and cache size."""
+        stats = WeatherService.breaker.stats()
+        with WeatherService._lock:
+            stats["cached_cities"] = len(WeatherService._cache)
+        return stats
+
+    # ---------- INTERNALS ---------- #
+
+    @staticmethod
+    def _cache_key(city_name) -> str:
+        return str(city_name).strip().lower()
+
+    @staticmethod
+    def _refresh_async(city_name) -> None:
+        key = WeatherService._cache_key(city_name)
+
+        with WeatherService._lock:
+            if key in WeatherService._refreshing:
+                return
+            WeatherService._refreshing.add(key)
+
+        def run():
+            try:
+                WeatherService._fetch_and_store(city_name)
+            finally:
+                with WeatherService._lock:
+                    WeatherService._refreshing.discard(key)
+
+        threading.Thread(target=run, daemon=True).start()
+
+    @staticmethod
+    def _fetch_and_store(city_name, aliases=()) -> Optional[Dict[str, Any]]:
+        weather_info = WeatherService._fetch(city_name)
+
+        if weather_info is not None:
+            entry = (time.time(), weather_info)
+            with WeatherService._lock:
+                for name in (city_name, *aliases):
+                    if name:
+                        WeatherService._cache[WeatherService._cache_key(name)] = entry
+
+        return weather_info
+
+    @staticmethod
+    def _fetch(city_name) -> Optional[Dict[str, Any]]:
+        """Call the upstream API once; returns None on any failure."""
+        breaker = WeatherService.breaker
+
+        if not breaker.allow():
+            return None
+
+        started = time.time()
+
         try:
             params = {
-                'q': city_name + ',KH',  # Add country code for Cambodia
                 'appid': WeatherService.API_KEY,
                 'units': 'metric'  # Celsius
             }
 
-            response = requests.get(WeatherService.BASE_URL, params=params, timeout=10)
+            if str(city_name).isdigit():
+                params['id'] = city_name
+            else:
+                params['q'] = city_name + ',KH'  # Add country code for Cambodia
+
+            response = WeatherService._get_session().get(
+                WeatherService.BASE_URL,
+                params=params,
+                timeout=WeatherService.TIMEOUT
+            )
+
+            # Unknown city etc. means the upstream itself is healthy;
+            # only outages, bad keys and rate limits trip the breaker
+            if response.status_code >= 500 or response.status_code in (401, 429):
+                breaker.record_failure(time.time() - started)
+            else:
+                breaker.record_success(time.time() - started)
+
             response.raise_for_status()
 
             data = response.json()
@@ -50,14 +530,21 @@ class WeatherService:
             }
             return weather_info
 
+        except (requests.ConnectionError, requests.Timeout) as e:
+            breaker.record_failure(time.time() - started)
+            print(f"Error fetching weather: {e}")
+            return None
         except requests.RequestException as e:
+            # HTTP errors were already recorded from the status code
+            if not isinstance(e, requests.HTTPError):
+                breaker.record_failure(time.time() - started)
             print(f"Error fetching weather: {e}")
             return None
-        except KeyError as e:
+        except (KeyError, IndexError, ValueError) as e:
             print(f"Error parsing weather data: {e}")
             return None
 
     @staticmethod
     def get_countries() -> Dict[str, str]:
         """Return a dict of country codes to country names (deprecated - now Cambodia only)"""
-        return {'KH': 'Cambodia'}
\ No newline at end of file
+        return {'KH': 'Cambodia'}
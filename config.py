@@ -48,6 +48,78 @@ class Config:
 
     # ================= API KEYS =================
     OPENWEATHER_API_KEY = os.environ.get("OPENWEATHER_API_KEY")
+    # Refresh all dashboard cities in the background (needs an API key)
+    WEATHER_PREFETCH_ENABLED = os.environ.get(
+        "WEATHER_PREFETCH_ENABLED",
+        "True" if os.environ.get("OPENWEATHER_API_KEY") else "False"
+    ) == "True"
+    WEATHER_PREFETCH_INTERVAL = int(os.environ.get("WEATHER_PREFETCH_INTERVAL", 300))
+    # Last good weather per city, used while the upstream is down. When set,
+    # run "flask weather prefetch" as one process and workers read this file
+    # instead of each starting its own prefetch thread
+    WEATHER_SNAPSHOT_PATH = os.environ.get("WEATHER_SNAPSHOT_PATH")
+
+    # ================= NOTIFICATIONS =================
+    # Push notifications over SSE (off by default: the page polls the
+    # unread counter instead). Each open stream holds a worker thread, so
+    # only enable it with threaded/async workers, e.g.
+    #   gunicorn -k gthread --threads 50 ...  or  gunicorn -k gevent ...
+    NOTIFICATION_STREAM_ENABLED = os.environ.get("NOTIFICATION_STREAM_ENABLED", "False") == "True"
+    # Shared file used to relay SSE notification events between workers
+    NOTIFICATION_BROKER_SPOOL = os.environ.get("NOTIFICATION_BROKER_SPOOL")
+    # Seconds before an SSE stream is closed (the browser reconnects)
+    NOTIFICATION_STREAM_TIMEOUT = int(os.environ.get("NOTIFICATION_STREAM_TIMEOUT", 30))
+
+    # ================= FRAGMENT CACHE =================
+    # Rendered knowledge-base page fragments kept per worker (LRU)
+    FRAGMENT_CACHE_MAX_BYTES = int(os.environ.get("FRAGMENT_CACHE_MAX_BYTES", 16 * 1024 * 1024))
+    FRAGMENT_CACHE_MAX_ENTRIES = int(os.environ.get("FRAGMENT_CACHE_MAX_ENTRIES", 2000))
+
+    # ================= REQUEST METRICS =================
+    # Per-endpoint wall/SQL/render timing histograms (off by default)
+    REQUEST_METRICS_ENABLED = os.environ.get("REQUEST_METRICS_ENABLED", "False") == "True"
+    # Requests slower than this are logged with their slowest statements
+    REQUEST_METRICS_SLOW_MS = int(os.environ.get("REQUEST_METRICS_SLOW_MS", 500))
+    REQUEST_METRICS_TOP_STATEMENTS = int(os.environ.get("REQUEST_METRICS_TOP_STATEMENTS", 5))
+
+    # ================= N+1 QUERY DETECTOR =================
+    # Flag statements repeated NPLUSONE_THRESHOLD+ times in one request
+    NPLUSONE_ENABLED = os.environ.get("NPLUSONE_ENABLED", "False") == "True"
+    NPLUSONE_THRESHOLD = int(os.environ.get("NPLUSONE_THRESHOLD", 5))
+    # Fail the request instead of logging (for test runs)
+    NPLUSONE_RAISE = os.environ.get("NPLUSONE_RAISE", "False") == "True"
+
+    # ================= METRICS ENDPOINT =================
+    # Directory where each worker writes its metrics snapshot (shared by workers)
+    METRICS_DIR = os.environ.get("METRICS_DIR")
+    METRICS_FLUSH_INTERVAL = int(os.environ.get("METRICS_FLUSH_INTERVAL", 10))
+    METRICS_STALE_SECONDS = int(os.environ.get("METRICS_STALE_SECONDS", 300))
+    # Bearer token for Prometheus scrapers (admins can always log in instead)
+    METRICS_TOKEN = os.environ.get("METRICS_TOKEN")
+
+    # ================= REQUEST PROFILER =================
+    # Admins can profile one request with "X-Profile: 1" or "?_profile=1" (off by default)
+    PROFILER_ENABLED = os.environ.get("PROFILER_ENABLED", "False") == "True"
+    # Defaults to <instance>/profiles; only the newest PROFILE_KEEP are kept
+    PROFILE_DIR = os.environ.get("PROFILE_DIR")
+    PROFILE_KEEP = int(os.environ.get("PROFILE_KEEP", 50))
+
+    # ================= SLOW QUERY LOG =================
+    # Statements slower than SLOW_QUERY_MS are logged with an EXPLAIN plan (off by default)
+    SLOW_QUERY_ENABLED = os.environ.get("SLOW_QUERY_ENABLED", "False") == "True"
+    SLOW_QUERY_MS = int(os.environ.get("SLOW_QUERY_MS", 200))
+    # Defaults to <instance>/slow_queries.log, rotated by size
+    SLOW_QUERY_LOG = os.environ.get("SLOW_QUERY_LOG")
+    SLOW_QUERY_LOG_MAX_BYTES = int(os.environ.get("SLOW_QUERY_LOG_MAX_BYTES", 5 * 1024 * 1024))
+    SLOW_QUERY_LOG_BACKUPS = int(os.environ.get("SLOW_QUERY_LOG_BACKUPS", 5))
+    # Debug only: log bound parameter values (may include hashes, tokens, emails)
+    SLOW_QUERY_LOG_PARAMS = os.environ.get("SLOW_QUERY_LOG_PARAMS", "False") == "True"
+
+    # ================= SCHEMA =================
+    # Startup check of the applied migration version: warn | strict | off
+    SCHEMA_VERSION_CHECK = os.environ.get("SCHEMA_VERSION_CHECK", "warn")
+    # Apply pending migrations at startup (single-process/dev setups only)
+    SCHEMA_AUTO_UPGRADE = os.environ.get("SCHEMA_AUTO_UPGRADE", "False") == "True"
 
     # ================= UPLOAD (optional future use) =================
     MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB file upload limit
\ No newline at end of file
@@ -0,0 +1,134 @@
+"""
+Fixtures for the regression suite.
+
+Run from the repository root (so ``app``, ``config`` and ``extensions``
+import)::
+
+    python -m pytest test/regression
+
+Each test gets a fresh app on a SQLite file in its tmp_path. The schema is
+built by the versioned migrations (SCHEMA_AUTO_UPGRADE) and the N+1
+detector runs in strict mode, so any request that repeats a statement
+NPLUSONE_THRESHOLD times fails the test.
+"""
+from datetime import datetime, timedelta
+
+import pytest
+
+from config import Config
+from extensions import db
+
+
+@pytest.fixture
+def app(tmp_path):
+    from app import create_app
+
+    class TestConfig(Config):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path / 'test.db'}"
+        TESTING = True
+        WTF_CSRF_ENABLED = False
+        SCHEMA_AUTO_UPGRADE = True
+        SCHEMA_VERSION_CHECK = "off"
+        NPLUSONE_ENABLED = True
+        NPLUSONE_RAISE = True
+        WEATHER_PREFETCH_ENABLED = False
+        WEATHER_SNAPSHOT_PATH = None
+        NOTIFICATION_BROKER_SPOOL = None
+        SLOW_QUERY_ENABLED = False
+        PROFILER_ENABLED = False
+
+    app = create_app(TestConfig)
+
+    with app.app_context():
+        yield app
+        db.session.remove()
+        db.engine.dispose()
+
+
+@pytest.fixture
+def user(app):
+    """An active account with the "User" role."""
+    from app.models.permission import PermissionTable
+    from app.models.role import RoleTable
+    from app.models.user import UserTable
+
+    permission = PermissionTable(code="RUN_DIAGNOSIS", name="Run diagnosis")
+    role = RoleTable(name="User", permissions=[permission])
+
+    # Joined before any seeded broadcast, so every broadcast is visible
+    user = UserTable(
+        username="farmer",
+        email="farmer@example.com",
+        full_name="Farmer",
+        roles=[role],
+        created_at=datetime.utcnow() - timedelta(days=1)
+    )
+    user.set_password("secret")
+
+    db.session.add(user)
+    db.session.commit()
+    return user
+
+
+@pytest.fixture
+def client(app, user):
+    """Test client logged in as ``user``."""
+    client = app.test_client()
+
+    with client.session_transaction() as sess:
+        sess["_user_id"] = str(user.id)
+        sess["_fresh"] = True
+
+    return client
+
+
+@pytest.fixture
+def diseases(app):
+    """Twelve diseases, each with a treatment and a prevention."""
+    from app.models.diseases import DiseaseTable
+    from app.models.preventions import PreventionTable
+    from app.models.treatments import TreatmentTable
+
+    rows = []
+    for i in range(12):
+        disease = DiseaseTable(
+            disease_name=f"Disease {i}",
+            disease_type="Fungal",
+            severity_level="High",
+            description=f"Description {i}"
+        )
+        db.session.add(disease)
+        db.session.flush()
+
+        db.session.add(TreatmentTable(
+            disease_id=disease.id,
+            treatment_type="Chemical",
+            method=f"Spray {i}",
+            image="treatment.png"
+        ))
+        db.session.add(PreventionTable(
+            disease_id=disease.id,
+            prevention_type="Cultural",
+            method=f"Rotate {i}",
+            image="prevention.png"
+        ))
+        rows.append(disease)
+
+    db.session.commit()
+    return rows
+
+
+@pytest.fixture
+def notifications(user, diseases):
+    """A broadcast for every disease plus two personal notifications."""
+    from app.services.notification_service import NotificationService
+
+    for disease in diseases:
+        NotificationService.create_broadcast(disease.id)
+
+    for disease in diseases[:2]:
+        NotificationService.create_for_user(
+            user.id, "disease", disease_id=disease.id
+        )
+
+    db.session.commit()
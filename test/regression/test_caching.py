@@ -0,0 +1,55 @@
+from app.services.fragment_cache import fragment_cache
+from extensions import db
+
+
+def test_unchanged_page_answers_304(client, diseases):
+    first = client.get("/user/diseases/show")
+    etag = first.headers["ETag"]
+
+    again = client.get("/user/diseases/show", headers={"If-None-Match": etag})
+
+    assert again.status_code == 304
+    assert again.data == b""
+
+
+def test_kb_write_changes_etag(client, diseases):
+    etag = client.get("/user/diseases/show").headers["ETag"]
+
+    diseases[0].disease_name = "Renamed disease"
+    db.session.commit()
+
+    response = client.get(
+        "/user/diseases/show", headers={"If-None-Match": etag}
+    )
+
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+    assert b"Renamed disease" in response.data
+
+
+def test_generation_follows_database(app, diseases):
+    from app.models.diseases import DiseaseTable
+
+    before = fragment_cache.generation()
+    assert fragment_cache.generation() == before
+
+    db.session.add(DiseaseTable(
+        disease_name="Sheath blight",
+        disease_type="Fungal",
+        severity_level="Medium"
+    ))
+    db.session.commit()
+
+    assert fragment_cache.generation() != before
+
+
+def test_generation_change_drops_fragments(app, diseases):
+    fragment_cache.generation()
+    fragment_cache.set(("disease_index", 1), "<p>cached</p>")
+    assert fragment_cache.get(("disease_index", 1)) == "<p>cached</p>"
+
+    diseases[0].description = "Changed"
+    db.session.commit()
+    fragment_cache.generation()
+
+    assert fragment_cache.get(("disease_index", 1)) is None
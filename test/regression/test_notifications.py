@@ -0,0 +1,67 @@
+from app.services.notification_service import NotificationService
+
+
+def test_feed_pages_with_keyset_cursor(user, notifications):
+    first, cursor = NotificationService.get_feed(user.id, limit=5)
+    assert len(first) == 5
+    assert cursor == first[-1]["id"]
+
+    seen = [item["id"] for item in first]
+    while cursor:
+        page, cursor = NotificationService.get_feed(
+            user.id, limit=5, cursor=cursor
+        )
+        seen.extend(item["id"] for item in page)
+
+    assert len(seen) == 14
+    assert seen == sorted(seen, reverse=True)
+
+
+def test_feed_route_sends_next_cursor(client, notifications):
+    response = client.get("/user/notifications?limit=10")
+    assert len(response.get_json()) == 10
+
+    cursor = response.headers["X-Next-Cursor"]
+    response = client.get(f"/user/notifications?limit=10&cursor={cursor}")
+    assert len(response.get_json()) == 4
+    assert "X-Next-Cursor" not in response.headers
+
+
+def test_broadcast_read_state_is_per_user(app, user, notifications):
+    from app.models.user import UserTable
+    from extensions import db
+
+    other = UserTable(
+        username="other",
+        email="other@example.com",
+        full_name="Other",
+        password_hash="x",
+        created_at=user.created_at
+    )
+    db.session.add(other)
+    db.session.commit()
+
+    broadcast = NotificationService.get_feed(user.id, limit=3)[0][-1]
+    assert NotificationService.mark_read(user.id, broadcast["id"])
+
+    mine = {i["id"]: i["is_read"] for i in NotificationService.get_feed(user.id)[0]}
+    theirs = {i["id"]: i["is_read"] for i in NotificationService.get_feed(other.id)[0]}
+
+    assert mine[broadcast["id"]] is True
+    assert theirs[broadcast["id"]] is False
+
+
+def test_unread_counter_follows_reads(user, notifications):
+    assert NotificationService.get_unread_count(user.id) == 14
+
+    newest = NotificationService.get_feed(user.id, limit=1)[0][0]
+    NotificationService.mark_read(user.id, newest["id"])
+    assert NotificationService.get_unread_count(user.id) == 13
+
+    # Reading the same notification again must not count twice
+    NotificationService.mark_read(user.id, newest["id"])
+    assert NotificationService.get_unread_count(user.id) == 13
+
+    NotificationService.mark_all_read(user.id)
+    assert NotificationService.get_unread_count(user.id) == 0
+    assert all(item["is_read"] for item in NotificationService.get_feed(user.id)[0])
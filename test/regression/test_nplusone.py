@@ -0,0 +1,42 @@
+import pytest
+
+from app.models.user import UserTable
+from app.services.nplusone_detector import NPlusOneError, nplusone_detector
+from extensions import db
+
+
+def test_notification_feed_has_no_n_plus_one(client, notifications):
+    response = client.get("/user/notifications")
+
+    assert response.status_code == 200
+    assert len(response.get_json()) == 14
+
+
+def test_disease_list_has_no_n_plus_one(client, diseases):
+    response = client.get("/user/diseases/show")
+
+    assert response.status_code == 200
+    assert b"Disease 0" in response.data
+
+
+def test_lazy_load_loop_raises(app, user):
+    from app.models.role import RoleTable
+
+    role = RoleTable.query.filter_by(name="User").one()
+    for i in range(6):
+        db.session.add(UserTable(
+            username=f"user{i}",
+            email=f"user{i}@example.com",
+            full_name=f"User {i}",
+            password_hash="x",
+            roles=[role]
+        ))
+    db.session.commit()
+    db.session.expunge_all()
+
+    users = UserTable.query.all()
+
+    with pytest.raises(NPlusOneError):
+        with nplusone_detector.detect():
+            # One lazy SELECT of the roles per user
+            [u.roles for u in users]
@@ -0,0 +1,34 @@
+from sqlalchemy import inspect
+
+from app.services.schema_service import SchemaService
+from extensions import db
+
+
+def test_auto_upgrade_reaches_head(app):
+    assert SchemaService.current_version() == SchemaService.head()
+    assert SchemaService.pending() == []
+
+
+def test_upgrade_is_idempotent(app):
+    assert SchemaService.upgrade() == []
+
+
+def test_broadcast_notifications_allow_null_user(app):
+    columns = {
+        c["name"]: c for c in inspect(db.engine).get_columns("user_notification")
+    }
+    assert columns["user_id"]["nullable"] is True
+
+
+def test_risk_map_covers_every_farm_province():
+    from app.forms.farm_forms import CAMBODIA_PROVINCES
+    from app.services.disease_risk_service import PROVINCE_WEATHER, province_key
+
+    provinces = {value for value, _ in CAMBODIA_PROVINCES if value}
+
+    assert set(PROVINCE_WEATHER) == provinces
+
+    # Capital names used for the weather lookup map back to their province
+    for province, city in PROVINCE_WEATHER.items():
+        if isinstance(city, str):
+            assert province_key(city) == province_key(province)
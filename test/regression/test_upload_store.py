@@ -0,0 +1,56 @@
+import io
+import os
+
+import pytest
+from werkzeug.datastructures import FileStorage
+
+from app.services.upload_store import UploadError, UploadStore
+from extensions import db
+
+FOLDER = "static/images/diseases"
+PNG = b"\x89PNG\r\n\x1a\n" + b"\x00" * 64
+
+
+def _upload(data, filename="leaf.png"):
+    return FileStorage(stream=io.BytesIO(data), filename=filename)
+
+
+@pytest.fixture
+def root(app, tmp_path, monkeypatch):
+    monkeypatch.setattr(app, "root_path", str(tmp_path))
+    return tmp_path
+
+
+def test_same_content_is_stored_once(root):
+    first = UploadStore.save(_upload(PNG), FOLDER)
+    second = UploadStore.save(_upload(PNG, "copy.png"), FOLDER)
+
+    assert first == second
+    assert [n for n in os.listdir(root / FOLDER) if n.endswith(".png")] == [first]
+
+
+def test_rejects_content_that_does_not_match_extension(root):
+    with pytest.raises(UploadError):
+        UploadStore.save(_upload(b"GIF89a" + b"\x00" * 64), FOLDER)
+
+    assert not any(n.endswith(".part") for n in os.listdir(root / FOLDER))
+
+
+def test_file_is_kept_while_referenced(root, diseases):
+    filename = UploadStore.save(_upload(PNG), FOLDER)
+    path = root / FOLDER / filename
+
+    diseases[0].image = filename
+    diseases[1].image = filename
+    db.session.commit()
+    assert UploadStore.reference_count(filename, FOLDER) == 2
+
+    diseases[0].image = None
+    db.session.commit()
+    assert UploadStore.delete(filename, FOLDER) is False
+    assert path.exists()
+
+    diseases[1].image = None
+    db.session.commit()
+    assert UploadStore.delete(filename, FOLDER) is True
+    assert not path.exists()